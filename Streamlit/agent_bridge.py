@@ -7,8 +7,11 @@ sys.path.append(onchain_agent_path)
 
 # Import after path is set
 from onchain_agent.crew import OnchainAgentCrew
-from output_handler import capture_output
+from onchain_agent import events
+from onchain_agent.memory_storage import partition_for
+from output_handler import StreamlitProcessOutput
 import streamlit as st
+import threading
 from pathlib import Path
 
 def run_onchain_analysis(wallet_address: str, networks: str, output_container=None):
@@ -21,7 +24,7 @@ def run_onchain_analysis(wallet_address: str, networks: str, output_container=No
         output_container: Optional Streamlit container to capture output
     
     Returns:
-        The result of the analysis
+        AnalysisRun: handle with the run's result and report path
     """
     # Prepare inputs
     inputs = {
@@ -33,33 +36,62 @@ def run_onchain_analysis(wallet_address: str, networks: str, output_container=No
     Path("outputs").mkdir(exist_ok=True, parents=True)
     Path("memory").mkdir(exist_ok=True, parents=True)
     
-    # Initialize crew
-    crew = OnchainAgentCrew()
+    # Initialize crew; each run writes to its own output directory
+    crew = OnchainAgentCrew(memory_partition=partition_for(wallet_address))
     
-    # Run with or without output capturing
-    if output_container:
-        with capture_output(output_container):
-            result = crew.crew().kickoff(inputs=inputs)
-    else:
-        result = crew.crew().kickoff(inputs=inputs)
+    if not output_container:
+        return crew.run_analysis(inputs)
     
-    return result
+    # Stream this run's progress events to the container while it runs
+    return stream_analysis(crew, inputs, StreamlitProcessOutput(output_container))
 
-def get_report_content():
+def stream_analysis(crew, inputs, log):
     """
-    Read the generated report content from the output file.
+    Run the crew in a worker thread and write its progress events to ``log``.
+    
+    Only the events of this run reach the log, so concurrent sessions never
+    see each other's output.
+    """
+    stream = events.EventStream(crew.run_id)
+    outcome = {}
+    
+    def worker():
+        try:
+            with events.stream_run(stream):
+                outcome["analysis"] = crew.run_analysis(inputs)
+        except Exception as e:
+            outcome["error"] = e
+    
+    thread = threading.Thread(target=worker, name=f"analysis-{crew.run_id}", daemon=True)
+    thread.start()
+    
+    cursor = 0
+    while not stream.closed or stream.since(cursor):
+        for event in stream.wait(cursor, timeout=0.5):
+            log.write(events.format_event(event) + "\n")
+            cursor = event.seq
+    thread.join()
+    log.flush(force=True)
+    
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["analysis"]
+
+def get_report_content(analysis):
+    """
+    Read the report content written by a run.
+    
+    Args:
+        analysis: The AnalysisRun returned by run_onchain_analysis
     
     Returns:
         str: The report content as a string, or None if no report was found
     """
-    report_path = Path("outputs/onchain_intelligence_report.md")
-    
-    if not report_path.exists():
+    if not analysis.report_path.exists():
         return None
     
     try:
-        with open(report_path, "r") as file:
-            return file.read()
+        return analysis.read_report()
     except Exception as e:
         st.error(f"Error reading report: {str(e)}")
         return None
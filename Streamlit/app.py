@@ -3,13 +3,15 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 import sys
+import time
 
 # Add the absolute path to the onchain_agent directory
 onchain_agent_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "onchain_agent", "src")
 sys.path.append(onchain_agent_path)
 
 # Import after path is set
-from onchain_agent.crew import OnchainAgentCrew
+from onchain_agent.service import JobManager
+from onchain_agent.events import format_event
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +26,68 @@ st.set_page_config(
 # Initialize session state variables
 if "api_keys_set" not in st.session_state:
     st.session_state.api_keys_set = False
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+
+
+@st.cache_resource
+def get_job_manager():
+    """Job registry, worker pool, LLM client and tools shared by every session on this server.
+
+    Finished reports are reused for the same wallet and networks for
+    ONCHAIN_REPORT_TTL seconds (default 15 minutes).
+    """
+    return JobManager(
+        max_workers=int(os.getenv("ONCHAIN_APP_WORKERS", "4")),
+        result_ttl=float(os.getenv("ONCHAIN_REPORT_TTL", "900"))
+    )
+
+
+def show_report(report_content):
+    """Render a finished report with a download button."""
+    st.markdown(report_content)
+    
+    st.download_button(
+        label="📥 Download Report",
+        data=report_content,
+        file_name="onchain_intelligence_report.md",
+        mime="text/markdown"
+    )
+
+
+def show_task_outputs(task_outputs, expand_last=False):
+    """Render each finished task's output in its own expander."""
+    for position, task_output in enumerate(task_outputs):
+        title = task_output["task"].replace("_", " ").title()
+        expanded = expand_last and position == len(task_outputs) - 1
+        with st.expander(f"✅ {title}", expanded=expanded):
+            st.markdown(task_output["output"])
+
+
+@st.fragment(run_every=2)
+def show_job_progress(job_id):
+    """Poll a running analysis; only this fragment reruns until the job finishes."""
+    job = get_job_manager().get(job_id)
+    if job is None or job.status in ("done", "failed"):
+        # Rerun the whole page to render the result
+        st.rerun()
+    
+    with st.status("Running blockchain analysis...", expanded=True):
+        st.write(f"Analyzing wallet: {job.wallet_address}")
+        st.write(f"Networks: {job.networks}")
+        if job.status == "queued":
+            st.write("Waiting for a free worker...")
+        else:
+            total = len(job.tasks) or 1
+            st.progress(job.tasks_completed / total, text=f"Task {min(job.tasks_completed + 1, total)} of {total}: {job.current_task or 'starting'}")
+            st.write(f"Elapsed: {time.time() - job.started_at:.0f}s")
+            # Latest events of this session's own run
+            recent_events = job.events.since(0)[-12:]
+            if recent_events:
+                st.code("\n".join(format_event(event) for event in recent_events), language=None)
+    
+    # Results of the tasks finished so far, newest expanded
+    show_task_outputs(job.task_outputs, expand_last=True)
 
 # Main header
 st.markdown("<h1 style='text-align: center; margin-bottom: 20px;'>🔍 Onchain AI Agent</h1>", unsafe_allow_html=True)
@@ -101,60 +165,47 @@ with col2:
 # Convert networks to comma-separated string
 networks_str = ",".join(networks)
 
-# Run analysis button
-run_button = st.button("🚀 Run Analysis", type="primary", disabled=not st.session_state.api_keys_set)
+# Run analysis button, plus a refresh that skips the cached report
+button_col, refresh_col = st.columns([1, 4])
+with button_col:
+    run_button = st.button("🚀 Run Analysis", type="primary", disabled=not st.session_state.api_keys_set)
+with refresh_col:
+    refresh_button = st.button(
+        "🔄 Refresh",
+        disabled=not st.session_state.api_keys_set,
+        help="Run a new analysis even if a recent report for this wallet and networks exists"
+    )
 
 # Check if API keys are set before running
-if run_button:
+if run_button or refresh_button:
     if not st.session_state.api_keys_set:
         st.error("Please set your API keys in the sidebar first.")
     else:
-        # Prepare inputs for the crew
-        inputs = {
-            'wallet_address': wallet_address,
-            'networks': networks_str
-        }
-        
         # Create output directories
         Path("outputs").mkdir(exist_ok=True, parents=True)
         Path("memory").mkdir(exist_ok=True, parents=True)
         
-        # Run the analysis with progress tracking
-        with st.status("Running blockchain analysis...", expanded=True) as status:
-            try:
-                # Display initial information
-                st.write(f"Analyzing wallet: {wallet_address}")
-                st.write(f"Networks: {networks_str}")
-                
-                # Initialize and run the crew
-                crew = OnchainAgentCrew()
-                result = crew.crew().kickoff(inputs=inputs)
-                
-                # Update status when complete
-                status.update(label="✅ Analysis complete!", state="complete", expanded=False)
-            except Exception as e:
-                status.update(label=f"❌ Error: {str(e)}", state="error")
-                st.error(f"An error occurred: {str(e)}")
-                st.stop()
-        
-        # Display results
-        try:
-            # Read the generated report
-            with open("outputs/onchain_intelligence_report.md", "r") as file:
-                report_content = file.read()
-            
-            # Display the report
-            st.markdown(report_content)
-            
-            # Download button1
-            st.download_button(
-                label="📥 Download Report",
-                data=report_content,
-                file_name="onchain_intelligence_report.md",
-                mime="text/markdown"
-            )
-        except Exception as e:
-            st.error(f"Error loading results: {str(e)}")
+        # Queue the analysis (or reuse a recent one); the page stays responsive while it runs
+        job = get_job_manager().submit(wallet_address, networks_str, refresh=refresh_button)
+        st.session_state.job_id = job.job_id
+
+# Show the progress or result of this session's analysis
+if st.session_state.job_id:
+    job = get_job_manager().get(st.session_state.job_id)
+    if job is None:
+        st.warning("This analysis is no longer available. Please run it again.")
+        st.session_state.job_id = None
+    elif job.status in ("queued", "running"):
+        show_job_progress(job.job_id)
+    elif job.status == "failed":
+        st.error(f"An error occurred: {job.error}")
+    else:
+        age_minutes = (time.time() - (job.finished_at or time.time())) / 60
+        st.success(f"✅ Analysis complete for {job.wallet_address} ({job.networks})")
+        st.caption(f"Report generated {age_minutes:.0f} min ago. Use Refresh to run a new analysis.")
+        # Intermediate analyses first, then the synthesized report
+        show_task_outputs(job.task_outputs[:-1])
+        show_report(job.result)
 
 # Footer
 st.markdown("---")
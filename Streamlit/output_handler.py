@@ -1,58 +1,123 @@
 import sys
+import threading
+import time
+from collections import OrderedDict, deque
 from contextlib import contextmanager
 from io import StringIO
 import re
 
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # outside Streamlit: the redraw timer needs no script context
+    add_script_run_ctx = get_script_run_ctx = None
+
+# ANSI escape codes, plus the bare color codes left behind when the escape byte is dropped
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+BARE_COLOR_CODES = re.compile(r'\[(?:1|95|92|00)m')
+
 class StreamlitProcessOutput:
-    """Class to handle capturing and displaying process output in Streamlit."""
-    
-    def __init__(self, container):
+    """Class to handle capturing and displaying process output in Streamlit.
+
+    Keeps only the last ``max_lines`` lines (a ring buffer), skips lines seen
+    among the last ``dedup_window`` distinct lines, and redraws the container
+    at most once every ``min_interval`` seconds, so long verbose runs stay
+    cheap in both memory and browser updates. Lines held back by the
+    throttle are drawn by a timer once the interval has passed, even if no
+    further output arrives. Each redraw sends the whole (bounded) buffer:
+    appending elements instead would let the page grow without limit.
+    """
+
+    def __init__(self, container, max_lines=500, dedup_window=2000, min_interval=0.25):
         self.container = container
-        self.output_text = ""
-        self.seen_lines = set()
-        
+        self.lines = deque(maxlen=max_lines)
+        self.dedup_window = dedup_window
+        self.min_interval = min_interval
+        self._seen = OrderedDict()
+        self._partial = ""
+        self._dirty = False
+        self._last_render = 0.0
+        self._timer = None
+        # The timer thread draws on behalf of the script run that created this handler
+        self._script_ctx = get_script_run_ctx() if get_script_run_ctx else None
+        self._lock = threading.Lock()
+
+    @property
+    def output_text(self):
+        """The lines currently kept in the buffer."""
+        return "\n".join(self.lines)
+
     def clean_text(self, text):
         """Clean ANSI codes and formatting from text."""
-        # Remove ANSI escape codes
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        text = ansi_escape.sub('', text)
-        
-        # Clean up other formatting
-        text = text.replace('[1m', '').replace('[95m', '').replace('[92m', '').replace('[00m', '')
-        return text
-        
+        return BARE_COLOR_CODES.sub('', ANSI_ESCAPE.sub('', text))
+
+    def _add_line(self, line):
+        """Buffer a line unless it was seen recently (caller holds the lock)."""
+        line = line.strip()
+        if not line:
+            return
+        if line in self._seen:
+            self._seen.move_to_end(line)
+            return
+        self._seen[line] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        self.lines.append(line)
+        self._dirty = True
+
     def write(self, text):
         """Write text to the Streamlit container."""
-        cleaned_text = self.clean_text(text)
-        if not cleaned_text:
+        if not text:
+            return
+        with self._lock:
+            # Hold back the trailing partial line until its newline arrives
+            *lines, self._partial = (self._partial + text).split('\n')
+            for line in lines:
+                self._add_line(self.clean_text(line))
+            self._render()
+
+    def _render(self, force=False):
+        """Redraw the container if there is new output, or schedule the redraw the throttle held back."""
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        wait = self.min_interval - (now - self._last_render)
+        if not force and wait > 0:
+            self._schedule(wait)
+            return
+        self.container.text(self.output_text)
+        self._dirty = False
+        self._last_render = now
+
+    def _schedule(self, delay):
+        """Arm the trailing-edge redraw unless one is already pending (caller holds the lock)."""
+        if self._timer is not None:
             return
-            
-        # Split into lines and process each line
-        lines = cleaned_text.split('\n')
-        new_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line and line not in self.seen_lines:
-                self.seen_lines.add(line)
-                new_lines.append(line)
-        
-        if new_lines:
-            # Add the new lines to the output
-            new_content = '\n'.join(new_lines)
-            self.output_text = f"{self.output_text}\n{new_content}" if self.output_text else new_content
-            
-            # Update the display
-            self.container.text(self.output_text)
-        
-    def flush(self):
-        """Implement flush method required for stream compatibility."""
-        pass
+        self._timer = threading.Timer(delay, self._redraw_pending)
+        self._timer.daemon = True
+        if self._script_ctx is not None:
+            add_script_run_ctx(self._timer, self._script_ctx)
+        self._timer.start()
+
+    def _redraw_pending(self):
+        with self._lock:
+            self._timer = None
+            self._render(force=True)
+
+    def flush(self, force=False):
+        """Implement flush method required for stream compatibility.
+
+        ``force`` also emits a pending partial line and redraws immediately.
+        """
+        with self._lock:
+            if force and self._partial:
+                self._add_line(self.clean_text(self._partial))
+                self._partial = ""
+            self._render(force=force)
 
 @contextmanager
 def capture_output(container):
     """Capture stdout and redirect it to a Streamlit container.
-    
+
     Usage:
         with capture_output(st.container()):
             # Code that prints to stdout
@@ -65,3 +130,5 @@ def capture_output(container):
         yield string_io
     finally:
         sys.stdout = old_stdout
+        # Show whatever the throttle held back
+        output_handler.flush(force=True)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""Benchmark the tool formatters and the GraphQL-to-text pipeline.
+
+For each formatter and payload size this measures:
+
+* decode  - decoding of the serialized GraphQL response (orjson when installed)
+* format  - the tool's _format_* method on the decoded response
+* peak    - peak traced memory of decode + format (tracemalloc)
+* stream  - for the transaction history, decoding and formatting edge by edge
+            from 64 KiB chunks (when ijson is installed), with its peak memory
+
+Results are written to benchmarks/results/<label>.json and compared against
+a baseline result file, flagging regressions above a threshold:
+
+    python benchmarks/bench_formatters.py --sizes small,medium,whale --label 0.1.0
+    python benchmarks/bench_formatters.py --label my-branch --baseline benchmarks/results/0.1.0.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from onchain_agent import synthetic
+from onchain_agent.tools import json_decoding
+from onchain_agent.tools.json_decoding import EdgeStream, loads
+from onchain_agent.tools import (
+    PortfolioTool,
+    TransactionHistoryTool,
+    TokenPriceTool,
+    TransactionDetailsTool,
+    SearchTool
+)
+
+RESULTS_DIR = ROOT / "results"
+
+# Payload sizes, from a typical wallet up to whale-sized responses
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"tokens": 10, "apps": 10, "positions": 10, "transactions": 10, "ticks": 30, "transfers": 3, "search": 10},
+    "medium": {"tokens": 1000, "apps": 50, "positions": 20, "transactions": 5000, "ticks": 720, "transfers": 100, "search": 100},
+    "whale": {"tokens": 10000, "apps": 200, "positions": 50, "transactions": 100000, "ticks": 8760, "transfers": 1000, "search": 1000},
+}
+
+# Timing repeats per size (the best run is reported)
+REPEATS = {"small": 50, "medium": 5, "whale": 2}
+
+
+def build_cases(size: Dict[str, int]) -> List[Tuple[str, Dict[str, Any], Callable[[Dict[str, Any]], str]]]:
+    """Return (formatter name, synthetic response, formatter callable) for one payload size."""
+    portfolio_tool = PortfolioTool()
+    history_tool = TransactionHistoryTool()
+    price_tool = TokenPriceTool()
+    details_tool = TransactionDetailsTool()
+    search_tool = SearchTool()
+    address = "0x267be1C1D684F78cb4F6a176C4911b741E4Ffdc0"
+
+    return [
+        (
+            "_format_portfolio_data",
+            synthetic.portfolio_response(size["tokens"], size["apps"], size["positions"]),
+            lambda data: portfolio_tool._format_portfolio_data(data, address)
+        ),
+        (
+            "_format_transaction_history",
+            synthetic.transaction_history_response(size["transactions"]),
+            lambda data: history_tool._format_transaction_history(data, address)
+        ),
+        (
+            "_format_search_results",
+            synthetic.search_response(size["search"]),
+            lambda data: search_tool._format_search_results(data, "eth")
+        ),
+        (
+            "_format_price_data",
+            synthetic.token_price_response(address, size["ticks"]),
+            lambda data: price_tool._format_price_data(data, address)
+        ),
+        (
+            "_format_transaction_details",
+            synthetic.transaction_details_response(transfers=size["transfers"]),
+            lambda data: details_tool._format_transaction_details(data, "0xabc", "ethereum")
+        ),
+    ]
+
+
+def best_of(func: Callable[[], Any], repeats: int) -> float:
+    """Best wall-clock time of ``repeats`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(name: str, response: Dict[str, Any], formatter: Callable[[Dict[str, Any]], str], repeats: int) -> Dict[str, Any]:
+    """Measure decode and format time and peak memory for one formatter."""
+    body = json.dumps(response).encode("utf-8")
+    decoded = loads(body)
+
+    decode_seconds = best_of(lambda: loads(body), repeats)
+    format_seconds = best_of(lambda: formatter(decoded), repeats)
+
+    # Memory is traced in a separate pass: tracemalloc distorts timings
+    del decoded
+    gc.collect()
+    tracemalloc.start()
+    output = formatter(loads(body))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "response_bytes": len(body),
+        "output_chars": len(output),
+        "decode_ms": decode_seconds * 1000,
+        "format_ms": format_seconds * 1000,
+        "pipeline_ms": (decode_seconds + format_seconds) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def measure_stream(response: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    """Measure streamed decode + format of a transaction history response."""
+    history_tool = TransactionHistoryTool()
+    address = "0x267be1C1D684F78cb4F6a176C4911b741E4Ffdc0"
+    body = json.dumps(response).encode("utf-8")
+    size = json_decoding.CHUNK_SIZE
+
+    def run() -> str:
+        chunks = (body[i:i + size] for i in range(0, len(body), size))
+        return history_tool._format_transaction_stream(EdgeStream(chunks, "transactionHistoryV2"), address)
+
+    stream_seconds = best_of(run, repeats)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The serialized body stands in for the network and is not counted
+    return {"stream_ms": stream_seconds * 1000, "stream_peak_kib": peak / 1024}
+
+
+def find_baseline(label: str) -> Optional[Path]:
+    """Most recent stored result other than the current label."""
+    candidates = [path for path in RESULTS_DIR.glob("*.json") if path.stem != label]
+    return max(candidates, key=lambda path: path.stat().st_mtime) if candidates else None
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return human-readable regressions against a baseline result file."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        for metric in ("pipeline_ms", "peak_kib", "stream_ms", "stream_peak_kib"):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after and after > before * (1 + threshold):
+                regressions.append(f"{key} {metric}: {before:.2f} -> {after:.2f} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Zapper tool formatters")
+    parser.add_argument("--sizes", default="small,medium,whale", help="Comma-separated sizes: " + ", ".join(SIZES))
+    parser.add_argument("--label", default=None, help="Name of the stored result (default: package version)")
+    parser.add_argument("--baseline", default=None, help="Result file to compare against (default: the latest other result)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    args = parser.parse_args()
+
+    label = args.label
+    if label is None:
+        try:
+            from importlib.metadata import version
+            label = version("onchain_agent")
+        except Exception:
+            label = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'formatter':<30} {'size':<7} {'bytes':>12} {'decode ms':>10} {'format ms':>10} {'peak KiB':>10}")
+    for size_name in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        size = SIZES[size_name]
+        for name, response, formatter in build_cases(size):
+            stats = measure(name, response, formatter, REPEATS[size_name])
+            results[f"{name}/{size_name}"] = stats
+            print(
+                f"{name:<30} {size_name:<7} {stats['response_bytes']:>12,} "
+                f"{stats['decode_ms']:>10.2f} {stats['format_ms']:>10.2f} {stats['peak_kib']:>10.1f}"
+            )
+            if name == "_format_transaction_history" and json_decoding.streaming_available():
+                stats.update(measure_stream(response, REPEATS[size_name]))
+                print(
+                    f"{'  streamed':<30} {size_name:<7} {'':>12} "
+                    f"{stats['stream_ms']:>21.2f} {stats['stream_peak_kib']:>10.1f}"
+                )
+            del response
+
+    report = {
+        "label": label,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "decoder": "orjson" if json_decoding.orjson is not None else "json",
+        "results": results,
+    }
+
+    baseline_path = Path(args.baseline) if args.baseline else find_baseline(label)
+    if baseline_path and baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        print(f"\nCompared with {baseline_path.name}: {len(regressions)} regression(s)")
+        for line in regressions:
+            print(f"  {line}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out_path = RESULTS_DIR / f"{label}.json"
+        out_path.write_text(json.dumps(report, indent=2))
+        print(f"\nResults saved to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
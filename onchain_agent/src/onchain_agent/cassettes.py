@@ -0,0 +1,190 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Deque, List, Optional, Tuple
+
+# Bumped when the cassette file layout changes
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay")
+# Replay each exchange after its recorded latency, or immediately
+REPLAY_LATENCIES = ("original", "none")
+# Replay only exact matches, or fall back to recorded order on a miss
+MATCH_MODES = ("strict", "lenient")
+
+
+class CassetteMiss(RuntimeError):
+    """A replayed run made a request the cassette has no recording for."""
+
+
+def request_key(kind: str, name: str, request: Dict[str, Any]) -> str:
+    """Stable hash of a request, used to match it to its recording."""
+    document = json.dumps([kind, name, request], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded Zapper and LLM exchanges of one crew run.
+
+    Each entry holds the kind of exchange ("zapper" or "llm"), its name (the
+    GraphQL operation or the LLM route), the request, the response and how
+    long it took. On replay a request gets the first unplayed recording with
+    the same key, and a request repeated more often than it was recorded
+    gets its last recording again. Anything else raises CassetteMiss, unless
+    ``match`` is "lenient": then it gets the next unplayed recording of the
+    same kind and name in recorded order (e.g. for a prompt or a day range
+    that depends on the current time), and each such fallback is reported.
+    """
+
+    def __init__(self, path: str, mode: str = "record", latency: str = "original",
+                 entries: Optional[List[Dict[str, Any]]] = None, match: str = "strict"):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(CASSETTE_MODES)}")
+        if latency not in REPLAY_LATENCIES:
+            raise ValueError(f"Unknown replay latency {latency!r}; expected one of {', '.join(REPLAY_LATENCIES)}")
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown cassette match mode {match!r}; expected one of {', '.join(MATCH_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.match = match
+        self.entries: List[Dict[str, Any]] = entries or []
+        self.hits = 0
+        self.fallbacks = 0
+        self._played = [False] * len(self.entries)
+        self._by_key: Dict[str, Deque[int]] = {}
+        self._by_name: Dict[Tuple[str, str], Deque[int]] = {}
+        self._last_by_key: Dict[str, int] = {}
+        for index, entry in enumerate(self.entries):
+            self._by_key.setdefault(entry["key"], deque()).append(index)
+            self._by_name.setdefault((entry["kind"], entry["name"]), deque()).append(index)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, latency: str = "original", match: str = "strict") -> "Cassette":
+        """Open a recorded cassette for replay."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')!r} in {path}")
+        return cls(path, "replay", latency, data.get("entries") or [], match)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, kind: str, name: str, request: Dict[str, Any], response: Dict[str, Any], seconds: float) -> None:
+        """Append one exchange; ``request`` must not change afterwards."""
+        entry = {
+            "kind": kind,
+            "name": name,
+            "key": request_key(kind, name, request),
+            "request": request,
+            "response": response,
+            "seconds": round(seconds, 6)
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def play(self, kind: str, name: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Recorded response to a request, after its recorded latency unless latency is "none"."""
+        key = request_key(kind, name, request)
+        with self._lock:
+            index = self._next(self._by_key.get(key))
+            if index is None:
+                index = self._last_by_key.get(key)
+            if index is not None:
+                self.hits += 1
+            else:
+                if self.match == "lenient":
+                    index = self._next(self._by_name.get((kind, name)))
+                if index is None:
+                    raise CassetteMiss(f"No recorded {kind} exchange for {name} matches this request in {self.path}")
+                self.fallbacks += 1
+                print(f"Cassette: no exact recording of this {kind} {name} request; "
+                      f"replaying recording #{index} in recorded order")
+            self._played[index] = True
+            self._last_by_key[key] = index
+            entry = self.entries[index]
+        if self.latency == "original":
+            time.sleep(entry["seconds"])
+        return entry["response"]
+
+    def _next(self, indices: Optional[Deque[int]]) -> Optional[int]:
+        """First unplayed entry of a queue, dropping played ones from its head."""
+        while indices:
+            if not self._played[indices[0]]:
+                return indices.popleft()
+            indices.popleft()
+        return None
+
+    def save(self) -> str:
+        """Write the recorded exchanges to the cassette file."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "recorded_at": datetime.now().isoformat(), "entries": self.entries}
+        with opener(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        return self.path
+
+    def summary(self) -> str:
+        """One-line description of what was recorded or replayed."""
+        if self.recording:
+            counts = {kind: sum(1 for entry in self.entries if entry["kind"] == kind) for kind in ("zapper", "llm")}
+            return f"recorded {counts['zapper']} Zapper and {counts['llm']} LLM exchanges to {self.path}"
+        return (f"replayed {sum(self._played)} of {len(self.entries)} recorded exchanges from {self.path} "
+                f"({self.hits} matched exactly, {self.fallbacks} by order)")
+
+
+# Cassette in use. Process-wide rather than per context: requests are also
+# made from worker threads (prefetching, price lookups, hedges)
+_active: Optional[Cassette] = None
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Cassette being recorded or replayed, if any."""
+    return _active
+
+
+@contextmanager
+def use_cassette(path: Optional[str], mode: str = "replay", latency: str = "original", match: str = "strict"):
+    """Record every Zapper and LLM exchange inside the block to ``path``, or replay them from it.
+
+    When ``path`` is None the block runs untouched. A recording is written
+    when the block exits, also after a failure.
+    """
+    global _active
+    if not path:
+        yield None
+        return
+
+    cassette = Cassette.load(path, latency, match) if mode == "replay" else Cassette(path, mode, latency, match=match)
+    _active = cassette
+    try:
+        yield cassette
+    finally:
+        _active = None
+        if cassette.recording:
+            cassette.save()
+        print(f"Cassette: {cassette.summary()}")
+
+
+def cassette_from_env():
+    """use_cassette() configured by ONCHAIN_CASSETTE, ONCHAIN_CASSETTE_MODE, ONCHAIN_CASSETTE_LATENCY and ONCHAIN_CASSETTE_MATCH."""
+    return use_cassette(
+        os.getenv("ONCHAIN_CASSETTE"),
+        os.getenv("ONCHAIN_CASSETTE_MODE", "replay").strip().lower(),
+        os.getenv("ONCHAIN_CASSETTE_LATENCY", "original").strip().lower(),
+        os.getenv("ONCHAIN_CASSETTE_MATCH", "strict").strip().lower()
+    )
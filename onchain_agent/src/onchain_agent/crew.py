@@ -1,10 +1,12 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
-from dotenv import load_dotenv
+from crewai.project import CrewBase, agent, crew, task, before_kickoff
 from crewai.memory import LongTermMemory
 from crewai import LLM
-from crewai.memory.storage import ltm_sqlite_storage
 from pathlib import Path
+from typing import Dict, Any, Optional
+from datetime import datetime
+import uuid
+from crewai.tools import BaseTool
      
 # Import all Zapper API tools
 from onchain_agent.tools import (
@@ -13,29 +15,56 @@ from onchain_agent.tools import (
     TokenPriceTool,
     TransactionDetailsTool,
     AppTransactionsTool,
-    SearchTool
+    SearchTool,
+    BalanceHistoryTool,
+    PnLTool,
+    FeeAnalyticsTool
 )
 
-# Load environment variables for API keys
+from onchain_agent import events, tracing
+from onchain_agent.llm_routing import get_llm_router
+from onchain_agent.memory_storage import get_ltm_storage
+
 import os
-load_dotenv()  # This loads the variables from .env
-OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
-
-llm = LLM(
-    model="openrouter/google/gemini-2.5-flash-preview:thinking",
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY,
-    temperature=0.5,
-    max_tokens=50000
-) 
-
-# llm2 = LLM(
-#     model="openrouter/deepseek/deepseek-r1",
-#     base_url="https://openrouter.ai/api/v1",
-#     api_key=OPENROUTER_API_KEY,
-#     temperature=0.5,
-#     max_tokens=30000
-# )
+import time
+
+# LLM clients (and .env) are loaded when the crew first builds its agents, not at import;
+# which model each agent and task runs on is set in config/llms.yaml
+def get_llm(agent_name: Optional[str] = None) -> LLM:
+    """LLM client of an agent's route (the default route when no agent is given)."""
+    router = get_llm_router()
+    if agent_name is None:
+        return router.llm(router.default_route)
+    return router.llm_for_agent(agent_name)
+
+
+# File name of the final report inside a run's output directory
+REPORT_FILE = "onchain_intelligence_report.md"
+
+
+def new_run_id() -> str:
+    """Unique, time-sortable ID for a crew run."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class AnalysisRun:
+    """Handle to one crew run: where its outputs live and what it returned."""
+
+    def __init__(self, run_id: str, output_dir: Path, result: Any = None):
+        self.run_id = run_id
+        self.output_dir = output_dir
+        self.result = result
+
+    @property
+    def report_path(self) -> Path:
+        return self.output_dir / REPORT_FILE
+
+    def read_report(self) -> Optional[str]:
+        """Contents of this run's report file, or None if it was not written."""
+        try:
+            return self.report_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
 
 
 @CrewBase
@@ -52,13 +81,127 @@ class OnchainAgentCrew():
     tasks_config = 'config/tasks.yaml'
  
 
-    def __init__(self):
-        """Initialize the Audience Analysis Crew."""
+    def __init__(self, tools: Optional[Dict[str, BaseTool]] = None, run_id: Optional[str] = None,
+                 output_root: str = "outputs", memory_partition: Optional[str] = None):
+        """Initialize the Audience Analysis Crew.
+        
+        ``tools`` maps tool class names to instances shared with other crews
+        (e.g. by the analysis service), so their result caches stay warm
+        between runs. Tools not in the mapping are created per agent.
+        
+        Each crew writes its outputs to ``<output_root>/runs/<run_id>`` so
+        concurrent runs never overwrite each other's report. ``output_root``
+        must be a relative path (crewai rejects absolute output files).
+        
+        ``memory_partition`` (e.g. a wallet address) gives the crew its own
+        long-term memory database; None uses the shared one.
+        """
         super().__init__()
+        self._shared_tools = tools or {}
+        self.run_id = run_id or new_run_id()
+        self.output_dir = Path(output_root) / "runs" / self.run_id
+        self.memory_partition = memory_partition
         
         # Set up output directories
-        Path("outputs").mkdir(exist_ok=True, parents=True)
+        self.output_dir.mkdir(exist_ok=True, parents=True)
         Path("memory").mkdir(exist_ok=True, parents=True) 
+        
+        # Open trace spans for the task and agent iteration in progress
+        self._trace_task_index = 0
+        self._trace_task_span = None
+        self._trace_step_span = None
+        self._trace_step = 0
+        self._task_started_at = time.perf_counter()
+        
+        # Agent LLMs replaced while a task with its own route runs
+        self._agent_llms: Dict[int, LLM] = {}
+
+    def _tool(self, tool_class):
+        """Shared instance of ``tool_class`` if one was provided, else a new one."""
+        return self._shared_tools.get(tool_class.__name__) or tool_class()
+
+    # Progress hooks: feed the trace (tracing.trace_run) and the event stream
+    # (events.stream_run); both are no-ops unless the run is wrapped in them
+    @before_kickoff
+    def start_run_trace(self, inputs):
+        """Open the trace span of the first task when the crew starts."""
+        self._trace_task_index = 0
+        self._begin_task_trace()
+        return inputs
+
+    def _begin_task_trace(self):
+        """Announce the next task and open spans for it and its first agent iteration."""
+        if self._trace_task_index >= len(self.tasks):
+            return
+        task = self.tasks[self._trace_task_index]
+        self._route_task_llm(task)
+        agent_role = task.agent.role if task.agent else None
+        self._task_started_at = time.perf_counter()
+        events.emit(
+            "task_started", task=task.name, agent=agent_role,
+            index=self._trace_task_index, total=len(self.tasks)
+        )
+
+        tracer = tracing.get_active_tracer()
+        if tracer is None:
+            return
+        self._trace_task_span = tracer.begin(f"task:{task.name}", "task", agent=agent_role)
+        self._trace_step = 1
+        self._trace_step_span = tracer.begin("agent_iteration 1", "agent")
+
+    def _route_task_llm(self, task):
+        """Give the task's agent the task's LLM route, if it has one, else the agent's own."""
+        agent = task.agent
+        if agent is None:
+            return
+        agent_llm = self._agent_llms.setdefault(id(agent), agent.llm)
+        route = get_llm_router().route_for_task(task.name)
+        agent.llm = get_llm_router().llm(route) if route else agent_llm
+
+    def _current_task_name(self):
+        if self._trace_task_index < len(self.tasks):
+            return self.tasks[self._trace_task_index].name
+        return None
+
+    def _on_step(self, step_output):
+        """Step callback: report the agent step, close its iteration span and open the next one."""
+        tool_name = getattr(step_output, "tool", None)
+        events.emit(
+            "agent_step", task=self._current_task_name(),
+            thought=events.preview(getattr(step_output, "thought", None)),
+            tool=tool_name, tool_input=events.preview(getattr(step_output, "tool_input", None)),
+            final=tool_name is None
+        )
+
+        tracer = tracing.get_active_tracer()
+        if tracer is None:
+            return
+        tracer.end(self._trace_step_span, tool=tool_name, final=tool_name is None)
+        self._trace_step_span = None
+        if tool_name is not None:
+            self._trace_step += 1
+            self._trace_step_span = tracer.begin(f"agent_iteration {self._trace_step}", "agent")
+
+    def _on_task_complete(self, task_output):
+        """Task callback: report the finished task, close its spans and start the next one."""
+        output = getattr(task_output, "raw", "") or ""
+        events.emit(
+            "task_finished", task=self._current_task_name(), index=self._trace_task_index,
+            seconds=time.perf_counter() - self._task_started_at, output=events.preview(output)
+        )
+        # Full output, so callers can show each task's result as soon as it is ready
+        events.emit(
+            "task_output", task=self._current_task_name(), index=self._trace_task_index,
+            total=len(self.tasks), output=output
+        )
+
+        tracer = tracing.get_active_tracer()
+        if tracer is not None:
+            tracer.end(self._trace_step_span)
+            tracer.end(self._trace_task_span, output_chars=len(output))
+            self._trace_step_span = self._trace_task_span = None
+        self._trace_task_index += 1
+        self._begin_task_trace()
 
 
     # Portfolio Intelligence Analyst Agent
@@ -67,12 +210,14 @@ class OnchainAgentCrew():
         """Portfolio Intelligence Analyst agent with portfolio analysis tools."""
         return Agent( 
             config=self.agents_config['portfolio_intelligence_analyst'],
-            llm=llm,
+            llm=get_llm('portfolio_intelligence_analyst'),
             verbose=True,
             tools=[
-                PortfolioTool(),
-                TokenPriceTool(),
-                SearchTool()
+                self._tool(PortfolioTool),
+                self._tool(TokenPriceTool),
+                self._tool(PnLTool),
+                self._tool(FeeAnalyticsTool),
+                self._tool(SearchTool)
             ],
             max_rpm=40,
             max_iter=10
@@ -86,14 +231,16 @@ class OnchainAgentCrew():
             config=self.agents_config['transaction_pattern_specialist'],
             verbose=True,
             tools=[
-                TransactionHistoryTool(),
-                TransactionDetailsTool(),
-                AppTransactionsTool(),
-                SearchTool() 
+                self._tool(TransactionHistoryTool),
+                self._tool(BalanceHistoryTool),
+                self._tool(FeeAnalyticsTool),
+                self._tool(TransactionDetailsTool),
+                self._tool(AppTransactionsTool),
+                self._tool(SearchTool) 
             ],
             max_rpm=20,
             max_iter=10,
-            llm=llm
+            llm=get_llm('transaction_pattern_specialist')
         )
 
     # Cross-Chain Investment Strategist Agent
@@ -103,10 +250,11 @@ class OnchainAgentCrew():
         return Agent(
             config=self.agents_config['cross_chain_investment_strategist'],
             verbose=True,
-            llm=llm,
+            llm=get_llm('cross_chain_investment_strategist'),
             tools=[
-                PortfolioTool(),
-                SearchTool()
+                self._tool(PortfolioTool),
+                self._tool(PnLTool),
+                self._tool(SearchTool)
             ],
             max_rpm=20,
             max_iter=10  
@@ -119,7 +267,7 @@ class OnchainAgentCrew():
         return Agent(
             config=self.agents_config['strategic_intelligence_synthesizer'],
             verbose=True,
-            llm=llm,
+            llm=get_llm('strategic_intelligence_synthesizer'),
             max_rpm=20,
             max_iter=6
         )
@@ -173,9 +321,14 @@ class OnchainAgentCrew():
                 self.transaction_pattern_analysis(),
                 self.investment_opportunity_identification()
             ],  # Use all previous tasks as context
-            output_file= "outputs/onchain_intelligence_report.md"  # Save final report to file
+            output_file=str(self.output_dir / REPORT_FILE)  # Save final report to this run's directory
         )
 
+    def run_analysis(self, inputs: Dict[str, Any]) -> AnalysisRun:
+        """Kick off the crew and return a handle to this run's result and report."""
+        result = self.crew().kickoff(inputs=inputs)
+        return AnalysisRun(self.run_id, self.output_dir, result)
+
     # Crew Definition with Sequential Process
     @crew
     def crew(self) -> Crew:
@@ -185,10 +338,10 @@ class OnchainAgentCrew():
             tasks=self.tasks,
             process=Process.sequential, 
             verbose=True,
+            step_callback=self._on_step,
+            task_callback=self._on_task_complete,
             long_term_memory=LongTermMemory(
-                storage=ltm_sqlite_storage.LTMSQLiteStorage(
-                    db_path="memory/onchain_memory.db"
-                )
+                storage=get_ltm_storage(self.memory_partition)
             )
             
         )
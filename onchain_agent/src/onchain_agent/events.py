@@ -0,0 +1,139 @@
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, List, Optional
+
+# Longest text (thoughts, tool input, task output) carried in an event
+PREVIEW_CHARS = 500
+
+
+def preview(text: Any, limit: int = PREVIEW_CHARS) -> str:
+    """Shorten text for an event payload."""
+    text = "" if text is None else str(text).strip()
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class RunEvent:
+    """One progress event of a crew run."""
+
+    __slots__ = ("seq", "type", "timestamp", "data")
+
+    def __init__(self, seq: int, event_type: str, data: Dict[str, Any]):
+        self.seq = seq
+        self.type = event_type
+        self.timestamp = time.time()
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "type": self.type, "timestamp": self.timestamp, **self.data}
+
+
+class EventStream:
+    """Ordered, bounded event log of one run that readers poll or wait on.
+
+    The crew publishes from its kickoff thread; each reader keeps its own
+    cursor (the last ``seq`` it saw), so any number of readers can follow the
+    same run and only see that run's events. The oldest events are dropped
+    once ``max_events`` are buffered. Subscribers are called synchronously
+    with each event as it is published.
+    """
+
+    def __init__(self, run_id: str, max_events: int = 1000):
+        self.run_id = run_id
+        self.closed = False
+        self._events: deque = deque(maxlen=max_events)
+        self._seq = itertools.count(1)
+        self._condition = threading.Condition()
+        self._subscribers: List[Callable[[RunEvent], None]] = []
+
+    def subscribe(self, callback: Callable[[RunEvent], None]) -> None:
+        """Call ``callback`` with every event published from now on."""
+        self._subscribers.append(callback)
+
+    def publish(self, event_type: str, **data) -> RunEvent:
+        with self._condition:
+            event = RunEvent(next(self._seq), event_type, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        for callback in self._subscribers:
+            callback(event)
+        return event
+
+    def close(self) -> None:
+        """Mark the run as over and wake any waiting readers."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def since(self, seq: int = 0) -> List[RunEvent]:
+        """Buffered events newer than ``seq``."""
+        with self._condition:
+            return [event for event in self._events if event.seq > seq]
+
+    def wait(self, seq: int = 0, timeout: Optional[float] = None) -> List[RunEvent]:
+        """Block until there are events newer than ``seq`` (or the stream closes)."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.closed or (self._events and self._events[-1].seq > seq), timeout
+            )
+            return [event for event in self._events if event.seq > seq]
+
+
+# Event stream of the run executing in the current context (None when not streaming)
+_active_stream: contextvars.ContextVar = contextvars.ContextVar("active_event_stream", default=None)
+
+
+def get_active_stream() -> Optional[EventStream]:
+    """Event stream of the current run, if one is attached."""
+    return _active_stream.get()
+
+
+def emit(event_type: str, **data) -> None:
+    """Publish an event to the active stream; a no-op when none is attached."""
+    stream = _active_stream.get()
+    if stream is not None:
+        stream.publish(event_type, **data)
+
+
+@contextmanager
+def stream_run(stream: Optional[EventStream]):
+    """Publish the events of everything run inside the block to ``stream``.
+
+    Emits run_started, then run_finished or run_failed, and closes the stream.
+    """
+    if stream is None:
+        yield None
+        return
+
+    token = _active_stream.set(stream)
+    stream.publish("run_started")
+    try:
+        yield stream
+        stream.publish("run_finished")
+    except BaseException as e:
+        stream.publish("run_failed", error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _active_stream.reset(token)
+        stream.close()
+
+
+def format_event(event: RunEvent) -> str:
+    """One-line, human-readable description of an event."""
+    data = event.data
+    if event.type == "task_started":
+        return f"▶ Task {data.get('index', 0) + 1}/{data.get('total', '?')}: {data.get('task')} ({preview(data.get('agent'), 60)})"
+    if event.type == "task_finished":
+        return f"✔ Task {data.get('task')} finished in {data.get('seconds', 0):.1f}s"
+    if event.type == "tool_called":
+        return f"  🔧 {data.get('tool')}: {data.get('outcome')} in {data.get('seconds', 0) * 1000:.0f} ms"
+    if event.type == "agent_step":
+        return f"  💭 {preview(data.get('thought'), 160) or 'Final answer'}"
+    if event.type == "task_output":
+        return f"📄 Output of {data.get('task')} ({len(data.get('output') or '')} chars)"
+    if event.type == "run_failed":
+        return f"✖ Run failed: {data.get('error')}"
+    return event.type.replace("_", " ").capitalize()
@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import yaml
+from crewai import LLM
+from dotenv import load_dotenv
+
+from onchain_agent import events, tracing
+from onchain_agent.cassettes import CassetteMiss, active_cassette
+from onchain_agent.metrics import LLM_CALLS, LLM_CALL_SECONDS
+
+# Default routing table; ONCHAIN_LLM_CONFIG points at another file
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "config" / "llms.yaml"
+
+
+class RoutedLLM(LLM):
+    """crewai LLM that records the latency of every call under its route name.
+
+    Calls are recorded to, or replayed from, the active cassette: text
+    answers as text, and results of the caller's functions as the function
+    call the model made.
+    """
+
+    def __init__(self, route: str, **params):
+        super().__init__(**params)
+        self.route = route
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        started = time.perf_counter()
+        outcome = "error"
+        cassette = active_cassette()
+        recorded_request = self._recorded_request(messages, tools) if cassette is not None else None
+        try:
+            with tracing.span(f"llm:{self.route}", "llm", model=self.model):
+                if cassette is not None and cassette.replaying:
+                    result = self._replay(cassette.play("llm", self.route, recorded_request), available_functions)
+                elif cassette is not None:
+                    calls: List[Tuple[str, Dict[str, Any]]] = []
+                    result = super().call(messages, tools, callbacks, self._recording_functions(available_functions, calls))
+                    cassette.record("llm", self.route, recorded_request, self._recorded_response(result, calls),
+                                    time.perf_counter() - started)
+                else:
+                    result = super().call(messages, tools, callbacks, available_functions)
+            outcome = "ok"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            LLM_CALL_SECONDS.observe(elapsed, self.route, self.model)
+            LLM_CALLS.inc(self.route, self.model, outcome)
+            events.emit("llm_called", route=self.route, model=self.model, outcome=outcome, seconds=elapsed)
+
+    @staticmethod
+    def _recording_functions(available_functions: Optional[Dict[str, Any]],
+                             calls: List[Tuple[str, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Wrap the callable tools of a call so the function calls the model makes are noted in ``calls``."""
+        if not available_functions:
+            return available_functions
+
+        def recording(name: str, function):
+            def call(**arguments):
+                result = function(**arguments)
+                calls.append((name, arguments))
+                return result
+            return call
+
+        return {name: recording(name, function) for name, function in available_functions.items()}
+
+    @staticmethod
+    def _recorded_response(result: Any, calls: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Cassette entry of a call's answer: its text, or the function call that produced its result.
+
+        A function result is replayed by calling the function again with the
+        recorded arguments; the functions run locally, so only the model's
+        choice of call has to be recorded.
+        """
+        if calls:
+            name, arguments = calls[-1]
+            return {"function": name, "arguments": json.loads(json.dumps(arguments, default=str))}
+        if not isinstance(result, str):
+            raise TypeError(f"Cannot record a {type(result).__name__} LLM answer that no function call produced")
+        return {"content": result}
+
+    @staticmethod
+    def _replay(response: Dict[str, Any], available_functions: Optional[Dict[str, Any]]) -> Any:
+        """A call's answer from its cassette entry (see _recorded_response)."""
+        if "function" not in response:
+            return response["content"]
+        function = (available_functions or {}).get(response["function"])
+        if function is None:
+            raise CassetteMiss(f"Recorded LLM call uses function {response['function']!r}, which this call does not offer")
+        return function(**response["arguments"])
+
+    def _recorded_request(self, messages, tools) -> Dict[str, Any]:
+        """The parts of a call that decide its answer, as matched against a cassette (copied: crewai reuses the list)."""
+        return {"model": self.model, "messages": json.loads(json.dumps(messages, default=str)), "tools": tools}
+
+
+class LLMRouter:
+    """Maps agents and tasks to named model routes from a routing table.
+
+    The table (config/llms.yaml) defines ``routes`` (crewai LLM settings plus
+    ``api_key_env``), a ``default_route``, and ``agents`` / ``tasks``
+    mappings from config names to routes. A task's route overrides its
+    agent's route while that task runs. One LLM client is built per route
+    and API key, on first use.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.routes: Dict[str, Dict[str, Any]] = config.get("routes") or {}
+        if not self.routes:
+            raise ValueError("LLM routing config defines no routes")
+        self.default_route = config.get("default_route") or next(iter(self.routes))
+        self.agent_routes: Dict[str, str] = config.get("agents") or {}
+        self.task_routes: Dict[str, str] = config.get("tasks") or {}
+        for route in [self.default_route, *self.agent_routes.values(), *self.task_routes.values()]:
+            if route not in self.routes:
+                raise ValueError(f"Unknown LLM route {route!r}; expected one of {', '.join(self.routes)}")
+        self._llms: Dict[Any, RoutedLLM] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "LLMRouter":
+        with open(path, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f) or {})
+
+    def route_for_agent(self, agent_name: str) -> str:
+        return self.agent_routes.get(agent_name, self.default_route)
+
+    def route_for_task(self, task_name: Optional[str]) -> Optional[str]:
+        """Route overriding the agent's for this task, or None."""
+        return self.task_routes.get(task_name) if task_name else None
+
+    def llm(self, route: str) -> RoutedLLM:
+        """Client of a route (rebuilt if its API key changes)."""
+        params = dict(self.routes[route])
+        api_key_env = params.pop("api_key_env", None)
+        if api_key_env:
+            params["api_key"] = os.environ.get(api_key_env)
+        key = (route, params.get("api_key"))
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                llm = self._llms[key] = RoutedLLM(route, **params)
+            return llm
+
+    def warm(self) -> None:
+        """Build the client of every route."""
+        for route in self.routes:
+            self.llm(route)
+
+    def llm_for_agent(self, agent_name: str) -> RoutedLLM:
+        return self.llm(self.route_for_agent(agent_name))
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> LLMRouter:
+    """Process-wide router, loaded (with .env) on first use."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            load_dotenv()
+            _router = LLMRouter.from_file(os.getenv("ONCHAIN_LLM_CONFIG") or str(DEFAULT_CONFIG_PATH))
+        return _router
+
+
+def latency_by_route() -> Dict[str, Dict[str, Any]]:
+    """Calls, errors and mean/total latency of the LLM calls made so far, per route."""
+    errors: Dict[str, float] = {}
+    for sample in LLM_CALLS.to_dict()["samples"]:
+        if sample["labels"]["outcome"] != "ok":
+            route = sample["labels"]["route"]
+            errors[route] = errors.get(route, 0) + sample["value"]
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for sample in LLM_CALL_SECONDS.to_dict()["samples"]:
+        route = sample["labels"]["route"]
+        entry = summary.setdefault(route, {"models": [], "calls": 0, "errors": 0, "total_seconds": 0.0})
+        entry["models"].append(sample["labels"]["model"])
+        entry["calls"] += sample["count"]
+        entry["total_seconds"] += sample["sum"]
+    for route, entry in summary.items():
+        entry["errors"] = int(errors.get(route, 0))
+        entry["mean_seconds"] = entry["total_seconds"] / entry["calls"] if entry["calls"] else 0.0
+    return summary
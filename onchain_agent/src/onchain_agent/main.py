@@ -2,45 +2,99 @@
 import sys
 import warnings
 import os
+import time
 from datetime import datetime
 
-from onchain_agent.crew import OnchainAgentCrew
+from onchain_agent import cassettes, events, metrics, tracing
+from onchain_agent.tools import request_policy
+
+# The crew (and crewai) is imported inside the commands that run it, so the
+# data-only commands below start without loading the agent framework
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # Main execution file for the Onchain AI Agent System
 # Keeps main execution flow in main.py as per project rules
 
+def _print_task_output(event):
+    """Print a finished task's output (subscriber of the run's event stream)."""
+    if event.type != "task_output":
+        return
+    index = event.data.get("index", 0) + 1
+    print(f"\n## Task {index}/{event.data.get('total')} complete: {event.data.get('task')}")
+    print("------------------------------------------")
+    print(event.data.get("output") or "(no output)")
+    print("------------------------------------------\n")
+
+def _print_llm_latency():
+    """Print the LLM calls and latency of each model route used by the run."""
+    from onchain_agent.llm_routing import latency_by_route
+
+    routes = latency_by_route()
+    if not routes:
+        return
+    print("## LLM Latency by Route")
+    for route, stats in sorted(routes.items()):
+        print(
+            f"{route} ({', '.join(stats['models'])}): {stats['calls']} calls, "
+            f"{stats['errors']} errors, mean {stats['mean_seconds']:.2f}s, total {stats['total_seconds']:.1f}s"
+        )
+    print("------------------------------------------\n")
+
 def run():
     """
     Run the Onchain AI Agent crew for blockchain analysis.
     
     This function initializes the crew with the necessary inputs,
-    including wallet addresses and networks to analyze.
+    including wallet addresses and networks to analyze. Set ONCHAIN_CASSETTE
+    (and ONCHAIN_CASSETTE_MODE) to record or replay the run's traffic.
     """
+    return _run_crew(cassettes.cassette_from_env())
+
+def _run_crew(cassette):
+    """Run the crew on the sample inputs inside a cassette context (see cassettes.use_cassette)."""
     # Sample inputs - replace with actual addresses for analysis
     inputs = {
         'wallet_address': '0x267be1C1D684F78cb4F6a176C4911b741E4Ffdc0', 
         'networks': 'ethereum,polygon,bnb chain'
     }
     
+    # Expose tool and API metrics if ONCHAIN_METRICS_PORT / ONCHAIN_METRICS_FILE are set
+    metrics.configure_from_env()
+    
     print("\n## Starting Onchain AI Agent Analysis")
     print("------------------------------------------")
     print(f"Analyzing wallet: {inputs['wallet_address']}")
     print(f"Networks: {inputs['networks']}")
     print("------------------------------------------\n")
     
+    from onchain_agent.crew import OnchainAgentCrew
+    from onchain_agent.memory_storage import partition_for
+    
+    agent_crew = OnchainAgentCrew(memory_partition=partition_for(inputs['wallet_address']))
+    
+    # Print each task's output as soon as it finishes, ending with the report
+    progress = events.EventStream(agent_crew.run_id)
+    progress.subscribe(_print_task_output)
+    
     try:
-        # Execute the crew with our inputs
-        result = OnchainAgentCrew().crew().kickoff(inputs=inputs)
+        # Execute the crew with our inputs, traced to ONCHAIN_TRACE_DIR if set
+        # Zapper requests share the ONCHAIN_RUN_BUDGET time budget, if set
+        started = time.perf_counter()
+        with cassette, events.stream_run(progress), \
+                tracing.trace_run("onchain_analysis", os.getenv("ONCHAIN_TRACE_DIR")), \
+                request_policy.run_budget(request_policy.budget_from_env()):
+            analysis = agent_crew.run_analysis(inputs)
         
         # Display results
         print("\n## Analysis Complete")
         print("------------------------------------------")
-        print("Intelligence report saved to: onchain_intelligence_report.md")
+        print(f"Intelligence report saved to: {analysis.report_path}")
+        print(f"Run time: {time.perf_counter() - started:.2f}s")
         print("------------------------------------------\n")
+        _print_llm_latency()
         
-        return result
+        return analysis.result
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         raise Exception(f"An error occurred while running the Onchain AI Agent crew: {e}")
@@ -53,8 +107,10 @@ def train():
     inputs = {
         "topic": "AI LLMs"
     }
+    from onchain_agent.crew import OnchainAgentCrew
+
     try:
-        OnchainAgent().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        OnchainAgentCrew().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -62,13 +118,45 @@ def train():
 def replay():
     """
     Replay the crew execution from a specific task.
+    
+    This reruns the task against the live APIs; use replay_run to rerun a
+    whole recorded run offline.
     """
+    from onchain_agent.crew import OnchainAgentCrew
+
     try:
-        OnchainAgent().crew().replay(task_id=sys.argv[1])
+        OnchainAgentCrew().crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+def record_run():
+    """
+    Run the crew and record every Zapper and LLM exchange to a cassette.
+    
+    Usage: record_run <cassette.json[.gz]>
+    """
+    if len(sys.argv) < 2:
+        raise Exception("Usage: record_run <cassette.json[.gz]>")
+    return _run_crew(cassettes.use_cassette(sys.argv[1], "record"))
+
+def replay_run():
+    """
+    Rerun the crew offline, serving Zapper and LLM responses from a cassette.
+    
+    With latency "original" each response waits as long as it did when
+    recorded; "none" answers immediately, which leaves only the crew's own
+    orchestration time. Requests must match their recording exactly unless
+    the match mode is "lenient".
+    
+    Usage: replay_run <cassette.json[.gz]> [original|none] [strict|lenient]
+    """
+    if len(sys.argv) < 2:
+        raise Exception("Usage: replay_run <cassette.json[.gz]> [original|none] [strict|lenient]")
+    latency = sys.argv[2] if len(sys.argv) > 2 else "original"
+    match = sys.argv[3] if len(sys.argv) > 3 else "strict"
+    return _run_crew(cassettes.use_cassette(sys.argv[1], "replay", latency, match))
+
 def test():
     """
     Test the crew execution and returns the results.
@@ -77,8 +165,122 @@ def test():
         "topic": "AI LLMs",
         "current_year": str(datetime.now().year)
     }
+    from onchain_agent.crew import OnchainAgentCrew
+
     try:
-        OnchainAgent().crew().test(n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs)
+        OnchainAgentCrew().crew().test(n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+
+def monitor():
+    """
+    Continuously monitor protocol activity for a set of apps.
+    
+    Usage: monitor <app_slug[,app_slug...]> [network]
+    New events are appended to outputs/app_events.jsonl and stored in the
+    SQLite database named by ONCHAIN_APP_EVENTS_DB (default: memory/app_events.db),
+    which the App Transactions Tool reads before calling the API.
+    """
+    from onchain_agent.monitor import AppActivityMonitor
+    from onchain_agent.tools.app_event_sinks import JsonlEventSink, get_event_sink
+
+    if len(sys.argv) < 2:
+        raise Exception("Usage: monitor <app_slug[,app_slug...]> [network]")
+
+    _load_env()
+    app_ids = sys.argv[1].split(",")
+    network = sys.argv[2] if len(sys.argv) > 2 else "ethereum"
+    db_path = os.environ.setdefault("ONCHAIN_APP_EVENTS_DB", "memory/app_events.db")
+
+    activity_monitor = AppActivityMonitor(
+        app_ids,
+        network=network,
+        sinks=[JsonlEventSink("outputs/app_events.jsonl"), get_event_sink(db_path)]
+    )
+
+    def report(app_id, events):
+        print(f"{app_id}: {len(events)} new transaction(s)")
+
+    print(f"\n## Monitoring {', '.join(activity_monitor.app_ids)} on {network} (Ctrl+C to stop)")
+    try:
+        activity_monitor.run(on_events=report)
+    except KeyboardInterrupt:
+        activity_monitor.stop()
+
+
+def _load_env():
+    """Load .env for the data-only commands (the crew loads it when building its LLM)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+def portfolio():
+    """
+    Print the portfolio summary for an address without starting the crew.
+    
+    Usage: portfolio <address>
+    """
+    from onchain_agent.tools.portfolio_data import PortfolioFormatter, fetch_portfolio
+
+    if len(sys.argv) < 2:
+        raise Exception("Usage: portfolio <address>")
+
+    _load_env()
+    address = sys.argv[1]
+    print(PortfolioFormatter()._format_portfolio_data(fetch_portfolio(address), address))
+
+def history():
+    """
+    Print recent transactions for an address without starting the crew.
+    
+    Usage: tx_history <address> [network] [limit]
+    """
+    from onchain_agent.tools.zapper_base import ZapperBase
+    from onchain_agent.tools.transaction_history_data import TransactionHistoryFormatter, fetch_transaction_history
+
+    if len(sys.argv) < 2:
+        raise Exception("Usage: tx_history <address> [network] [limit]")
+
+    _load_env()
+    address = sys.argv[1]
+    chain_id = ZapperBase.get_chain_id(sys.argv[2]) if len(sys.argv) > 2 else None
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    result = fetch_transaction_history(address, chain_id, limit)
+    print(TransactionHistoryFormatter()._format_transaction_history(result, address))
+
+def price():
+    """
+    Print price data for a token without starting the crew.
+    
+    Usage: token_price <token_address> [network] [days]
+    """
+    from onchain_agent.tools.zapper_base import ZapperBase
+    from onchain_agent.tools.token_price_data import TokenPriceFormatter, fetch_token_price
+
+    if len(sys.argv) < 2:
+        raise Exception("Usage: token_price <token_address> [network] [days]")
+
+    _load_env()
+    token_address = sys.argv[1]
+    chain_id = ZapperBase.get_chain_id(sys.argv[2] if len(sys.argv) > 2 else "ethereum")
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    result = fetch_token_price(token_address, chain_id, days)
+    print(TokenPriceFormatter()._format_price_data(result, token_address))
+
+def compact_memory():
+    """
+    Apply the long-term memory retention policy and reclaim free space.
+    
+    Usage: compact_memory
+    Compacts the shared database and every per-wallet partition.
+    """
+    from pathlib import Path
+    from onchain_agent.memory_storage import DEFAULT_DB_PATH, PARTITION_DIR, ScalableLTMStorage
+
+    paths = [Path(DEFAULT_DB_PATH)] + sorted(Path(PARTITION_DIR).glob("*.db"))
+    for path in paths:
+        if not path.exists():
+            continue
+        before = path.stat().st_size
+        deleted = ScalableLTMStorage(str(path)).compact()
+        print(f"{path}: {deleted} row(s) pruned, {before / 1024:.0f} KiB -> {path.stat().st_size / 1024:.0f} KiB")
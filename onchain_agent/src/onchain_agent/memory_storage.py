@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+
+# Shared long-term memory database, and the directory of per-wallet partitions
+DEFAULT_DB_PATH = "memory/onchain_memory.db"
+PARTITION_DIR = "memory/ltm"
+
+
+def _task_key(task_description: Optional[str]) -> str:
+    """Fixed-size lookup key for a (long) task description."""
+    return hashlib.blake2b((task_description or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ScalableLTMStorage(LTMSQLiteStorage):
+    """Long-term memory storage that stays fast as runs accumulate.
+
+    Drop-in replacement for crewai's LTMSQLiteStorage on the same schema:
+
+    * WAL journaling, so readers never wait for a writer, with a busy timeout
+      instead of failing on a locked database
+    * one persistent connection per thread instead of a connect per call
+    * a hashed ``task_key`` column indexed with ``datetime``, so load() is an
+      index range scan instead of a full table scan on long description text
+    * retention: each save keeps only the newest ``max_rows_per_task`` rows
+      of its task, and every ``prune_every`` saves rows older than
+      ``retention_days`` are expired; both deletes are index range scans and
+      freed pages are returned incrementally
+    * compact() applies the whole policy to every task and rebuilds the file
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, retention_days: Optional[float] = 90,
+                 max_rows_per_task: Optional[int] = 200, prune_every: int = 100):
+        self.retention_days = retention_days
+        self.max_rows_per_task = max_rows_per_task
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._saves = 0
+        self._saves_lock = threading.Lock()
+        super().__init__(db_path=db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_db(self):
+        """Create the table and index, migrating crewai's schema in place."""
+        try:
+            conn = self._connect()
+            with conn:
+                # Only takes effect on a new database; existing ones need compact() once
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS long_term_memories (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        task_description TEXT,
+                        metadata TEXT,
+                        datetime TEXT,
+                        score REAL
+                    )
+                    """
+                )
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(long_term_memories)")}
+                if "task_key" not in columns:
+                    conn.execute("ALTER TABLE long_term_memories ADD COLUMN task_key TEXT")
+                conn.create_function("ltm_task_key", 1, _task_key, deterministic=True)
+                conn.execute(
+                    "UPDATE long_term_memories SET task_key = ltm_task_key(task_description) WHERE task_key IS NULL"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_ltm_task_key_datetime "
+                    "ON long_term_memories (task_key, datetime DESC)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_ltm_datetime ON long_term_memories (datetime)")
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred during database initialization: {e}",
+                color="red",
+            )
+
+    def save(self, task_description: str, metadata: Dict[str, Any], datetime: str,
+             score: Union[int, float]) -> None:
+        """Saves data to the LTM table, pruning old rows every ``prune_every`` saves."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO long_term_memories (task_key, task_description, metadata, datetime, score)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (_task_key(task_description), task_description, json.dumps(metadata), datetime, score),
+                )
+                if self.max_rows_per_task is not None:
+                    conn.execute(
+                        """
+                        DELETE FROM long_term_memories
+                        WHERE task_key = ?1 AND id NOT IN (
+                            SELECT id FROM long_term_memories WHERE task_key = ?1
+                            ORDER BY datetime DESC, id DESC LIMIT ?2
+                        )
+                        """,
+                        (_task_key(task_description), self.max_rows_per_task),
+                    )
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while saving to LTM: {e}",
+                color="red",
+            )
+            return
+
+        with self._saves_lock:
+            self._saves += 1
+            due = self.prune_every and self._saves % self.prune_every == 0
+        if due:
+            self.expire()
+
+    def load(self, task_description: str, latest_n: int) -> Optional[List[Dict[str, Any]]]:
+        """Queries the LTM table by task description through the task_key index."""
+        try:
+            rows = self._connect().execute(
+                """
+                SELECT metadata, datetime, score
+                FROM long_term_memories
+                WHERE task_key = ? AND task_description = ?
+                ORDER BY datetime DESC, score ASC
+                LIMIT ?
+                """,
+                (_task_key(task_description), task_description, int(latest_n)),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while querying LTM: {e}",
+                color="red",
+            )
+            return None
+
+        if not rows:
+            return None
+        return [
+            {"metadata": json.loads(row[0]), "datetime": row[1], "score": row[2]}
+            for row in rows
+        ]
+
+    def expire(self) -> int:
+        """Delete rows older than ``retention_days``; returns the number deleted."""
+        if self.retention_days is None:
+            return 0
+        # crewai stores datetime as a stringified UNIX timestamp, which sorts as text
+        cutoff = str((datetime.now() - timedelta(days=self.retention_days)).timestamp())
+        try:
+            conn = self._connect()
+            with conn:
+                deleted = conn.execute("DELETE FROM long_term_memories WHERE datetime < ?", (cutoff,)).rowcount
+            if deleted:
+                conn.execute("PRAGMA incremental_vacuum")
+            return deleted
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while pruning LTM: {e}",
+                color="red",
+            )
+            return 0
+
+    def prune(self) -> int:
+        """Apply the whole retention policy to every task; returns the number of rows deleted."""
+        deleted = self.expire()
+        if self.max_rows_per_task is None:
+            return deleted
+        try:
+            conn = self._connect()
+            with conn:
+                deleted += conn.execute(
+                    """
+                    DELETE FROM long_term_memories WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY task_key ORDER BY datetime DESC, id DESC
+                            ) AS position
+                            FROM long_term_memories
+                        ) WHERE position > ?
+                    )
+                    """,
+                    (self.max_rows_per_task,),
+                ).rowcount
+            conn.execute("PRAGMA incremental_vacuum")
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while pruning LTM: {e}",
+                color="red",
+            )
+        return deleted
+
+    def compact(self) -> int:
+        """Prune, then rebuild the file to reclaim all free space (blocks writers while it runs)."""
+        deleted = self.prune()
+        try:
+            conn = self._connect()
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while compacting LTM: {e}",
+                color="red",
+            )
+        return deleted
+
+    def reset(self) -> None:
+        """Resets the LTM table with error handling."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM long_term_memories")
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while deleting all rows in LTM: {e}",
+                color="red",
+            )
+
+
+def partition_db_path(wallet_address: str) -> str:
+    """Database file of a wallet's memory partition."""
+    name = re.sub(r"[^0-9a-z_-]", "_", wallet_address.strip().lower())[:64] or "default"
+    return str(Path(PARTITION_DIR) / f"{name}.db")
+
+
+def partition_for(wallet_address: Optional[str]) -> Optional[str]:
+    """Memory partition for a run: the wallet when ONCHAIN_MEMORY_PARTITION=wallet, else shared."""
+    if wallet_address and os.getenv("ONCHAIN_MEMORY_PARTITION", "").lower() == "wallet":
+        return wallet_address
+    return None
+
+
+_storages: Dict[str, ScalableLTMStorage] = {}
+_storages_lock = threading.Lock()
+
+
+def get_ltm_storage(partition: Optional[str] = None) -> ScalableLTMStorage:
+    """Return the process-wide storage of a memory partition (None is the shared database).
+
+    Retention is read from ONCHAIN_LTM_RETENTION_DAYS and ONCHAIN_LTM_MAX_ROWS_PER_TASK.
+    """
+    db_path = partition_db_path(partition) if partition else DEFAULT_DB_PATH
+    with _storages_lock:
+        storage = _storages.get(db_path)
+        if storage is None:
+            storage = _storages[db_path] = ScalableLTMStorage(
+                db_path,
+                retention_days=float(os.getenv("ONCHAIN_LTM_RETENTION_DAYS", "90")),
+                max_rows_per_task=int(os.getenv("ONCHAIN_LTM_MAX_ROWS_PER_TASK", "200"))
+            )
+        return storage
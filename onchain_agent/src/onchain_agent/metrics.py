@@ -0,0 +1,331 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Optional, Sequence, Tuple
+
+from onchain_agent import events, tracing
+
+# Latency buckets in seconds and payload size buckets in bytes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = lock
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value:g}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "help": self.help,
+            "samples": [
+                {"labels": dict(zip(self.label_names, labels)), "value": value}
+                for labels, value in sorted(self._values.items())
+            ]
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float],
+                 lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = lock
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[idx] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        state = self._values.get(label_values)
+        return state[len(self.buckets)] if state else 0
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, state in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, state):
+                le = 'le="%g"' % bound
+                yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {count}"
+            total = state[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {total}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {state[-1]:g}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {total}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = []
+        for labels, state in sorted(self._values.items()):
+            total = state[len(self.buckets)]
+            samples.append({
+                "labels": dict(zip(self.label_names, labels)),
+                "count": total,
+                "sum": state[-1],
+                "mean": state[-1] / total if total else 0.0,
+                "buckets": {f"{bound:g}": count for bound, count in zip(self.buckets, state)}
+            })
+        return {"type": self.kind, "help": self.help, "samples": samples}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Process-wide collection of counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names, self._lock)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, label_names, buckets, self._lock)
+        self._metrics[name] = metric
+        return metric
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return every metric as a JSON-serializable dict."""
+        with self._lock:
+            return {name: metric.to_dict() for name, metric in self._metrics.items()}
+
+    def dump_json(self, path: str) -> None:
+        """Write the JSON form of every metric to a file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+ZAPPER_REQUESTS = REGISTRY.counter(
+    "zapper_requests_total", "Zapper GraphQL requests by outcome.", ("tool", "operation", "status"))
+ZAPPER_REQUEST_SECONDS = REGISTRY.histogram(
+    "zapper_request_seconds", "Zapper GraphQL request latency in seconds.", ("tool", "operation"))
+ZAPPER_RESPONSE_BYTES = REGISTRY.histogram(
+    "zapper_response_bytes", "Zapper GraphQL response body size in bytes.", ("tool", "operation"),
+    buckets=SIZE_BUCKETS)
+ZAPPER_REQUEST_BYTES = REGISTRY.histogram(
+    "zapper_request_bytes", "Zapper GraphQL request body size in bytes.", ("tool", "operation"),
+    buckets=SIZE_BUCKETS)
+ZAPPER_PERSISTED_QUERIES = REGISTRY.counter(
+    "zapper_persisted_queries_total",
+    "Hash-only Zapper requests by result (hit, registered after a miss, or unsupported).",
+    ("tool", "operation", "result"))
+ZAPPER_RETRIES = REGISTRY.counter(
+    "zapper_retries_total", "Additional Zapper requests issued for an operation (retries and hedges).",
+    ("tool", "operation", "reason"))
+ZAPPER_CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "zapper_circuit_transitions_total", "Zapper circuit breaker state changes by new state.", ("state",))
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total", "LLM calls by route, model and outcome.", ("route", "model", "outcome"))
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_seconds", "LLM call latency in seconds by route and model.", ("route", "model"),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0))
+TOOL_CALLS = REGISTRY.counter(
+    "tool_calls_total", "Tool invocations by outcome.", ("tool", "outcome"))
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "tool_call_seconds", "Tool _run latency in seconds.", ("tool",))
+TOOL_CACHE = REGISTRY.counter(
+    "tool_cache_lookups_total", "Tool result cache lookups by result (hit or miss).", ("tool", "result"))
+ANALYSIS_JOBS = REGISTRY.counter(
+    "analysis_jobs_total", "Analysis service jobs by final status.", ("status",))
+ANALYSIS_JOBS_REUSED = REGISTRY.counter(
+    "analysis_jobs_reused_total", "Submissions answered by an existing job for the same wallet and networks.",
+    ("status",))
+ANALYSIS_JOB_SECONDS = REGISTRY.histogram(
+    "analysis_job_seconds", "Analysis service job run time in seconds (excluding queueing).", (),
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0))
+
+_OPERATION_PATTERN = re.compile(r"^\s*(?:query|mutation)\s+(\w+)")
+
+# Tool on whose behalf the current thread is calling the API, used as a label
+_current_tool: contextvars.ContextVar = contextvars.ContextVar("current_tool", default="none")
+
+
+def current_tool() -> str:
+    """Name of the tool currently running in this context."""
+    return _current_tool.get()
+
+
+@contextmanager
+def tool_context(tool: str):
+    """Attribute API calls made inside the block to ``tool``."""
+    token = _current_tool.set(tool)
+    try:
+        yield
+    finally:
+        _current_tool.reset(token)
+
+
+@functools.lru_cache(maxsize=256)
+def operation_name(query: str) -> str:
+    """Name of a GraphQL operation, used as the metric label for a query document."""
+    match = _OPERATION_PATTERN.search(query or "")
+    return match.group(1) if match else "anonymous"
+
+
+def record_cache_lookup(tool: str, hit: bool) -> None:
+    """Count a tool cache hit or miss."""
+    TOOL_CACHE.inc(tool, "hit" if hit else "miss")
+
+
+def cache_hit_ratio(tool: str) -> Optional[float]:
+    """Share of a tool's cache lookups that were hits, or None before any lookup."""
+    hits, misses = TOOL_CACHE.value(tool, "hit"), TOOL_CACHE.value(tool, "miss")
+    return hits / (hits + misses) if hits + misses else None
+
+
+def instrument_tool_run(func: Callable) -> Callable:
+    """Decorator for a tool's _run: records latency, outcome, a trace span and a tool_called event."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        token = _current_tool.set(self.name)
+        try:
+            with tracing.span(f"tool:{self.name}", "tool", input=kwargs or args) as tool_span:
+                result = func(self, *args, **kwargs)
+                if not (isinstance(result, str) and result.startswith("Error")):
+                    outcome = "ok"
+                if tool_span is not None:
+                    tool_span.args["outcome"] = outcome
+            return result
+        finally:
+            _current_tool.reset(token)
+            elapsed = time.perf_counter() - started
+            TOOL_CALL_SECONDS.observe(elapsed, self.name)
+            TOOL_CALLS.inc(self.name, outcome)
+            events.emit("tool_called", tool=self.name, outcome=outcome, seconds=elapsed)
+    return wrapper
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics (Prometheus text) and /metrics.json."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(REGISTRY.to_dict()).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = REGISTRY.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the metrics endpoints from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# Whether configure_from_env() already ran in this process
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_from_env() -> None:
+    """Enable metrics exposure from the environment.
+
+    ONCHAIN_METRICS_PORT starts the scrape endpoint; ONCHAIN_METRICS_FILE
+    writes a JSON dump when the process exits. Only the first call in a
+    process has an effect, so the port is never bound twice.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+
+    port = os.getenv("ONCHAIN_METRICS_PORT")
+    if port:
+        start_metrics_server(int(port), os.getenv("ONCHAIN_METRICS_HOST", "127.0.0.1"))
+
+    path = os.getenv("ONCHAIN_METRICS_FILE")
+    if path:
+        atexit.register(REGISTRY.dump_json, path)
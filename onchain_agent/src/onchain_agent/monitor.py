@@ -0,0 +1,163 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Deque
+
+from onchain_agent.tools.zapper_base import ZapperBase
+from onchain_agent.tools.app_transactions_tool import fetch_app_transactions
+
+
+class AppActivityMonitor:
+    """Continuously poll transactionsForAppV2 for a set of apps.
+
+    Each app is polled on its own adaptive interval: the interval halves while
+    new activity keeps arriving and stretches out while an app is quiet or the
+    API is failing. New events are deduplicated by transaction hash, kept in a
+    bounded per-app buffer and streamed to the configured sinks
+    (see ``tools.app_event_sinks``), so agents can read protocol activity
+    locally instead of querying the API on every question.
+    """
+
+    # Polling interval bounds in seconds
+    MIN_INTERVAL = 15.0
+    MAX_INTERVAL = 600.0
+    # Transactions requested per page
+    PAGE_SIZE = 25
+    # Pages followed through endCursor when a whole page is new
+    MAX_CATCHUP_PAGES = 5
+    # Events kept in memory per app
+    BUFFER_SIZE = 200
+    # Hashes remembered per app for deduplication
+    SEEN_LIMIT = 5000
+    # Query profile of the polls: sinks keep block numbers and app names for downstream readers
+    QUERY_PROFILE = "analytics"
+
+    def __init__(self, app_ids: List[str], network: Optional[str] = "ethereum", sinks: Optional[List[Any]] = None,
+                 min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL):
+        self.app_ids = [app_id.strip() for app_id in app_ids if app_id.strip()]
+        self.chain_id = ZapperBase.get_chain_id(network) if network else None
+        self.sinks = sinks or []
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self._intervals: Dict[str, float] = {app_id: min_interval for app_id in self.app_ids}
+        self._seen: Dict[str, "OrderedDict[str, None]"] = {app_id: OrderedDict() for app_id in self.app_ids}
+        self._buffers: Dict[str, Deque[Dict[str, Any]]] = {
+            app_id: deque(maxlen=self.BUFFER_SIZE) for app_id in self.app_ids
+        }
+        self._stop = threading.Event()
+
+    def _remember(self, app_id: str, tx_hash: str) -> bool:
+        """Record a hash as seen. Returns False if it was already known."""
+        seen = self._seen[app_id]
+        if tx_hash in seen:
+            seen.move_to_end(tx_hash)
+            return False
+        seen[tx_hash] = None
+        while len(seen) > self.SEEN_LIMIT:
+            seen.popitem(last=False)
+        return True
+
+    def poll_app(self, app_id: str) -> List[Dict[str, Any]]:
+        """Fetch the newest activity for one app and return events not seen before."""
+        first_poll = not self._seen[app_id]
+        observed_at = time.time()
+        new_events = []
+        after = None
+
+        for _ in range(self.MAX_CATCHUP_PAGES):
+            result = fetch_app_transactions(app_id, self.chain_id, self.PAGE_SIZE, after=after,
+                                            profile=self.QUERY_PROFILE)
+            connection = ((result or {}).get("data") or {}).get("transactionsForAppV2")
+            if connection is None:
+                errors = (result or {}).get("errors")
+                raise RuntimeError(f"No transactionsForAppV2 data for {app_id}: {errors}")
+
+            page_new = 0
+            for edge in connection.get("edges") or []:
+                node = (edge or {}).get("node") or {}
+                tx = node.get("transaction") or {}
+                tx_hash = tx.get("hash")
+                if not tx_hash or not self._remember(app_id, tx_hash):
+                    continue
+                page_new += 1
+                new_events.append({
+                    "app_id": app_id,
+                    "chain_id": self.chain_id,
+                    "hash": tx_hash,
+                    "timestamp": tx.get("timestamp"),
+                    "observed_at": observed_at,
+                    "node": node
+                })
+
+            # Keep paging only while every event on the page was new, i.e. we
+            # have not yet reached activity seen on the previous poll
+            page_info = connection.get("pageInfo") or {}
+            page_size = len(connection.get("edges") or [])
+            if first_poll or not page_size or page_new < page_size or not page_info.get("hasNextPage"):
+                break
+            after = page_info.get("endCursor")
+            if not after:
+                break
+
+        # Buffer oldest first so the deque's right end is always the newest event
+        new_events.sort(key=lambda event: event.get("timestamp") or 0)
+        self._buffers[app_id].extend(new_events)
+
+        for sink in self.sinks:
+            sink.write(app_id, self.chain_id, new_events)
+            sink.record_poll(app_id, self.chain_id, observed_at)
+
+        return new_events
+
+    def _next_interval(self, app_id: str, new_count: int, failed: bool) -> float:
+        """Adapt an app's polling interval to how busy it is."""
+        interval = self._intervals[app_id]
+        if failed:
+            interval *= 2
+        elif new_count:
+            interval /= 2
+        else:
+            interval *= 1.5
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        self._intervals[app_id] = interval
+        return interval
+
+    def recent(self, app_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return buffered events for an app, newest first."""
+        events = list(reversed(self._buffers.get(app_id, ())))
+        return events[:limit] if limit else events
+
+    def run(self, on_events=None) -> None:
+        """Poll every app until stop() is called.
+
+        ``on_events`` is an optional callable receiving (app_id, new_events)
+        after each poll that found activity.
+        """
+        schedule = [(time.monotonic(), app_id) for app_id in self.app_ids]
+        heapq.heapify(schedule)
+
+        while schedule and not self._stop.is_set():
+            due, app_id = heapq.heappop(schedule)
+            wait = due - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+
+            failed = False
+            new_events = []
+            try:
+                new_events = self.poll_app(app_id)
+            except Exception as e:
+                failed = True
+                print(f"Error polling app {app_id}: {str(e)}")
+
+            if new_events and on_events:
+                on_events(app_id, new_events)
+
+            interval = self._next_interval(app_id, len(new_events), failed)
+            heapq.heappush(schedule, (time.monotonic() + interval, app_id))
+
+    def stop(self) -> None:
+        """Stop the polling loop."""
+        self._stop.set()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+"""Resident analysis service.
+
+Accepts crew analysis jobs for a (wallet, networks) pair over HTTP and runs
+them on a worker pool. The LLM client, the tool instances (and their result
+caches) and the per-thread Zapper HTTP sessions stay warm between jobs, so a
+job only pays for the analysis itself:
+
+    onchain_service --port 8780 --workers 1
+    curl -X POST localhost:8780/jobs -d '{"wallet_address": "0x...", "networks": "ethereum,base"}'
+    curl localhost:8780/jobs/<job_id>
+
+Repeat requests for the same wallet and networks get the running job or its
+recent report; send "refresh": true to force a new run.
+
+GET /jobs/<job_id>/events?after=<seq> returns the job's progress events
+newer than a cursor, GET /jobs lists recent jobs, GET /health reports the
+queue and GET /metrics (or /metrics.json) exposes the tool and API metrics.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from onchain_agent import events, metrics, tracing
+from onchain_agent.tools import request_policy
+
+
+class AnalysisJob:
+    """One analysis request and, once it has run, its result or error."""
+
+    def __init__(self, wallet_address: str, networks: str):
+        self.job_id = uuid.uuid4().hex
+        self.wallet_address = wallet_address
+        self.networks = networks
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        # Report file written by this job's run (under outputs/runs/<job_id>)
+        self.report_path: Optional[str] = None
+        # Task names in run order and how many have finished
+        self.tasks: List[str] = []
+        self.tasks_completed = 0
+        # Output of each finished task, in completion order
+        self.task_outputs: List[Dict[str, str]] = []
+        # Progress events of this job's run (tasks, agent steps, tool calls)
+        self.events = events.EventStream(self.job_id)
+
+    @property
+    def current_task(self) -> Optional[str]:
+        """Name of the task running now, if any."""
+        if self.status != "running" or self.tasks_completed >= len(self.tasks):
+            return None
+        return self.tasks[self.tasks_completed]
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        job = {
+            "job_id": self.job_id,
+            "wallet_address": self.wallet_address,
+            "networks": self.networks,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "tasks": self.tasks,
+            "tasks_completed": self.tasks_completed,
+            "current_task": self.current_task,
+            "report_path": self.report_path,
+            "error": self.error
+        }
+        if include_result:
+            job["task_outputs"] = self.task_outputs
+            job["result"] = self.result
+        return job
+
+
+class JobManager:
+    """Runs analysis jobs on a worker pool with warm, shared tools.
+
+    Every job's crew is built around the same tool instances, so a wallet
+    analysed twice reuses the cached API results. The caches are cleared every
+    ``cache_ttl`` seconds so a long-running service does not serve stale
+    balances indefinitely.
+
+    Submitting the same (wallet, networks) again returns the job already
+    running for it, or its finished report while younger than
+    ``result_ttl``, unless ``refresh`` asks for a new run.
+    """
+
+    # Finished jobs kept for polling before the oldest are dropped
+    MAX_JOBS = 500
+
+    def __init__(self, max_workers: int = 1, cache_ttl: float = 300.0, result_ttl: float = 900.0):
+        from onchain_agent.llm_routing import get_llm_router
+        from onchain_agent.tools import (
+            PortfolioTool,
+            TransactionHistoryTool,
+            TokenPriceTool,
+            TransactionDetailsTool,
+            AppTransactionsTool,
+            SearchTool,
+            BalanceHistoryTool,
+            PnLTool,
+            FeeAnalyticsTool
+        )
+
+        # Warm-up: build every route's LLM client and the shared tools before the first job
+        get_llm_router().warm()
+        self.tools = {
+            tool_class.__name__: tool_class()
+            for tool_class in (PortfolioTool, TransactionHistoryTool, TokenPriceTool,
+                               TransactionDetailsTool, AppTransactionsTool, SearchTool, BalanceHistoryTool,
+                               PnLTool, FeeAnalyticsTool)
+        }
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.result_ttl = result_ttl
+        self._cache_cleared_at = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Latest job ID per analysis key, for reusing running and recent jobs
+        self._latest: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def analysis_key(wallet_address: str, networks: str) -> Tuple[str, str]:
+        """Normalized (wallet, networks) pair identifying an analysis."""
+        network_set = {network.strip().lower() for network in networks.split(",") if network.strip()}
+        return wallet_address.strip().lower(), ",".join(sorted(network_set))
+
+    def find_recent(self, wallet_address: str, networks: str) -> Optional[AnalysisJob]:
+        """Job for the same analysis that is still pending or finished within result_ttl."""
+        job = self._jobs.get(self._latest.get(self.analysis_key(wallet_address, networks)))
+        if job is None or job.status == "failed":
+            return None
+        if job.status == "done" and time.time() - (job.finished_at or time.time()) > self.result_ttl:
+            return None
+        return job
+
+    def submit(self, wallet_address: str, networks: str, refresh: bool = False) -> AnalysisJob:
+        """Queue an analysis and return its job (poll it with get()).
+
+        Unless ``refresh`` is set, a pending or recently finished job for the
+        same wallet and networks is returned instead of starting a new run.
+        """
+        with self._lock:
+            if not refresh:
+                job = self.find_recent(wallet_address, networks)
+                if job is not None:
+                    metrics.ANALYSIS_JOBS_REUSED.inc(job.status)
+                    return job
+            job = AnalysisJob(wallet_address, networks)
+            self._jobs[job.job_id] = job
+            self._latest[self.analysis_key(wallet_address, networks)] = job.job_id
+            self._evict()
+        self._executor.submit(self._run_job, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[AnalysisJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        counts: Dict[str, int] = {}
+        for job in self.list_jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond MAX_JOBS (caller holds the lock)."""
+        excess = len(self._jobs) - self.MAX_JOBS
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("done", "failed")]
+        for job_id in finished[:excess]:
+            job = self._jobs.pop(job_id)
+            key = self.analysis_key(job.wallet_address, job.networks)
+            if self._latest.get(key) == job_id:
+                del self._latest[key]
+
+    def _expire_caches(self) -> None:
+        """Empty the shared tool caches once they are older than cache_ttl.
+
+        Other jobs may be reading the caches, so each is swapped for a new
+        dict rather than cleared in place.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._cache_cleared_at < self.cache_ttl:
+                return
+            for tool in self.tools.values():
+                tool._cache = {}
+            self._cache_cleared_at = now
+
+    @staticmethod
+    def _progress_callback(job: AnalysisJob, task_callback):
+        """Wrap the crew's task callback to record finished tasks and their output on the job."""
+        def on_task_complete(task_output):
+            job.task_outputs.append({
+                "task": job.tasks[job.tasks_completed] if job.tasks_completed < len(job.tasks) else "",
+                "output": getattr(task_output, "raw", "") or ""
+            })
+            job.tasks_completed += 1
+            if task_callback is not None:
+                task_callback(task_output)
+        return on_task_complete
+
+    def _run_job(self, job: AnalysisJob) -> None:
+        from onchain_agent.crew import OnchainAgentCrew, REPORT_FILE
+        from onchain_agent.memory_storage import partition_for
+
+        job.status = "running"
+        job.started_at = time.time()
+        self._expire_caches()
+        inputs = {
+            'wallet_address': job.wallet_address,
+            'networks': job.networks
+        }
+        try:
+            # The job ID doubles as the run ID, so each job writes to its own directory
+            agent_crew = OnchainAgentCrew(
+                tools=self.tools, run_id=job.job_id, memory_partition=partition_for(job.wallet_address)
+            )
+            job.report_path = str(agent_crew.output_dir / REPORT_FILE)
+            crew = agent_crew.crew()
+            job.tasks = [task.name for task in crew.tasks]
+            crew.task_callback = self._progress_callback(job, crew.task_callback)
+            with events.stream_run(job.events), tracing.trace_run(f"job-{job.job_id}", os.getenv("ONCHAIN_TRACE_DIR")), \
+                    request_policy.run_budget(request_policy.budget_from_env()):
+                result = crew.kickoff(inputs=inputs)
+            job.result = getattr(result, "raw", None) or str(result)
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            metrics.ANALYSIS_JOBS.inc(job.status)
+            metrics.ANALYSIS_JOB_SECONDS.observe(job.finished_at - job.started_at)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP API of the analysis service."""
+
+    server_version = "OnchainAgentService/1.0"
+    manager: JobManager = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        self._send(status, json.dumps(body).encode("utf-8"))
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("content-length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "Invalid JSON body"})
+            return
+
+        wallet_address = (request.get("wallet_address") or "").strip()
+        if not wallet_address:
+            self._send_json(400, {"error": "wallet_address is required"})
+            return
+        networks = request.get("networks") or "ethereum"
+        if isinstance(networks, list):
+            networks = ",".join(networks)
+
+        job = self.manager.submit(wallet_address, networks, refresh=bool(request.get("refresh")))
+        self._send_json(202, {"job_id": job.job_id, "status": job.status, "url": f"/jobs/{job.job_id}"})
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.manager.max_workers, "jobs": self.manager.counts()})
+        elif path == "/jobs":
+            self._send_json(200, [job.to_dict(include_result=False) for job in self.manager.list_jobs()])
+        elif path.startswith("/jobs/") and path.endswith("/events"):
+            job = self.manager.get(path[len("/jobs/"):-len("/events")])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job"})
+            else:
+                after = int(parse_qs(urlparse(self.path).query).get("after", ["0"])[0])
+                self._send_json(200, [event.to_dict() for event in job.events.since(after)])
+        elif path.startswith("/jobs/"):
+            job = self.manager.get(path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job"})
+            else:
+                self._send_json(200, job.to_dict())
+        elif path == "/metrics.json":
+            self._send_json(200, metrics.REGISTRY.to_dict())
+        elif path == "/metrics":
+            self._send(200, metrics.REGISTRY.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8780, manager: Optional[JobManager] = None) -> ThreadingHTTPServer:
+    """Create (but do not start) the service bound to host:port."""
+    handler = type("ConfiguredServiceHandler", (ServiceHandler,), {"manager": manager or JobManager()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """Run the analysis service from the command line."""
+    parser = argparse.ArgumentParser(description="Resident Onchain AI Agent analysis service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--workers", type=int, default=1, help="Analyses run concurrently")
+    parser.add_argument("--cache-ttl", type=float, default=300.0, help="Seconds before the shared tool caches are cleared")
+    parser.add_argument("--result-ttl", type=float, default=900.0, help="Seconds a finished report is returned for a repeat request")
+    args = parser.parse_args()
+
+    metrics.configure_from_env()
+    manager = JobManager(max_workers=args.workers, cache_ttl=args.cache_ttl, result_ttl=args.result_ttl)
+    server = create_server(args.host, args.port, manager)
+    print(f"Analysis service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
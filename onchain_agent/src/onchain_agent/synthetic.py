@@ -0,0 +1,310 @@
+import random
+import zlib
+from typing import Dict, Any, List, Optional
+
+# Synthetic Zapper GraphQL responses shaped like the real API, used by the
+# local stand-in server and the formatter benchmarks. Every generator takes a
+# seed so the same sizes always produce the same payload.
+
+NETWORKS = ["ETHEREUM_MAINNET", "POLYGON_MAINNET", "BASE_MAINNET", "ARBITRUM_MAINNET", "OPTIMISM_MAINNET"]
+NETWORK_NAMES = ["Ethereum", "Polygon", "Base", "Arbitrum", "Optimism"]
+SYMBOLS = ["ETH", "USDC", "USDT", "DAI", "WBTC", "LINK", "UNI", "AAVE", "MKR", "CRV", "LDO", "OP", "ARB", "PEPE"]
+APPS = ["Uniswap V3", "Aave V3", "Curve", "Lido", "Compound", "Balancer", "GMX", "Pendle"]
+ACTIONS = ["SWAP", "TRANSFER", "APPROVE", "DEPOSIT", "WITHDRAW", "CLAIM", "MINT", "BRIDGE"]
+
+BASE_TIMESTAMP_MS = 1_700_000_000_000
+
+
+def _address(rng: random.Random) -> str:
+    return f"0x{rng.getrandbits(160):040x}"
+
+
+def _hash(rng: random.Random) -> str:
+    return f"0x{rng.getrandbits(256):064x}"
+
+
+def _symbol(rng: random.Random, idx: int) -> str:
+    symbol = SYMBOLS[idx % len(SYMBOLS)]
+    return symbol if idx < len(SYMBOLS) else f"{symbol}{idx}"
+
+
+def _user(rng: random.Random) -> Dict[str, Any]:
+    name = f"user{rng.randint(1, 9999)}.eth" if rng.random() < 0.3 else None
+    return {"address": _address(rng), "displayName": {"value": name}}
+
+
+def portfolio_response(tokens: int = 10, apps: int = 10, positions: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """portfolioV2 response with the given number of tokens, apps and positions per app."""
+    rng = random.Random(seed)
+
+    token_edges = []
+    for idx in range(tokens):
+        price = rng.uniform(0.01, 4000)
+        balance = rng.uniform(0.001, 10000)
+        token_edges.append({
+            "node": {
+                "symbol": _symbol(rng, idx),
+                "tokenAddress": _address(rng),
+                "balance": balance,
+                "balanceUSD": balance * price,
+                "price": price,
+                "name": f"Token {idx}",
+                "network": {"name": rng.choice(NETWORK_NAMES)}
+            }
+        })
+
+    app_edges = []
+    for idx in range(apps):
+        position_edges = []
+        for pos in range(positions):
+            if pos % 2 == 0:
+                node = {
+                    "type": "app-token",
+                    "symbol": f"LP-{pos}",
+                    "balance": rng.uniform(0.1, 500),
+                    "balanceUSD": rng.uniform(10, 100000),
+                    "price": rng.uniform(1, 3000),
+                    "appId": f"app-{idx}",
+                    "displayProps": {"label": f"Pool {pos}"},
+                    "tokens": [
+                        {"symbol": _symbol(rng, pos + t), "balance": rng.uniform(0.1, 100), "balanceUSD": rng.uniform(1, 5000)}
+                        for t in range(2)
+                    ]
+                }
+            else:
+                node = {
+                    "type": "contract-position",
+                    "balanceUSD": rng.uniform(10, 100000),
+                    "displayProps": {"label": f"Lending {pos}"},
+                    "tokens": [
+                        {"metaType": "SUPPLIED", "token": {"symbol": _symbol(rng, pos), "balance": rng.uniform(0.1, 100), "balanceUSD": rng.uniform(1, 5000)}},
+                        {"metaType": "BORROWED", "token": {"symbol": "USDC", "balance": rng.uniform(1, 1000), "balanceUSD": rng.uniform(1, 1000)}}
+                    ]
+                }
+            position_edges.append({"node": node})
+
+        app_edges.append({
+            "node": {
+                "balanceUSD": rng.uniform(100, 1_000_000),
+                "app": {"displayName": APPS[idx % len(APPS)], "imgUrl": f"https://storage.example/apps/{idx}.png"},
+                "network": {"name": rng.choice(NETWORK_NAMES)},
+                "positionBalances": {"edges": position_edges}
+            }
+        })
+
+    return {
+        "data": {
+            "portfolioV2": {
+                "tokenBalances": {
+                    "totalBalanceUSD": sum(edge["node"]["balanceUSD"] for edge in token_edges),
+                    "byToken": {"totalCount": tokens, "edges": token_edges}
+                },
+                "appBalances": {
+                    "totalBalanceUSD": sum(edge["node"]["balanceUSD"] for edge in app_edges),
+                    "byApp": {"totalCount": apps, "edges": app_edges}
+                },
+                "nftBalances": {
+                    "totalBalanceUSD": rng.uniform(0, 50000),
+                    "totalTokensOwned": rng.randint(0, 200)
+                }
+            }
+        }
+    }
+
+
+def _timeline_node(rng: random.Random, idx: int, deltas: int, account: str) -> Dict[str, Any]:
+    """One TimelineEventV2 node of a transactionHistoryV2 page."""
+    delta_edges = []
+    for d in range(deltas):
+        amount = rng.uniform(-1000, 1000)
+        symbol = _symbol(rng, rng.randrange(len(SYMBOLS)))
+        delta_edges.append({
+            "node": {
+                # One contract address per symbol, so deltas of the same token can be matched up
+                "address": f"0x{zlib.crc32(symbol.encode('utf-8')):040x}",
+                "amount": amount,
+                "amountRaw": str(int(abs(amount) * 10 ** 18)),
+                "token": {"symbol": symbol, "imageUrlV2": "https://storage.example/t.png"}
+            }
+        })
+
+    return {
+        "transaction": {
+            "hash": _hash(rng),
+            "network": rng.choice(NETWORKS),
+            "timestamp": BASE_TIMESTAMP_MS - idx * 60_000,
+            "blockNumber": 19_000_000 - idx,
+            "fromUser": _user(rng),
+            "toUser": _user(rng)
+        },
+        "interpretation": {"processedDescription": f"{rng.choice(ACTIONS).title()} via {rng.choice(APPS)}"},
+        "perspectiveDelta": {
+            "account": {"address": account},
+            "tokenDeltasV2": {"edges": delta_edges}
+        }
+    }
+
+
+def transaction_history_response(transactions: int = 10, deltas: int = 3, has_next_page: bool = False,
+                                 seed: int = 0) -> Dict[str, Any]:
+    """transactionHistoryV2 response with the given number of events and token deltas per event."""
+    rng = random.Random(seed)
+    account = _address(rng)
+    edges = [{"node": _timeline_node(rng, idx, deltas, account)} for idx in range(transactions)]
+    return {
+        "data": {
+            "transactionHistoryV2": {
+                "edges": edges,
+                "pageInfo": {"hasNextPage": has_next_page, "endCursor": f"cursor-{seed}-{transactions}" if has_next_page else None}
+            }
+        }
+    }
+
+
+def token_price_response(address: Optional[str] = None, ticks: int = 30, seed: int = 0) -> Dict[str, Any]:
+    """fungibleTokenV2 response with the given number of price ticks."""
+    rng = random.Random(seed)
+    price = rng.uniform(0.5, 4000)
+    price_ticks = []
+    for idx in range(ticks):
+        open_price = price
+        price = max(0.0001, price * (1 + rng.gauss(0, 0.02)))
+        price_ticks.append({
+            "open": open_price,
+            "median": (open_price + price) / 2,
+            "close": price,
+            "timestamp": BASE_TIMESTAMP_MS - (ticks - idx) * 3_600_000
+        })
+
+    return {
+        "data": {
+            "fungibleTokenV2": {
+                "address": address or _address(rng),
+                "symbol": _symbol(rng, rng.randrange(len(SYMBOLS))),
+                "name": "Synthetic Token",
+                "decimals": 18,
+                "imageUrlV2": "https://storage.example/t.png",
+                "priceData": {
+                    "marketCap": rng.uniform(1e6, 1e11),
+                    "price": price,
+                    "priceChange5m": rng.uniform(-2, 2),
+                    "priceChange1h": rng.uniform(-5, 5),
+                    "priceChange24h": rng.uniform(-15, 15),
+                    "volume24h": rng.uniform(1e4, 1e9),
+                    "totalGasTokenLiquidity": rng.uniform(1, 1e5),
+                    "totalLiquidity": rng.uniform(1e4, 1e9),
+                    "priceTicks": price_ticks
+                }
+            }
+        }
+    }
+
+
+def transaction_details_node(transaction_hash: Optional[str] = None, transfers: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """A single transactionV2 object with the given number of token transfers."""
+    rng = random.Random(seed)
+    gas_used = rng.randint(21_000, 600_000)
+    gas_price = rng.randint(5, 150) * 10 ** 9
+    return {
+        "hash": transaction_hash or _hash(rng),
+        "status": "SUCCESS",
+        "blockNumber": rng.randint(15_000_000, 20_000_000),
+        "timestamp": BASE_TIMESTAMP_MS // 1000 - rng.randint(0, 365 * 86400),
+        "nonce": rng.randint(0, 5000),
+        "gasUsed": gas_used,
+        "gasPrice": gas_price,
+        "maxFeePerGas": gas_price * 2,
+        "maxPriorityFeePerGas": 2 * 10 ** 9,
+        "from": {"address": _address(rng)},
+        "to": {"address": _address(rng)},
+        "fee": {"value": gas_used * gas_price / 1e18, "currency": "ETH"},
+        "processedData": {
+            "description": f"{rng.choice(ACTIONS).title()} via {rng.choice(APPS)}",
+            "actionCategory": rng.choice(ACTIONS)
+        },
+        "transfers": [
+            {
+                "from": _address(rng),
+                "to": _address(rng),
+                "type": rng.choice(["ERC20", "NATIVE"]),
+                "token": {"address": _address(rng), "name": f"Token {t}", "symbol": _symbol(rng, t), "decimals": 18},
+                "value": rng.uniform(0.001, 10000),
+                "valueUSD": rng.uniform(0.01, 100000)
+            }
+            for t in range(transfers)
+        ]
+    }
+
+
+def transaction_details_response(transaction_hash: Optional[str] = None, transfers: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """transactionV2 response for one transaction."""
+    return {"data": {"transactionV2": transaction_details_node(transaction_hash, transfers, seed)}}
+
+
+def app_transactions_response(transactions: int = 10, has_next_page: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """transactionsForAppV2 response with the given number of transactions."""
+    rng = random.Random(seed)
+    edges = []
+    for idx in range(transactions):
+        edges.append({
+            "node": {
+                "transaction": {
+                    "hash": _hash(rng),
+                    "timestamp": BASE_TIMESTAMP_MS - idx * 12_000,
+                    "blockNumber": 19_000_000 - idx,
+                    "fromUser": _user(rng),
+                    "toUser": _user(rng)
+                },
+                "app": {"name": rng.choice(APPS), "imgUrl": "https://storage.example/app.png"},
+                "interpretation": {"processedDescription": f"{rng.choice(ACTIONS).title()} tokens"}
+            }
+        })
+    return {
+        "data": {
+            "transactionsForAppV2": {
+                "edges": edges,
+                "pageInfo": {"hasNextPage": has_next_page, "endCursor": f"cursor-{seed}-{transactions}"}
+            }
+        }
+    }
+
+
+def search_response(per_category: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """searchV2 response with ``per_category`` results of each entity type."""
+    rng = random.Random(seed)
+    results: List[Dict[str, Any]] = []
+    for idx in range(per_category):
+        results.append({
+            "__typename": "UnifiedErc20TokenResult",
+            "category": "UNIFIED_ERC20_TOKEN",
+            "name": f"Token {idx}",
+            "symbol": _symbol(rng, idx),
+            "imageUrl": "https://storage.example/t.png",
+            "groupedFungibleTokens": [
+                {
+                    "address": _address(rng),
+                    "networkV2": {"chainId": 1, "name": "Ethereum"},
+                    "priceData": {"price": rng.uniform(0.01, 4000), "priceChange24h": rng.uniform(-15, 15)}
+                }
+            ]
+        })
+        results.append({
+            "__typename": "UserResult",
+            "category": "USER",
+            "address": _address(rng),
+            "account": {"displayName": {"value": f"user{idx}.eth"}}
+        })
+        results.append({
+            "__typename": "AppResult",
+            "category": "APP",
+            "appId": f"app-{idx}",
+            "app": {"displayName": APPS[idx % len(APPS)], "url": f"https://app{idx}.example", "imgUrl": "https://storage.example/a.png"}
+        })
+        results.append({
+            "__typename": "NftCollectionResult",
+            "category": "NFT_COLLECTION",
+            "address": _address(rng),
+            "network": "ETHEREUM_MAINNET",
+            "collection": {"displayName": f"Collection {idx}", "symbol": f"NFT{idx}", "floorPrice": {"valueUsd": rng.uniform(1, 50000)}}
+        })
+    return {"data": {"searchV2": {"results": results}}}
@@ -1,17 +1,42 @@
-# Import all tools to make them available when importing from the package
-from .portfolio_tool import PortfolioTool
-from .transaction_history_tool import TransactionHistoryTool
-from .token_price_tool import TokenPriceTool
-from .transaction_details_tool import TransactionDetailsTool
-from .app_transactions_tool import AppTransactionsTool
-from .search_tool import SearchTool
+# Tool classes are imported on first access: each tool module imports crewai,
+# which the data-only CLI commands never need to load
+import importlib
+
+# Map each exported tool class to the module that defines it
+_TOOL_MODULES = {
+    'PortfolioTool': '.portfolio_tool',
+    'TransactionHistoryTool': '.transaction_history_tool',
+    'TokenPriceTool': '.token_price_tool',
+    'TransactionDetailsTool': '.transaction_details_tool',
+    'AppTransactionsTool': '.app_transactions_tool',
+    'SearchTool': '.search_tool',
+    'BalanceHistoryTool': '.balance_history_tool',
+    'PnLTool': '.pnl_tool',
+    'FeeAnalyticsTool': '.fee_analytics_tool'
+}
 
 # Export all tool classes to make them available when importing from this package
 __all__ = [
     'PortfolioTool',
     'TransactionHistoryTool',
-    'TokenPriceTool', 
+    'TokenPriceTool',
     'TransactionDetailsTool',
     'AppTransactionsTool',
-    'SearchTool'
-]
\ No newline at end of file
+    'SearchTool',
+    'BalanceHistoryTool',
+    'PnLTool',
+    'FeeAnalyticsTool'
+]
+
+
+def __getattr__(name):
+    """Import a tool class the first time it is requested."""
+    if name not in _TOOL_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_TOOL_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
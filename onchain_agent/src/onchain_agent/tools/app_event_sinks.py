@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+class JsonlEventSink:
+    """Append monitored app events to a JSON Lines file, one event per line."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, app_id: str, chain_id: Optional[int], events: List[Dict[str, Any]]) -> None:
+        """Append new events for an app."""
+        if not events:
+            return
+        lines = [json.dumps(event, separators=(",", ":")) for event in events]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def record_poll(self, app_id: str, chain_id: Optional[int], polled_at: float) -> None:
+        """JSONL sinks keep no poll bookkeeping."""
+
+
+class SqliteEventSink:
+    """Store monitored app events in SQLite so tools can read them locally.
+
+    Events are deduplicated on (app_id, chain_id, hash) and the poll table
+    records when each app was last checked, which lets readers tell fresh data
+    from a stopped monitor. Each thread keeps one connection open; use
+    get_event_sink() to share a sink (and its setup) per database.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._initialize_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_db(self) -> None:
+        """Create the events and polls tables if needed."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS app_events (
+                    app_id TEXT NOT NULL,
+                    chain_id INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    timestamp INTEGER,
+                    observed_at REAL NOT NULL,
+                    node TEXT NOT NULL,
+                    PRIMARY KEY (app_id, chain_id, hash)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_app_events_recent "
+                "ON app_events (app_id, chain_id, timestamp DESC)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS app_polls (
+                    app_id TEXT NOT NULL,
+                    chain_id INTEGER NOT NULL,
+                    polled_at REAL NOT NULL,
+                    PRIMARY KEY (app_id, chain_id)
+                )
+                """
+            )
+
+    def write(self, app_id: str, chain_id: Optional[int], events: List[Dict[str, Any]]) -> None:
+        """Insert new events for an app, ignoring ones already stored."""
+        if not events:
+            return
+        rows = [
+            (
+                app_id.lower(),
+                chain_id or 0,
+                event["hash"],
+                event.get("timestamp"),
+                event["observed_at"],
+                json.dumps(event["node"], separators=(",", ":"))
+            )
+            for event in events
+        ]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO app_events (app_id, chain_id, hash, timestamp, observed_at, node) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def record_poll(self, app_id: str, chain_id: Optional[int], polled_at: float) -> None:
+        """Remember when an app was last polled successfully."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO app_polls (app_id, chain_id, polled_at) VALUES (?, ?, ?)",
+                (app_id.lower(), chain_id or 0, polled_at)
+            )
+
+    def recent_events(self, app_id: str, chain_id: Optional[int], limit: int,
+                      max_age: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Return the newest transactionsForAppV2 nodes for an app.
+
+        Returns None when the app is not monitored, or when its last poll is
+        older than ``max_age`` seconds.
+        """
+        conn = self._connect()
+        with conn:
+            row = conn.execute(
+                "SELECT polled_at FROM app_polls WHERE app_id = ? AND chain_id = ?",
+                (app_id.lower(), chain_id or 0)
+            ).fetchone()
+            if row is None:
+                return None
+            if max_age is not None and time.time() - row[0] > max_age:
+                return None
+
+            rows = conn.execute(
+                "SELECT node FROM app_events WHERE app_id = ? AND chain_id = ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (app_id.lower(), chain_id or 0, limit)
+            ).fetchall()
+        return [json.loads(node) for (node,) in rows]
+
+
+# Process-wide sinks by database path, so each database is set up once
+_sqlite_sinks: Dict[str, SqliteEventSink] = {}
+_sqlite_sinks_lock = threading.Lock()
+
+
+def get_event_sink(path: str) -> SqliteEventSink:
+    """Return the process-wide SQLite sink of a database."""
+    key = str(Path(path).resolve())
+    with _sqlite_sinks_lock:
+        sink = _sqlite_sinks.get(key)
+        if sink is None:
+            sink = _sqlite_sinks[key] = SqliteEventSink(path)
+        return sink
@@ -1,8 +1,76 @@
-from typing import Type, Dict, Any, List
+from typing import Type, Dict, Any, List, Optional, ClassVar
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from .zapper_base import ZapperBase
+from .query_profiles import build_queries, select_query
+from ..metrics import instrument_tool_run, record_cache_lookup
+from .app_event_sinks import get_event_sink
 from datetime import datetime
+import os
+
+
+# GraphQL document for transactionsForAppV2, shared by the tool and the activity monitor;
+# fields tagged @analytics/@full are only requested by those query profiles
+APP_TRANSACTIONS_QUERY = '''
+query TransactionsForAppV2($slug: String!, $chainId: Int, $first: Int, $after: String) {
+  transactionsForAppV2(slug: $slug, chainId: $chainId, first: $first, after: $after) {
+    edges {
+      node {
+        transaction {
+          hash
+          timestamp
+          blockNumber # @analytics
+          fromUser {
+            address
+            displayName {
+              value
+            }
+          }
+          toUser {
+            address
+            displayName {
+              value
+            }
+          }
+        }
+        app { # @analytics
+          name
+          imgUrl # @full
+        }
+        interpretation {
+          processedDescription
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+'''
+
+# APP_TRANSACTIONS_QUERY rendered for each query profile
+APP_TRANSACTIONS_QUERIES = build_queries(APP_TRANSACTIONS_QUERY)
+
+
+def fetch_app_transactions(app_id: str, chain_id: Optional[int], limit: int, after: Optional[str] = None,
+                           profile: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch one page of transactionsForAppV2, optionally continuing from a cursor."""
+    variables = {
+        "slug": app_id,
+        "first": limit
+    }
+    
+    # Add chainId if specified
+    if chain_id is not None:
+        variables["chainId"] = chain_id
+    
+    # Continue from a previous page's endCursor
+    if after:
+        variables["after"] = after
+    
+    return ZapperBase.execute_graphql_query(select_query(APP_TRANSACTIONS_QUERIES, profile), variables)
 
 
 class AppTransactionsToolInput(BaseModel):
@@ -21,22 +89,30 @@ class AppTransactionsTool(BaseTool):
         "Use this to monitor activity patterns on specific protocols."
     )
     args_schema: Type[BaseModel] = AppTransactionsToolInput
+    # Query profile (see query_profiles.PROFILES); None follows ZAPPER_QUERY_PROFILE
+    query_profile: Optional[str] = None
+    
+    # Seconds after the monitor's last poll during which its local events are served
+    MONITOR_MAX_AGE: ClassVar[float] = 300.0
     
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the AppTransactionsTool with cache."""
-        super().__init__()
+        super().__init__(**kwargs)
         self._cache = {}
     
     def _cache_key(self, app_id: str, network: str, limit: int) -> str:
         """Generate a cache key based on input parameters."""
         return f"{app_id.lower()}:{network.lower()}:{limit}"
     
+    @instrument_tool_run
     def _run(self, app_id: str, network: str = "ethereum", limit: int = 10) -> str:
         """Run the app transactions retrieval with caching."""
         # Check cache first
         cache_key = self._cache_key(app_id, network, limit)
-        if cache_key in self._cache:
-            return f"[CACHED] {self._cache[cache_key]}"
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
         
         try:
             # Convert network name to chain ID (if needed)
@@ -44,58 +120,13 @@ class AppTransactionsTool(BaseTool):
             if network:  # Only include chainId if network is specified
                 chain_id = ZapperBase.get_chain_id(network)
 
-            # Create GraphQL query for transactionsForAppV2
-            query = '''
-            query TransactionsForAppV2($slug: String!, $chainId: Int, $first: Int) {
-              transactionsForAppV2(slug: $slug, chainId: $chainId, first: $first) {
-                edges {
-                  node {
-                    transaction {
-                      hash
-                      timestamp
-                      blockNumber
-                      fromUser {
-                        address
-                        displayName {
-                          value
-                        }
-                      }
-                      toUser {
-                        address
-                        displayName {
-                          value
-                        }
-                      }
-                    }
-                    app {
-                      name
-                      imgUrl
-                    }
-                    interpretation {
-                      processedDescription
-                    }
-                  }
-                }
-                pageInfo {
-                  hasNextPage
-                  endCursor
-                }
-              }
-            }
-            '''
-            
-            # Prepare variables
-            variables = {
-                "slug": app_id,
-                "first": limit
-            }
-            
-            # Add chainId if specified
-            if chain_id is not None:
-                variables["chainId"] = chain_id
+            # Serve fresh activity recorded by the app monitor without an API call
+            local_result = self._load_monitored(app_id, chain_id, limit)
+            if local_result is not None:
+                return self._format_app_transactions(local_result, app_id)
             
             # Execute GraphQL query
-            result = ZapperBase.execute_graphql_query(query, variables)
+            result = fetch_app_transactions(app_id, chain_id, limit, profile=self.query_profile)
             
             # Format the response
             formatted_result = self._format_app_transactions(result, app_id)
@@ -108,6 +139,28 @@ class AppTransactionsTool(BaseTool):
         except Exception as e:
             return f"Error fetching app transactions: {str(e)}"
     
+    def _load_monitored(self, app_id: str, chain_id: Optional[int], limit: int) -> Optional[Dict[str, Any]]:
+        """Build a transactionsForAppV2 response from the monitor's SQLite sink, if it is fresh."""
+        db_path = os.getenv("ONCHAIN_APP_EVENTS_DB")
+        if not db_path or not os.path.exists(db_path):
+            return None
+        
+        try:
+            nodes = get_event_sink(db_path).recent_events(app_id, chain_id, limit, max_age=self.MONITOR_MAX_AGE)
+        except Exception:
+            return None
+        if not nodes or len(nodes) < limit:
+            return None
+        
+        return {
+            "data": {
+                "transactionsForAppV2": {
+                    "edges": [{"node": node} for node in nodes],
+                    "pageInfo": {"hasNextPage": True}
+                }
+            }
+        }
+    
     def _format_app_transactions(self, data: Dict[str, Any], app_id: str) -> str:
         """Format app transactions data into a readable string."""
         if not data or "data" not in data or "transactionsForAppV2" not in data["data"] or not data["data"]["transactionsForAppV2"]["edges"]:
@@ -0,0 +1,188 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .transaction_history_data import ALL_TOKEN_DELTAS, iter_transaction_history
+
+# Profile that returns token addresses and page cursors
+REPLAY_PROFILE = "analytics"
+
+
+class TokenDeltas:
+    """Column store of the token deltas of a wallet's transaction history.
+
+    Each delta is kept as a (token index, timestamp in ms, amount) row; a
+    token is identified by its network and contract address, falling back
+    to its symbol when no address was returned.
+    """
+
+    def __init__(self):
+        self.tokens: List[Tuple[str, str]] = []
+        self.symbols: List[str] = []
+        self._token_index: Dict[Tuple[str, str], int] = {}
+        self._token_ids: List[int] = []
+        self._timestamps: List[int] = []
+        self._amounts: List[float] = []
+        self.transactions = 0
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def add_node(self, node: Dict[str, Any]) -> None:
+        """Record the deltas of one transactionHistoryV2 node."""
+        tx = node.get("transaction") or {}
+        timestamp = tx.get("timestamp")
+        if timestamp is None:
+            return
+        self.transactions += 1
+        network = tx.get("network") or "unknown"
+        delta_edges = ((node.get("perspectiveDelta") or {}).get("tokenDeltasV2") or {}).get("edges") or []
+        for delta_edge in delta_edges:
+            delta = delta_edge.get("node") or {}
+            amount = delta.get("amount")
+            if not amount:
+                continue
+            symbol = (delta.get("token") or {}).get("symbol") or "Unknown"
+            key = (network, (delta.get("address") or symbol).lower())
+            token_id = self._token_index.get(key)
+            if token_id is None:
+                token_id = self._token_index[key] = len(self.tokens)
+                self.tokens.append(key)
+                self.symbols.append(symbol)
+            self._token_ids.append(token_id)
+            self._timestamps.append(int(timestamp))
+            self._amounts.append(float(amount))
+
+    def add_edges(self, edges: Iterable[Dict[str, Any]]) -> int:
+        """Record the deltas of a page of edges; returns the number of edges read."""
+        count = 0
+        for edge in edges:
+            self.add_node(edge.get("node") or {})
+            count += 1
+        return count
+
+    def replay(self) -> "BalanceHistory":
+        """Rebuild every token's running balance from the recorded deltas."""
+        return BalanceHistory(
+            self.tokens, self.symbols,
+            np.asarray(self._token_ids, dtype=np.int64),
+            np.asarray(self._timestamps, dtype=np.int64),
+            np.asarray(self._amounts, dtype=np.float64)
+        )
+
+
+class BalanceHistory:
+    """Running balance of every token of a wallet over time.
+
+    Rows are sorted by (token, timestamp) and each token's balances are one
+    cumulative sum over its rows, so the history is rebuilt with a loop over
+    tokens rather than over deltas.
+    Balances are relative to the start of the replayed history: a wallet
+    whose full history was replayed gets its actual balances.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]], symbols: List[str], token_ids: np.ndarray,
+                 timestamps: np.ndarray, amounts: np.ndarray):
+        self.tokens = tokens
+        self.symbols = symbols
+        order = np.lexsort((timestamps, token_ids))
+        self.token_ids = token_ids[order]
+        self.timestamps = timestamps[order]
+        self.amounts = amounts[order]
+
+        # Row where each token's deltas start (and end), indexed by token id
+        self.starts = np.searchsorted(self.token_ids, np.arange(len(tokens)), side="left")
+        self.ends = np.searchsorted(self.token_ids, np.arange(len(tokens)), side="right")
+
+        # One cumulative sum per token: a sum running across tokens would lose a
+        # small token's precision to a large one's when its offset is subtracted
+        self.balances = np.empty_like(self.amounts)
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            np.cumsum(self.amounts[start:end], out=self.balances[start:end])
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def curve(self, token_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps (ms) and balances after each change of one token."""
+        rows = slice(self.starts[token_id], self.ends[token_id])
+        return self.timestamps[rows], self.balances[rows]
+
+    def balances_at(self, timestamps_ms: Iterable[int]) -> np.ndarray:
+        """Balance of every token at each timestamp, as a (tokens, timestamps) matrix."""
+        times = np.asarray(list(timestamps_ms), dtype=np.int64)
+        result = np.zeros((len(self.tokens), len(times)))
+        if not len(self) or not len(times):
+            return result
+
+        # Search (token, time) pairs in one pass over a combined sort key
+        first, span = self.timestamps.min(), int(self.timestamps.max() - self.timestamps.min()) + 1
+        keys = self.token_ids * span + (self.timestamps - first)
+        clipped = np.clip(times, first, first + span - 1) - first
+        query = np.arange(len(self.tokens))[:, None] * span + clipped[None, :]
+        rows = np.searchsorted(keys, query, side="right") - 1
+
+        # A time before a token's first change (or before the history) has no balance yet
+        valid = (rows >= self.starts[:, None]) & (times[None, :] >= first)
+        result[valid] = self.balances[rows[valid]]
+        return result
+
+    def sample(self, interval_ms: int, points: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Balances of every token on a regular grid ending at the last change.
+
+        Returns the grid timestamps and the (tokens, grid) balance matrix;
+        ``points`` keeps only the last that many grid points.
+        """
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros((len(self.tokens), 0))
+        first, last = int(self.timestamps.min()), int(self.timestamps.max())
+        grid = np.arange(last, first - interval_ms, -interval_ms, dtype=np.int64)[::-1]
+        if points is not None:
+            grid = grid[-points:]
+        return grid, self.balances_at(grid)
+
+    def token_summary(self) -> List[Dict[str, Any]]:
+        """Per token: changes, time range, final, lowest and highest balance, inflow and outflow."""
+        counts = self.ends - self.starts
+        nonempty = counts > 0
+        starts = self.starts[nonempty]
+        lowest = np.minimum.reduceat(self.balances, starts) if len(starts) else np.zeros(0)
+        highest = np.maximum.reduceat(self.balances, starts) if len(starts) else np.zeros(0)
+        inflow = np.add.reduceat(np.where(self.amounts > 0, self.amounts, 0.0), starts) if len(starts) else np.zeros(0)
+        outflow = np.add.reduceat(np.where(self.amounts < 0, self.amounts, 0.0), starts) if len(starts) else np.zeros(0)
+
+        summary = []
+        for position, token_id in enumerate(np.flatnonzero(nonempty)):
+            network, address = self.tokens[token_id]
+            summary.append({
+                "symbol": self.symbols[token_id],
+                "network": network,
+                "address": address,
+                "changes": int(counts[token_id]),
+                "first_change": int(self.timestamps[self.starts[token_id]]),
+                "last_change": int(self.timestamps[self.ends[token_id] - 1]),
+                "balance": float(self.balances[self.ends[token_id] - 1]),
+                "lowest": float(lowest[position]),
+                "highest": float(highest[position]),
+                "inflow": float(inflow[position]),
+                "outflow": float(outflow[position])
+            })
+        return summary
+
+
+def load_token_deltas(address: str, chain_id: Optional[int], max_transactions: int) -> TokenDeltas:
+    """Page through an address's transaction history, keeping every token delta.
+
+    Each page is streamed and reduced to delta rows as it is decoded, so
+    memory grows with the number of deltas, not with response size.
+    """
+    deltas = TokenDeltas()
+    deltas.add_edges(iter_transaction_history(
+        address, chain_id, max_transactions, profile=REPLAY_PROFILE, token_deltas=ALL_TOKEN_DELTAS
+    ))
+    return deltas
+
+
+def load_balance_history(address: str, chain_id: Optional[int], max_transactions: int) -> BalanceHistory:
+    """Replay the token deltas of an address's most recent transactions into balance curves."""
+    return load_token_deltas(address, chain_id, max_transactions).replay()
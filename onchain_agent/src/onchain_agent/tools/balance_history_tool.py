@@ -0,0 +1,119 @@
+from typing import Type, ClassVar, Dict
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from .zapper_base import ZapperBase
+from .balance_history import BalanceHistory, load_balance_history
+from ..metrics import instrument_tool_run, record_cache_lookup
+from datetime import datetime
+
+
+class BalanceHistoryToolInput(BaseModel):
+    """Input schema for Balance History Tool."""
+    address: str = Field(..., description="Wallet address to reconstruct token balances for")
+    network: str = Field("ethereum", description="Blockchain network to query (default: ethereum)")
+    limit: int = Field(500, description="Number of most recent transactions to replay (default: 500)")
+    interval: str = Field("day", description="Spacing of the balance curve points: hour, day or week (default: day)")
+
+
+class BalanceHistoryTool(BaseTool):
+    """Tool to reconstruct a wallet's token balances over time from its transaction history."""
+    name: str = "Balance History Tool"
+    description: str = (
+        "Reconstructs how a wallet's token holdings changed over time by replaying the token "
+        "balance changes of its recent transactions. Reports per token the net change, lowest "
+        "and highest balance, inflows, outflows and a balance curve. Use this to analyze "
+        "accumulation, distribution and holding periods."
+    )
+    args_schema: Type[BaseModel] = BalanceHistoryToolInput
+
+    # Curve spacing per interval name, in milliseconds
+    INTERVALS: ClassVar[Dict[str, int]] = {
+        "hour": 3_600_000,
+        "day": 86_400_000,
+        "week": 7 * 86_400_000
+    }
+    # Tokens listed (most active first) and curve points shown per token
+    MAX_TOKENS: ClassVar[int] = 15
+    CURVE_POINTS: ClassVar[int] = 8
+
+    def __init__(self, **kwargs):
+        """Initialize the BalanceHistoryTool with cache."""
+        super().__init__(**kwargs)
+        self._cache = {}
+
+    def _cache_key(self, address: str, network: str, limit: int, interval: str) -> str:
+        """Generate a cache key based on input parameters."""
+        return f"{address.lower()}:{network.lower()}:{limit}:{interval.lower()}"
+
+    @instrument_tool_run
+    def _run(self, address: str, network: str = "ethereum", limit: int = 500, interval: str = "day") -> str:
+        """Run the balance reconstruction with caching."""
+        # Check cache first
+        cache_key = self._cache_key(address, network, limit, interval)
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
+
+        try:
+            interval_ms = self.INTERVALS.get(interval.lower())
+            if interval_ms is None:
+                return f"Error reconstructing balance history: unknown interval {interval!r}; use {', '.join(self.INTERVALS)}"
+
+            # Convert network name to chain ID (if needed)
+            chain_id = None
+            if network:  # Only include chainId if network is specified
+                chain_id = ZapperBase.get_chain_id(network)
+
+            history = load_balance_history(address, chain_id, limit)
+            formatted_result = self._format_balance_history(history, address, interval.lower(), interval_ms)
+
+            # Cache the result
+            self._cache[cache_key] = formatted_result
+
+            return formatted_result
+
+        except Exception as e:
+            return f"Error reconstructing balance history: {str(e)}"
+
+    def _format_balance_history(self, history: BalanceHistory, address: str, interval: str, interval_ms: int) -> str:
+        """Format reconstructed balances into a readable string."""
+        if not len(history):
+            return f"No token balance changes found for {address}."
+
+        tokens = sorted(history.token_summary(), key=lambda token: token["changes"], reverse=True)
+        token_ids = {token: idx for idx, token in enumerate(history.tokens)}
+        grid, curves = history.sample(interval_ms, self.CURVE_POINTS)
+
+        summary = [
+            f"Balance History for {address}:",
+            f"Replayed {len(history)} token balance changes of {len(tokens)} tokens "
+            f"({self._time(history.timestamps.min())} to {self._time(history.timestamps.max())}).",
+            "Balances are net changes since the first replayed transaction.\n"
+        ]
+
+        for token in tokens[:self.MAX_TOKENS]:
+            curve = curves[token_ids[(token["network"], token["address"])]]
+            points = ", ".join(
+                f"{self._time(timestamp, '%Y-%m-%d %H:%M' if interval == 'hour' else '%Y-%m-%d')}: {balance:,.4f}"
+                for timestamp, balance in zip(grid, curve)
+            )
+            summary.extend([
+                f"{token['symbol']} ({token['network']}, {token['address']}):",
+                f"  Changes: {token['changes']} ({self._time(token['first_change'])} to {self._time(token['last_change'])})",
+                f"  Net Balance Change: {token['balance']:,.4f}",
+                f"  Lowest / Highest: {token['lowest']:,.4f} / {token['highest']:,.4f}",
+                f"  Inflow / Outflow: {token['inflow']:,.4f} / {token['outflow']:,.4f}",
+                f"  Balance by {interval}: {points}",
+                ""
+            ])
+
+        if len(tokens) > self.MAX_TOKENS:
+            summary.append(f"... and {len(tokens) - self.MAX_TOKENS} more tokens with fewer changes.")
+
+        return "\n".join(summary)
+
+    @staticmethod
+    def _time(timestamp_ms: int, fmt: str = '%Y-%m-%d %H:%M:%S') -> str:
+        """Format a millisecond timestamp."""
+        return datetime.fromtimestamp(int(timestamp_ms) / 1000).strftime(fmt)
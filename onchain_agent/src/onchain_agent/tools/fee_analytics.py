@@ -0,0 +1,132 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# Gas price percentiles reported per network
+GAS_PRICE_PERCENTILES = (10, 25, 50, 75, 90)
+
+# numpy datetime units of the supported spend periods
+PERIOD_UNITS = {"day": "D", "week": "W", "month": "M", "year": "Y"}
+
+
+class FeeTable:
+    """Column arrays of the gas and fee data of many transactions.
+
+    One row per transaction: network, timestamp (s), gas used, gas price
+    (wei), fee in the network's native currency, action category and
+    whether it failed. Networks and categories are stored as codes into
+    ``networks`` / ``categories`` so every aggregation is a bincount.
+    """
+
+    def __init__(self, networks: List[str], network_codes: np.ndarray, timestamps: np.ndarray,
+                 gas_used: np.ndarray, gas_prices: np.ndarray, fees: np.ndarray,
+                 categories: List[str], category_codes: np.ndarray, failed: np.ndarray,
+                 currencies: Dict[str, str]):
+        self.networks = networks
+        self.network_codes = network_codes
+        self.timestamps = timestamps
+        self.gas_used = gas_used
+        self.gas_prices = gas_prices
+        self.fees = fees
+        self.categories = categories
+        self.category_codes = category_codes
+        self.failed = failed
+        self.currencies = currencies
+
+    def __len__(self) -> int:
+        return len(self.fees)
+
+    @classmethod
+    def from_details(cls, details: List[Tuple[str, Dict[str, Any]]]) -> "FeeTable":
+        """Build from (network name, transactionV2 data) pairs."""
+        networks: Dict[str, int] = {}
+        categories: Dict[str, int] = {}
+        currencies: Dict[str, str] = {}
+        columns: Dict[str, list] = {name: [] for name in ("network", "timestamp", "gas_used", "gas_price", "fee", "category", "failed")}
+        for network, tx in details:
+            gas_used = float(tx.get("gasUsed") or 0)
+            gas_price = float(tx.get("gasPrice") or 0)
+            fee = tx.get("fee") or {}
+            fee_value = fee.get("value")
+            category = (tx.get("processedData") or {}).get("actionCategory") or "UNKNOWN"
+            currencies.setdefault(network, fee.get("currency") or "native")
+            columns["network"].append(networks.setdefault(network, len(networks)))
+            columns["timestamp"].append(int(tx.get("timestamp") or 0))
+            columns["gas_used"].append(gas_used)
+            columns["gas_price"].append(gas_price)
+            # Fall back to gasUsed * gasPrice (wei) when the fee is not reported
+            columns["fee"].append(float(fee_value) if fee_value is not None else gas_used * gas_price / 1e18)
+            columns["category"].append(categories.setdefault(category, len(categories)))
+            columns["failed"].append(str(tx.get("status") or "").upper() in ("FAILED", "FAILURE", "REVERTED"))
+
+        return cls(
+            list(networks), np.asarray(columns["network"], dtype=np.int64),
+            np.asarray(columns["timestamp"], dtype=np.int64),
+            np.asarray(columns["gas_used"], dtype=np.float64),
+            np.asarray(columns["gas_price"], dtype=np.float64),
+            np.asarray(columns["fee"], dtype=np.float64),
+            list(categories), np.asarray(columns["category"], dtype=np.int64),
+            np.asarray(columns["failed"], dtype=bool), currencies
+        )
+
+    def _totals(self, codes: np.ndarray, labels: List[str], rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Transactions, fees, gas used and gas-weighted price per group code, largest spend first."""
+        fees, gas, prices, failed = self.fees, self.gas_used, self.gas_prices, self.failed
+        if rows is not None:
+            codes, fees, gas, prices, failed = codes[rows], fees[rows], gas[rows], prices[rows], failed[rows]
+        size = len(labels)
+        counts = np.bincount(codes, minlength=size)
+        fee_totals = np.bincount(codes, fees, minlength=size)
+        gas_totals = np.bincount(codes, gas, minlength=size)
+        gas_costs = np.bincount(codes, gas * prices, minlength=size)
+        failed_fees = np.bincount(codes, fees * failed, minlength=size)
+
+        groups = []
+        for code in np.flatnonzero(counts):
+            groups.append({
+                "key": labels[code],
+                "transactions": int(counts[code]),
+                "fees": float(fee_totals[code]),
+                "mean_fee": float(fee_totals[code] / counts[code]),
+                "gas_used": float(gas_totals[code]),
+                # Gas-weighted: what the group paid per unit of gas overall
+                "mean_gas_price_gwei": float(gas_costs[code] / gas_totals[code] / 1e9) if gas_totals[code] else 0.0,
+                "failed_fees": float(failed_fees[code])
+            })
+        return sorted(groups, key=lambda group: group["fees"], reverse=True)
+
+    def by_network(self) -> List[Dict[str, Any]]:
+        """Spend per network (each in its own native currency)."""
+        return self._totals(self.network_codes, self.networks)
+
+    def by_category(self, network: str) -> List[Dict[str, Any]]:
+        """Spend per action category on one network (fees are in its native currency)."""
+        return self._totals(self.category_codes, self.categories, self.network_codes == self.networks.index(network))
+
+    def by_period(self, network: str, period: str = "month") -> List[Dict[str, Any]]:
+        """Spend per calendar period on one network, oldest first."""
+        rows = self.network_codes == self.networks.index(network)
+        buckets = self.timestamps[rows].astype("datetime64[s]").astype(f"datetime64[{PERIOD_UNITS[period]}]")
+        periods, period_codes = np.unique(buckets, return_inverse=True)
+        codes = np.zeros(len(self), dtype=np.int64)
+        codes[rows] = period_codes.reshape(-1)
+        groups = self._totals(codes, [str(value) for value in periods], rows)
+        return sorted(groups, key=lambda group: group["key"])
+
+    def gas_price_strategy(self, network: str) -> Dict[str, Any]:
+        """Gas price percentiles on one network and what paying at most each one would have saved.
+
+        Savings assume the same gas used at the capped price; they bound what
+        a patient gas strategy could have recovered.
+        """
+        rows = (self.network_codes == self.networks.index(network)) & (self.gas_prices > 0)
+        prices, gas = self.gas_prices[rows], self.gas_used[rows]
+        if not len(prices):
+            return {"percentiles_gwei": {}, "savings": {}}
+        levels = np.percentile(prices, GAS_PRICE_PERCENTILES)
+        # (percentiles, transactions) excess over each cap, summed per cap
+        excess = np.maximum(prices[None, :] - levels[:, None], 0.0) @ gas / 1e18
+        return {
+            "percentiles_gwei": {f"p{p}": float(level / 1e9) for p, level in zip(GAS_PRICE_PERCENTILES, levels)},
+            "savings": {f"p{p}": float(saved) for p, saved in zip(GAS_PRICE_PERCENTILES, excess)}
+        }
@@ -0,0 +1,150 @@
+from typing import Type, ClassVar, Dict, Any, List, Optional, Tuple
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from .zapper_base import ZapperBase
+from .transaction_history_data import iter_transaction_history
+from .transaction_details_tool import load_transaction_details_bulk
+from .token_price_data import fetch_token_price
+from .fee_analytics import FeeTable, PERIOD_UNITS
+from ..metrics import instrument_tool_run, record_cache_lookup
+
+
+class FeeAnalyticsToolInput(BaseModel):
+    """Input schema for Fee Analytics Tool."""
+    address: str = Field(..., description="Wallet address whose transaction fees to analyze")
+    networks: str = Field("ethereum", description="Comma-separated networks to analyze (default: ethereum)")
+    limit: int = Field(200, description="Number of most recent transactions to analyze per network (default: 200)")
+    period: str = Field("month", description="Period to total spend by: day, week, month or year (default: month)")
+    portfolio_value_usd: Optional[float] = Field(None, description="Current portfolio value in USD, to express fees as a share of it")
+
+
+class FeeAnalyticsTool(BaseTool):
+    """Tool to aggregate gas and fee spend over a wallet's transactions."""
+    name: str = "Gas & Fee Analytics Tool"
+    description: str = (
+        "Analyzes the gas and fees a wallet paid across its recent transactions in one call: spend per "
+        "network, per period and per action category, failed-transaction spend, gas price percentiles and "
+        "what a lower gas price cap would have saved. Use this to assess gas efficiency, optionally as a "
+        "share of portfolio value."
+    )
+    args_schema: Type[BaseModel] = FeeAnalyticsToolInput
+
+    # Native gas token as addressed by fungibleTokenV2
+    NATIVE_TOKEN_ADDRESS: ClassVar[str] = "0x0000000000000000000000000000000000000000"
+    # Categories and periods listed per network
+    MAX_CATEGORIES: ClassVar[int] = 8
+    MAX_PERIODS: ClassVar[int] = 12
+
+    def __init__(self, **kwargs):
+        """Initialize the FeeAnalyticsTool with cache."""
+        super().__init__(**kwargs)
+        self._cache = {}
+
+    def _cache_key(self, address: str, networks: str, limit: int, period: str, portfolio_value_usd: Optional[float]) -> str:
+        """Generate a cache key based on input parameters."""
+        return f"{address.lower()}:{networks.lower()}:{limit}:{period.lower()}:{portfolio_value_usd}"
+
+    @instrument_tool_run
+    def _run(self, address: str, networks: str = "ethereum", limit: int = 200, period: str = "month",
+             portfolio_value_usd: Optional[float] = None) -> str:
+        """Run the fee analysis with caching."""
+        # Check cache first
+        cache_key = self._cache_key(address, networks, limit, period, portfolio_value_usd)
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
+
+        try:
+            period = period.lower()
+            if period not in PERIOD_UNITS:
+                return f"Error analyzing fees: unknown period {period!r}; use {', '.join(PERIOD_UNITS)}"
+
+            # Resolve every network before making any request
+            chains = [(name.strip().lower(), ZapperBase.get_chain_id(name.strip())) for name in networks.split(",") if name.strip()]
+
+            details: List[Tuple[str, Dict[str, Any]]] = []
+            native_prices: Dict[str, float] = {}
+            for network, chain_id in chains:
+                hashes = [
+                    ((edge.get("node") or {}).get("transaction") or {}).get("hash")
+                    for edge in iter_transaction_history(address, chain_id, limit)
+                ]
+                details.extend((network, tx) for tx in load_transaction_details_bulk(hashes, chain_id).values())
+                price = self._native_price(chain_id)
+                if price is not None:
+                    native_prices[network] = price
+
+            formatted_result = self._format_fees(FeeTable.from_details(details), address, period, native_prices, portfolio_value_usd)
+
+            # Cache the result
+            self._cache[cache_key] = formatted_result
+
+            return formatted_result
+
+        except Exception as e:
+            return f"Error analyzing fees: {str(e)}"
+
+    def _native_price(self, chain_id: int) -> Optional[float]:
+        """Current USD price of a network's gas token, or None if it cannot be priced."""
+        try:
+            result = fetch_token_price(self.NATIVE_TOKEN_ADDRESS, chain_id, 1)
+            price = (((result.get("data") or {}).get("fungibleTokenV2") or {}).get("priceData") or {}).get("price")
+            return float(price) if price else None
+        except Exception:
+            return None
+
+    def _format_fees(self, table: FeeTable, address: str, period: str, native_prices: Dict[str, float],
+                     portfolio_value_usd: Optional[float]) -> str:
+        """Format fee aggregates into a readable string."""
+        if not len(table):
+            return f"No transaction fee data found for {address}."
+
+        networks = table.by_network()
+        priced = [group for group in networks if group["key"] in native_prices]
+        total_usd = sum(group["fees"] * native_prices[group["key"]] for group in priced)
+        priced_transactions = sum(group["transactions"] for group in priced)
+        summary = [f"Gas & Fee Analytics for {address} ({len(table)} transactions):"]
+        if priced_transactions:
+            summary.append(f"Total Fees (priced networks): ${total_usd:,.2f} (${total_usd / priced_transactions:,.4f} per transaction)")
+            if portfolio_value_usd:
+                summary.append(f"Fees as Share of Portfolio Value: {total_usd / portfolio_value_usd * 100:.4f}%")
+        summary.append("")
+
+        for group in networks:
+            network = group["key"]
+            currency = table.currencies.get(network, "native")
+            usd = f" (${group['fees'] * native_prices[network]:,.2f})" if network in native_prices else ""
+            strategy = table.gas_price_strategy(network)
+            summary.extend([
+                f"{network.upper()}:",
+                f"  Transactions: {group['transactions']}",
+                f"  Total Fees: {group['fees']:.6f} {currency}{usd}",
+                f"  Average Fee: {group['mean_fee']:.6f} {currency}",
+                f"  Gas Used: {group['gas_used']:,.0f} at {group['mean_gas_price_gwei']:.2f} Gwei on average",
+                f"  Spent on Failed Transactions: {group['failed_fees']:.6f} {currency}"
+            ])
+            if strategy["percentiles_gwei"]:
+                summary.append("  Gas Price Percentiles: " + ", ".join(
+                    f"{name} {value:.2f} Gwei" for name, value in strategy["percentiles_gwei"].items()
+                ))
+                summary.append("  Savings if Gas Price Were Capped at: " + ", ".join(
+                    f"{name} {value:.6f} {currency}" for name, value in strategy["savings"].items()
+                ))
+
+            summary.append("  By Action Category:")
+            for category in table.by_category(network)[:self.MAX_CATEGORIES]:
+                summary.append(
+                    f"    {category['key']}: {category['transactions']} txs, {category['fees']:.6f} {currency} "
+                    f"({category['fees'] / group['fees'] * 100 if group['fees'] else 0:.1f}%)"
+                )
+
+            summary.append(f"  By {period.title()}:")
+            for bucket in table.by_period(network, period)[-self.MAX_PERIODS:]:
+                summary.append(
+                    f"    {bucket['key']}: {bucket['transactions']} txs, {bucket['fees']:.6f} {currency}, "
+                    f"{bucket['mean_gas_price_gwei']:.2f} Gwei average"
+                )
+            summary.append("")
+
+        return "\n".join(summary)
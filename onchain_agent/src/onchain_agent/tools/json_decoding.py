@@ -0,0 +1,129 @@
+import json
+from collections import deque
+from typing import Dict, Any, Deque, Iterable, Iterator, List
+
+# Optional decoders (pip install "onchain_agent[fast-json]"): orjson parses
+# whole bodies several times faster than the json module, and ijson decodes a
+# body incrementally so large pages never have to be held in memory at once
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Bytes read from a response body at a time while streaming
+CHUNK_SIZE = 64 * 1024
+
+
+def loads(data: bytes) -> Any:
+    """Decode a whole JSON document, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def streaming_available() -> bool:
+    """Whether EdgeStream decodes incrementally (ijson is installed)."""
+    return ijson is not None
+
+
+class _ChunkReader:
+    """File-like view of an iterator of byte chunks that keeps the first and last chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+        self.head = b""
+        self.tail: Deque[bytes] = deque(maxlen=2)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._pending:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                return b""
+            self.bytes_read += len(chunk)
+            if not self.head:
+                self.head = chunk
+            self.tail.append(chunk)
+            self._pending = chunk
+        if size is None or size < 0 or size >= len(self._pending):
+            data, self._pending = self._pending, b""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def read_all(self) -> bytes:
+        return b"".join(iter(lambda: self.read(), b""))
+
+
+def _find_member(buffer: bytes, key: str) -> Any:
+    """Decode the value of the last ``"key":`` member found in a JSON fragment, or None."""
+    text = buffer.decode("utf-8", errors="replace")
+    marker = f'"{key}":'
+    decoder = json.JSONDecoder()
+    position = len(text)
+    while True:
+        position = text.rfind(marker, 0, position)
+        if position < 0:
+            return None
+        start = position + len(marker)
+        while start < len(text) and text[start] in " \t\r\n":
+            start += 1
+        try:
+            return decoder.raw_decode(text, start)[0]
+        except ValueError:
+            continue
+
+
+class EdgeStream:
+    """Edges of one GraphQL connection, decoded as the response body arrives.
+
+    Iterating yields each ``data.<connection>.edges`` item as soon as it has
+    been parsed, so only the current edge is ever held in memory; once
+    exhausted, ``page_info`` and ``errors`` are filled in. Responses list
+    fields in selection order, so the connection's pageInfo (selected after
+    its edges) is read from the last chunks and top-level errors from the
+    first or last ones. Without ijson the body is decoded whole and its edges
+    are yielded from that.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], connection: str):
+        self.chunks = chunks
+        self.connection = connection
+        self.page_info: Dict[str, Any] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        reader = _ChunkReader(self.chunks)
+        if ijson is None:
+            yield from self._decode_whole(reader)
+            return
+
+        prefix = f"data.{self.connection}.edges.item"
+        yield from ijson.items(reader, prefix, use_float=True, buf_size=CHUNK_SIZE)
+        self.bytes_read = reader.bytes_read
+
+        tail = b"".join(reader.tail)
+        if reader.bytes_read <= len(tail):
+            # The whole body is buffered: decode the small remainder properly
+            body = loads(tail or b"{}")
+            connection = ((body or {}).get("data") or {}).get(self.connection) or {}
+            self.page_info = connection.get("pageInfo") or {}
+            self.errors = (body or {}).get("errors") or []
+            return
+        self.page_info = _find_member(tail, "pageInfo") or {}
+        self.errors = _find_member(tail, "errors") or _find_member(reader.head, "errors") or []
+
+    def _decode_whole(self, reader: _ChunkReader) -> Iterator[Dict[str, Any]]:
+        body = loads(reader.read_all() or b"{}")
+        self.bytes_read = reader.bytes_read
+        connection = ((body or {}).get("data") or {}).get(self.connection) or {}
+        self.page_info = connection.get("pageInfo") or {}
+        self.errors = (body or {}).get("errors") or []
+        yield from connection.get("edges") or []
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Any, Set
+
+# Automatic persisted queries: the client sends the SHA-256 of a query document
+# instead of its text; a server that has not seen the hash answers
+# PERSISTED_QUERY_NOT_FOUND and the client resends once with the full text
+PERSISTED_QUERY_VERSION = 1
+NOT_FOUND_CODES = ("PERSISTED_QUERY_NOT_FOUND", "PersistedQueryNotFound")
+NOT_SUPPORTED_CODES = ("PERSISTED_QUERY_NOT_SUPPORTED", "PersistedQueryNotSupported")
+
+
+def query_hash(query: str) -> str:
+    """Hex SHA-256 of a query document, as used by the persisted query protocol."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def persisted_query_extension(sha256_hash: str) -> Dict[str, Any]:
+    """The ``extensions`` entry of a request that refers to a query by hash."""
+    return {"persistedQuery": {"version": PERSISTED_QUERY_VERSION, "sha256Hash": sha256_hash}}
+
+
+class QueryRegistry:
+    """Hashes of the fixed query documents, and the endpoints that reject them.
+
+    Documents are registered when their module is imported, so no hash is
+    computed on the request path. An endpoint that answers a hash-only
+    request with anything but PERSISTED_QUERY_NOT_FOUND is remembered as
+    unsupported and gets the full query text from then on.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, str] = {}
+        self._unsupported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def register(self, query: str) -> str:
+        """Precompute and return the hash of a query document."""
+        sha256_hash = self._hashes.get(query)
+        if sha256_hash is None:
+            sha256_hash = query_hash(query)
+            with self._lock:
+                self._hashes[query] = sha256_hash
+        return sha256_hash
+
+    def hash_for(self, query: str) -> str:
+        """Hash of a query document, registering documents built at run time."""
+        return self._hashes.get(query) or self.register(query)
+
+    def supports(self, url: str) -> bool:
+        """Whether hash-only requests are sent to an endpoint."""
+        return url not in self._unsupported
+
+    def mark_unsupported(self, url: str) -> None:
+        """Send full query text to an endpoint from now on."""
+        with self._lock:
+            self._unsupported.add(url)
+
+
+# Process-wide registry of the tools' query documents
+_registry = QueryRegistry()
+
+
+def get_query_registry() -> QueryRegistry:
+    """Return the process-wide query registry."""
+    return _registry
+
+
+def persisted_queries_enabled() -> bool:
+    """Persisted queries are on unless ZAPPER_PERSISTED_QUERIES is 0/false/off."""
+    return os.getenv("ZAPPER_PERSISTED_QUERIES", "1").strip().lower() not in ("0", "false", "off", "no")
@@ -0,0 +1,223 @@
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .zapper_base import ZapperBase
+from .balance_history import BalanceHistory
+from .token_price_data import fetch_token_price
+
+# Lot matching used for the cost of units sold
+COST_BASIS_METHODS = ("fifo", "lifo", "average")
+
+# Profile that returns price tick timestamps
+PRICE_PROFILE = "analytics"
+# Concurrent fungibleTokenV2 requests while pricing a wallet's tokens
+PRICE_WORKERS = 4
+
+# Log-ratio standing in for log(0) when a position is fully sold (exp() of it is exactly 0.0)
+_CLOSED_LOG_RATIO = -1000.0
+
+
+class PriceSeries:
+    """Close prices of one token over time, plus its current price."""
+
+    def __init__(self, timestamps: np.ndarray, closes: np.ndarray, current: float):
+        order = np.argsort(timestamps, kind="stable")
+        self.timestamps = timestamps[order]
+        self.closes = closes[order]
+        self.current = current
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> Optional["PriceSeries"]:
+        """Build from a fungibleTokenV2 response queried with the analytics profile, or None."""
+        token = ((data or {}).get("data") or {}).get("fungibleTokenV2") or {}
+        price_data = token.get("priceData") or {}
+        ticks = [tick for tick in price_data.get("priceTicks") or []
+                 if tick.get("timestamp") is not None and tick.get("close") is not None]
+        current = price_data.get("price")
+        if not ticks and current is None:
+            return None
+        timestamps = np.fromiter((int(tick["timestamp"]) for tick in ticks), dtype=np.int64, count=len(ticks))
+        closes = np.fromiter((float(tick["close"]) for tick in ticks), dtype=np.float64, count=len(ticks))
+        if current is None:
+            current = closes[np.argmax(timestamps)]
+        return cls(timestamps, closes, float(current))
+
+    def at(self, timestamps: np.ndarray) -> np.ndarray:
+        """Last close at or before each timestamp (the first close for earlier ones)."""
+        if not len(self.timestamps):
+            return np.full(len(timestamps), self.current)
+        rows = np.searchsorted(self.timestamps, timestamps, side="right") - 1
+        return self.closes[np.clip(rows, 0, None)]
+
+
+def _matched_sales(amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split signed deltas into buys and sells, and match sells to units held.
+
+    ``consumed`` is the cumulative quantity sold out of units bought within
+    the history: c[t] = min(c[t-1] + sell[t], bought[t]), which unrolls to
+    sold[t] + min(0, min over k <= t of (bought[k] - sold[k])). Quantity
+    sold beyond that came from balances held before the history began.
+    """
+    buys = np.where(amounts > 0, amounts, 0.0)
+    sells = np.where(amounts < 0, -amounts, 0.0)
+    bought = np.cumsum(buys)
+    sold = np.cumsum(sells)
+    consumed = sold + np.minimum(np.minimum.accumulate(bought - sold), 0.0)
+    return buys, sells, consumed
+
+
+def _fifo_costs(buys: np.ndarray, prices: np.ndarray, consumed: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Cost of each row's sold units and of the units left, oldest lots sold first.
+
+    Under FIFO the first x units sold are the first x units bought, so the
+    cost of everything sold so far is the cumulative buy cost interpolated
+    at the cumulative quantity sold.
+    """
+    bought_rows = buys > 0
+    lot_ends = np.concatenate(([0.0], np.cumsum(buys)[bought_rows]))
+    lot_costs = np.concatenate(([0.0], np.cumsum(buys * prices)[bought_rows]))
+    consumed_cost = np.interp(consumed, lot_ends, lot_costs)
+    return np.diff(consumed_cost, prepend=0.0), float(lot_costs[-1] - consumed_cost[-1])
+
+
+def _average_costs(buys: np.ndarray, prices: np.ndarray, consumed: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Cost of each row's sold units and of the units left at the running average cost.
+
+    The cost held follows C[t] = r[t] * C[t-1] + b[t], with r the share of
+    the position kept by a sale and b the cost of a buy. That unrolls to
+    C[t] = sum over k <= t of b[k] * exp(G[t] - G[k]), G being the
+    cumulative log of r, which is evaluated in log space with
+    logaddexp.accumulate so long runs of partial sales cannot overflow.
+    """
+    held = np.cumsum(buys) - consumed
+    held_before = np.concatenate(([0.0], held[:-1]))
+    sold_rows = np.diff(consumed, prepend=0.0) > 0
+    ratio = np.ones(len(buys))
+    np.divide(held, held_before, out=ratio, where=sold_rows & (held_before > 0))
+    ratio[sold_rows & (held_before <= 0)] = 0.0
+    with np.errstate(divide="ignore"):
+        log_ratio = np.where(ratio > 0, np.log(np.where(ratio > 0, ratio, 1.0)), _CLOSED_LOG_RATIO)
+        log_growth = np.cumsum(log_ratio)
+        log_buy_costs = np.log(buys * prices)
+    cost_held = np.exp(log_growth + np.logaddexp.accumulate(log_buy_costs - log_growth))
+    cost_before = np.concatenate(([0.0], cost_held[:-1]))
+    return np.where(sold_rows, cost_before - cost_held, 0.0), float(cost_held[-1])
+
+
+def _lifo_costs(buys: np.ndarray, prices: np.ndarray, consumed: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Cost of each row's sold units and of the units left, newest lots sold first.
+
+    Which lot a LIFO sale draws from depends on every earlier sale, so this
+    is one pass over a stack of open lots (amortized O(n)) rather than a
+    prefix scan.
+    """
+    matched = np.diff(consumed, prepend=0.0)
+    costs = np.zeros(len(buys))
+    lots: List[List[float]] = []
+    # Plain floats: indexing numpy scalars one at a time is several times slower
+    buy_list, price_list, matched_list = buys.tolist(), prices.tolist(), matched.tolist()
+    for row in np.flatnonzero((buys > 0) | (matched > 0)).tolist():
+        if buy_list[row] > 0:
+            lots.append([buy_list[row], price_list[row]])
+            continue
+        remaining, cost = matched_list[row], 0.0
+        while remaining > 0 and lots:
+            lot = lots[-1]
+            taken = min(lot[0], remaining)
+            cost += taken * lot[1]
+            remaining -= taken
+            lot[0] -= taken
+            if lot[0] <= 0:
+                lots.pop()
+        costs[row] = cost
+    return costs, float(sum(quantity * price for quantity, price in lots))
+
+
+_COST_FUNCTIONS = {"fifo": _fifo_costs, "lifo": _lifo_costs, "average": _average_costs}
+
+
+def position_pnl(amounts: np.ndarray, prices: np.ndarray, current_price: float, method: str = "fifo") -> Dict[str, Any]:
+    """Cost basis and realized/unrealized PnL of one token's time-ordered deltas.
+
+    ``prices`` holds the token's price at each delta. Sales of units held
+    before the history began have no known cost; their proceeds are
+    reported separately and left out of realized PnL.
+    """
+    if method not in _COST_FUNCTIONS:
+        raise ValueError(f"Unknown cost basis method {method!r}; expected one of {', '.join(COST_BASIS_METHODS)}")
+    buys, sells, consumed = _matched_sales(amounts)
+    matched = np.diff(consumed, prepend=0.0)
+    sale_costs, cost_held = _COST_FUNCTIONS[method](buys, prices, consumed)
+
+    # Rounding in the cumulative sums leaves dust where a sale was fully matched
+    unmatched = sells - matched
+    unmatched[unmatched <= 1e-9 * sells] = 0.0
+
+    held = float(buys.sum() - consumed[-1]) if len(amounts) else 0.0
+    realized = float(np.dot(matched, prices) - sale_costs.sum())
+    unrealized = held * current_price - cost_held
+    return {
+        "bought": float(buys.sum()),
+        "sold": float(sells.sum()),
+        "held": held,
+        "cost_basis": cost_held,
+        "average_cost": cost_held / held if held > 0 else None,
+        "realized_pnl": realized,
+        "unrealized_pnl": unrealized,
+        "unmatched_sold": float(unmatched.sum()),
+        "unmatched_proceeds": float(np.dot(unmatched, prices))
+    }
+
+
+def wallet_pnl(history: BalanceHistory, prices: Dict[int, PriceSeries], method: str = "fifo") -> List[Dict[str, Any]]:
+    """PnL of every priced token of a replayed history, joined with its price series."""
+    results = []
+    for token_id, series in prices.items():
+        timestamps, _ = history.curve(token_id)
+        if not len(timestamps):
+            continue
+        rows = slice(history.starts[token_id], history.ends[token_id])
+        pnl = position_pnl(history.amounts[rows], series.at(timestamps), series.current, method)
+        network, address = history.tokens[token_id]
+        pnl.update({
+            "symbol": history.symbols[token_id],
+            "network": network,
+            "address": address,
+            "changes": len(timestamps),
+            "current_price": series.current
+        })
+        results.append(pnl)
+    return results
+
+
+def load_prices(history: BalanceHistory, token_ids: List[int], chain_id: Optional[int] = None,
+                currency: str = "USD") -> Dict[int, PriceSeries]:
+    """Fetch the price series of the given tokens, covering the whole history.
+
+    Tokens are priced on ``chain_id`` when given, else on the network their
+    deltas were recorded on; tokens that cannot be priced are left out.
+    """
+    if not len(history):
+        return {}
+    days = max(1, math.ceil((time.time() * 1000 - int(history.timestamps.min())) / 86_400_000))
+    def fetch(token_id: int) -> Optional[PriceSeries]:
+        network, address = history.tokens[token_id]
+        token_chain_id = chain_id or ZapperBase.get_chain_id_for_network(network)
+        if not token_chain_id or not address.startswith("0x"):
+            return None
+        try:
+            data = fetch_token_price(address, token_chain_id, days, currency, profile=PRICE_PROFILE)
+        except Exception:
+            return None
+        return PriceSeries.from_response(data)
+
+    with ThreadPoolExecutor(max_workers=PRICE_WORKERS, thread_name_prefix="pnl-prices") as pool:
+        # Each fetch runs in a copy of the caller's context (tool, deadline, tracer, event stream)
+        futures = [pool.submit(contextvars.copy_context().run, fetch, token_id) for token_id in token_ids]
+        series = [future.result() for future in futures]
+    return {token_id: prices for token_id, prices in zip(token_ids, series) if prices is not None}
@@ -0,0 +1,117 @@
+from typing import Type, ClassVar, Dict, Any, List
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from .zapper_base import ZapperBase
+from .balance_history import load_balance_history
+from .pnl import COST_BASIS_METHODS, load_prices, wallet_pnl
+from ..metrics import instrument_tool_run, record_cache_lookup
+
+
+class PnLToolInput(BaseModel):
+    """Input schema for PnL Tool."""
+    address: str = Field(..., description="Wallet address to compute cost basis and PnL for")
+    network: str = Field("ethereum", description="Blockchain network to query (default: ethereum)")
+    limit: int = Field(500, description="Number of most recent transactions to replay (default: 500)")
+    method: str = Field("fifo", description="Cost basis method: fifo, lifo or average (default: fifo)")
+    currency: str = Field("USD", description="Currency for prices and PnL (default: USD)")
+
+
+class PnLTool(BaseTool):
+    """Tool to compute cost basis and realized/unrealized PnL per token of a wallet."""
+    name: str = "Cost Basis & PnL Tool"
+    description: str = (
+        "Computes the cost basis and realized and unrealized profit and loss of each token a wallet "
+        "traded, by pricing the token balance changes of its recent transactions at historical prices. "
+        "Supports FIFO, LIFO and average cost. Use this to evaluate entries, exits and trading performance."
+    )
+    args_schema: Type[BaseModel] = PnLToolInput
+
+    # Most active tokens priced per call (one price request each)
+    MAX_PRICED_TOKENS: ClassVar[int] = 20
+
+    def __init__(self, **kwargs):
+        """Initialize the PnLTool with cache."""
+        super().__init__(**kwargs)
+        self._cache = {}
+
+    def _cache_key(self, address: str, network: str, limit: int, method: str, currency: str) -> str:
+        """Generate a cache key based on input parameters."""
+        return f"{address.lower()}:{network.lower()}:{limit}:{method.lower()}:{currency.upper()}"
+
+    @instrument_tool_run
+    def _run(self, address: str, network: str = "ethereum", limit: int = 500, method: str = "fifo",
+             currency: str = "USD") -> str:
+        """Run the PnL computation with caching."""
+        # Check cache first
+        cache_key = self._cache_key(address, network, limit, method, currency)
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
+
+        try:
+            method = method.lower()
+            if method not in COST_BASIS_METHODS:
+                return f"Error computing PnL: unknown method {method!r}; use {', '.join(COST_BASIS_METHODS)}"
+
+            # Convert network name to chain ID (if needed)
+            chain_id = None
+            if network:  # Only include chainId if network is specified
+                chain_id = ZapperBase.get_chain_id(network)
+
+            # Replay the wallet's token deltas, then price its most active tokens over the same period
+            history = load_balance_history(address, chain_id, limit)
+            summary = sorted(enumerate(history.ends - history.starts), key=lambda item: item[1], reverse=True)
+            token_ids = [token_id for token_id, changes in summary if changes][:self.MAX_PRICED_TOKENS]
+            prices = load_prices(history, token_ids, chain_id, currency)
+            positions = wallet_pnl(history, prices, method)
+
+            formatted_result = self._format_pnl(positions, address, method, currency.upper(), len(history), len(token_ids))
+
+            # Cache the result
+            self._cache[cache_key] = formatted_result
+
+            return formatted_result
+
+        except Exception as e:
+            return f"Error computing PnL: {str(e)}"
+
+    def _format_pnl(self, positions: List[Dict[str, Any]], address: str, method: str, currency: str,
+                    changes: int, requested: int) -> str:
+        """Format per-token PnL into a readable string."""
+        if not positions:
+            if not changes:
+                return f"No token balance changes found for {address}."
+            return f"No price data found for the tokens traded by {address}."
+
+        positions = sorted(positions, key=lambda p: abs(p["realized_pnl"]) + abs(p["unrealized_pnl"]), reverse=True)
+        realized = sum(p["realized_pnl"] for p in positions)
+        unrealized = sum(p["unrealized_pnl"] for p in positions)
+
+        summary = [
+            f"Cost Basis & PnL for {address} ({method.upper()}, {currency}):",
+            f"Replayed {changes} token balance changes; priced {len(positions)} of the {requested} most active tokens.",
+            f"Total Realized PnL: {realized:,.2f}",
+            f"Total Unrealized PnL: {unrealized:,.2f}",
+            "Cost basis only covers units acquired within the replayed transactions.\n"
+        ]
+
+        for p in positions:
+            average_cost = f"{p['average_cost']:,.6f}" if p["average_cost"] is not None else "n/a"
+            lines = [
+                f"{p['symbol']} ({p['network']}, {p['address']}):",
+                f"  Bought / Sold: {p['bought']:,.4f} / {p['sold']:,.4f} over {p['changes']} changes",
+                f"  Held: {p['held']:,.4f} at average cost {average_cost} (current price {p['current_price']:,.6f})",
+                f"  Cost Basis: {p['cost_basis']:,.2f}",
+                f"  Realized PnL: {p['realized_pnl']:,.2f}",
+                f"  Unrealized PnL: {p['unrealized_pnl']:,.2f}"
+            ]
+            if p["unmatched_sold"] > 0:
+                lines.append(
+                    f"  Sold from earlier holdings (no cost basis): {p['unmatched_sold']:,.4f} "
+                    f"for {p['unmatched_proceeds']:,.2f}"
+                )
+            lines.append("")
+            summary.extend(lines)
+
+        return "\n".join(summary)
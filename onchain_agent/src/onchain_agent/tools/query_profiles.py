@@ -0,0 +1,61 @@
+import os
+import re
+from typing import Dict, Optional
+
+from .persisted_queries import get_query_registry
+
+# Query profiles from smallest to largest; each one includes every field of the ones before it:
+#   summary   - only the fields the tools' formatters read
+#   analytics - adds identifiers, addresses, timestamps and raw numbers used by analytics code
+#   full      - every field of the original documents (images, raw amounts, OHLC ticks, ...)
+PROFILES = ("summary", "analytics", "full")
+DEFAULT_PROFILE = "summary"
+
+# Trailing tag marking a field (or a whole selection block) as belonging to a larger profile
+_PROFILE_TAG = re.compile(r"#\s*@(analytics|full)\s*$")
+
+
+def default_profile() -> str:
+    """Profile used when a caller does not pick one (ZAPPER_QUERY_PROFILE, else summary)."""
+    return os.getenv("ZAPPER_QUERY_PROFILE", DEFAULT_PROFILE).strip().lower() or DEFAULT_PROFILE
+
+
+def build_query(template: str, profile: str) -> str:
+    """Render a tagged GraphQL document for one profile.
+
+    Lines ending in ``# @analytics`` or ``# @full`` are kept only for that
+    profile and larger ones; a tagged line that opens a selection block drops
+    the whole block. Comments and indentation are stripped from the result.
+    """
+    level = PROFILES.index(profile)
+    lines = []
+    skip_depth = 0
+    for line in template.splitlines():
+        code = line.split("#", 1)[0]
+        if skip_depth:
+            skip_depth += code.count("{") - code.count("}")
+            continue
+        tag = _PROFILE_TAG.search(line)
+        if tag and PROFILES.index(tag.group(1)) > level:
+            skip_depth = code.count("{") - code.count("}")
+            continue
+        code = code.strip()
+        if code:
+            lines.append(code)
+    return "\n".join(lines)
+
+
+def build_queries(template: str) -> Dict[str, str]:
+    """Render a tagged GraphQL document for every profile and register their persisted query hashes."""
+    queries = {profile: build_query(template, profile) for profile in PROFILES}
+    for query in queries.values():
+        get_query_registry().register(query)
+    return queries
+
+
+def select_query(queries: Dict[str, str], profile: Optional[str] = None) -> str:
+    """Pick a rendered document, defaulting to default_profile()."""
+    profile = profile or default_profile()
+    if profile not in queries:
+        raise ValueError(f"Unknown query profile {profile!r}; expected one of {', '.join(PROFILES)}")
+    return queries[profile]
@@ -0,0 +1,312 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+import requests
+
+from ..metrics import ZAPPER_CIRCUIT_TRANSITIONS
+
+# Longest a single Zapper request may wait on the socket, and on connecting (seconds)
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+# Recent latencies kept per operation, and how many are needed before hedging it
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+# Shortest wait before a hedge, so a fast operation is never sent twice at once
+MIN_HEDGE_DELAY = 0.05
+HEDGE_WORKERS = 16
+
+# Consecutive failures that open the circuit, and how long it stays open (seconds)
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+
+class RequestRejected(RuntimeError):
+    """A Zapper request refused before it was sent."""
+    status = "rejected"
+
+
+class DeadlineExceeded(RequestRejected):
+    """The run's time budget is spent."""
+    status = "deadline_exceeded"
+
+
+class CircuitOpen(RequestRejected):
+    """The endpoint has been failing and is not being called for now."""
+    status = "circuit_open"
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else default
+
+
+# Monotonic time by which the current run must finish, if it has a budget
+_deadline: contextvars.ContextVar = contextvars.ContextVar("run_deadline", default=None)
+
+
+def budget_from_env() -> Optional[float]:
+    """Run budget in seconds from ONCHAIN_RUN_BUDGET, or None for no budget."""
+    return _env_float("ONCHAIN_RUN_BUDGET", None)
+
+
+@contextmanager
+def run_budget(seconds: Optional[float]):
+    """Give every Zapper request made inside the block a share of ``seconds``.
+
+    Requests time out no later than the end of the budget and are refused
+    with DeadlineExceeded once it is spent. A nested budget cannot extend
+    the outer one. None leaves the block without a budget.
+    """
+    if seconds is None:
+        yield None
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    with deadline_context(min(deadline, outer) if outer is not None else deadline):
+        yield deadline
+
+
+@contextmanager
+def deadline_context(deadline: Optional[float]):
+    """Apply a deadline captured with current_deadline(), e.g. in a worker thread."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Monotonic deadline of the current run, if it has a budget."""
+    return _deadline.get()
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current run's budget, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class LatencyTracker:
+    """Recent request latencies per operation, for choosing when to hedge."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record the latency of one completed request."""
+        with self._lock:
+            samples = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, operation: str, percentile: float) -> Optional[float]:
+        """Latency at ``percentile`` of the recent requests, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(operation) or ())
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+class CircuitBreaker:
+    """Fails requests to an endpoint fast after repeated failures.
+
+    Closed: requests go through. After ``failures`` consecutive transport
+    errors or 5xx responses it opens and every request is refused for
+    ``cooldown`` seconds; then one probe request is let through (half-open),
+    which closes the circuit on success or reopens it on failure.
+    """
+
+    def __init__(self, failures: int = DEFAULT_BREAKER_FAILURES, cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            ZAPPER_CIRCUIT_TRANSITIONS.inc(state)
+
+    def before_request(self) -> None:
+        """Raise CircuitOpen unless a request may be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self._transition("half_open")
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            raise CircuitOpen(f"API request skipped: Zapper API is failing (circuit open, retrying in {retry_in:.0f}s)")
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a request that was let through."""
+        with self._lock:
+            self._probing = False
+            if success:
+                self._consecutive = 0
+                self._transition("closed")
+                return
+            self._consecutive += 1
+            if self.state == "half_open" or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._transition("open")
+
+
+class RequestPolicy:
+    """Timeouts, hedging and circuit breaking of Zapper HTTP requests.
+
+    Configured from the environment: ZAPPER_TIMEOUT and
+    ZAPPER_CONNECT_TIMEOUT bound each request, ZAPPER_HEDGE_PERCENTILE
+    (off by default) sends a duplicate of a request still unanswered after
+    that percentile of its operation's recent latency, and
+    ZAPPER_BREAKER_FAILURES / ZAPPER_BREAKER_COOLDOWN tune the breaker.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 hedge_percentile: Optional[float] = None, breaker_failures: int = DEFAULT_BREAKER_FAILURES,
+                 breaker_cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.hedge_percentile = hedge_percentile
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.latency = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RequestPolicy":
+        """Build a policy from the ZAPPER_* environment variables."""
+        return cls(
+            timeout=_env_float("ZAPPER_TIMEOUT", DEFAULT_TIMEOUT),
+            connect_timeout=_env_float("ZAPPER_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+            hedge_percentile=_env_float("ZAPPER_HEDGE_PERCENTILE", None),
+            breaker_failures=int(_env_float("ZAPPER_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES)),
+            breaker_cooldown=_env_float("ZAPPER_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN)
+        )
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Circuit breaker of one endpoint."""
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(url, CircuitBreaker(self.breaker_failures, self.breaker_cooldown))
+        return breaker
+
+    def request_timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout of a request sent now, within the run's budget.
+
+        The read timeout bounds each wait on the socket, so a stalled
+        connection fails at the deadline at the latest.
+        """
+        timeout = self.timeout
+        remaining = remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded("API request skipped: the run's time budget is spent")
+            timeout = min(timeout, remaining)
+        return min(self.connect_timeout, timeout), timeout
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """How long to wait for a request before hedging it, or None to never hedge."""
+        if not self.hedge_percentile:
+            return None
+        delay = self.latency.percentile(operation, self.hedge_percentile)
+        return None if delay is None else max(delay, MIN_HEDGE_DELAY)
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="zapper-hedge")
+        return self._pool
+
+    def send(self, url: str, operation: str, attempt: Callable[[], requests.Response], hedge: bool = True,
+             on_hedge: Optional[Callable[[], None]] = None) -> requests.Response:
+        """Send a request through the endpoint's breaker, hedging it when allowed.
+
+        ``attempt`` makes one HTTP request; it runs again on another thread
+        (``on_hedge`` is called first) if the first attempt is slower than
+        the operation's hedge percentile, and the first response wins.
+        """
+        breaker = self.breaker(url)
+        breaker.before_request()
+        delay = self.hedge_delay(operation) if hedge else None
+        try:
+            if delay is None:
+                response = self._timed(operation, attempt)
+            else:
+                response = self._hedged(operation, attempt, delay, on_hedge)
+        except BaseException:
+            # Any failure ends a half-open probe, or the breaker would stay probing forever
+            breaker.record(False)
+            raise
+        breaker.record(response.status_code < 500)
+        return response
+
+    def _timed(self, operation: str, attempt: Callable[[], requests.Response]) -> requests.Response:
+        started = time.perf_counter()
+        response = attempt()
+        self.latency.observe(operation, time.perf_counter() - started)
+        return response
+
+    def _hedged(self, operation: str, attempt: Callable[[], requests.Response], delay: float,
+                on_hedge: Optional[Callable[[], None]]) -> requests.Response:
+        pool = self._hedge_pool()
+        pending = {pool.submit(self._timed, operation, attempt)}
+        done, pending = wait(pending, timeout=delay)
+        if not done:
+            if on_hedge is not None:
+                on_hedge()
+            pending.add(pool.submit(self._timed, operation, attempt))
+
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    # Close whichever attempts are still running once they answer
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def _close_response(future: Future) -> None:
+    if future.exception() is None:
+        future.result().close()
+
+
+# Process-wide policy, built from the environment on first use
+_policy: Optional[RequestPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_request_policy() -> RequestPolicy:
+    """Return the process-wide request policy."""
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = RequestPolicy.from_env()
+    return _policy
@@ -2,6 +2,76 @@ from typing import Type, Dict, Any, List, Optional
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from .zapper_base import ZapperBase
+from .query_profiles import build_queries, select_query
+from ..metrics import instrument_tool_run, record_cache_lookup
+
+
+# GraphQL document for searchV2; fields tagged @analytics/@full are only
+# requested by those query profiles
+SEARCH_QUERY = '''
+query SearchV2($input: SearchInputV2!) {
+  searchV2(input: $input) {
+    results {
+      __typename
+      # Token fields
+      ... on UnifiedErc20TokenResult {
+        category # @analytics
+        name
+        symbol
+        imageUrl # @full
+        groupedFungibleTokens {
+          address
+          networkV2 {
+            chainId # @analytics
+            name
+          }
+          priceData {
+            price
+            priceChange24h
+          }
+        }
+      }
+      # User fields
+      ... on UserResult {
+        category # @analytics
+        address
+        account {
+          displayName {
+            value
+          }
+          # Balance field removed as it's no longer available
+        }
+      }
+      # App fields
+      ... on AppResult {
+        category # @analytics
+        appId
+        app {
+          displayName
+          url
+          imgUrl # @full
+        }
+      }
+      # NFT fields
+      ... on NftCollectionResult {
+        category # @analytics
+        address
+        network
+        collection {
+          displayName
+          symbol
+          floorPrice {
+            valueUsd
+          }
+        }
+      }
+    }
+  }
+}
+'''
+
+# SEARCH_QUERY rendered for each query profile
+SEARCH_QUERIES = build_queries(SEARCH_QUERY)
 
 
 class SearchToolInput(BaseModel):
@@ -21,10 +91,12 @@ class SearchTool(BaseTool):
         "symbol, or address fragments."
     )
     args_schema: Type[BaseModel] = SearchToolInput
+    # Query profile (see query_profiles.PROFILES); None follows ZAPPER_QUERY_PROFILE
+    query_profile: Optional[str] = None
     
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the SearchTool with cache."""
-        super().__init__()
+        super().__init__(**kwargs)
         self._cache = {}
     
     def _cache_key(self, query: str, entity_types: str, networks: Optional[str], limit: int) -> str:
@@ -32,12 +104,15 @@ class SearchTool(BaseTool):
         networks_key = networks or "all"
         return f"{query.lower()}:{entity_types}:{networks_key}:{limit}"
     
+    @instrument_tool_run
     def _run(self, query: str, entity_types: str = "all", networks: Optional[str] = None, limit: int = 10) -> str:
         """Run the search with caching."""
         # Check cache first
         cache_key = self._cache_key(query, entity_types, networks, limit)
-        if cache_key in self._cache:
-            return f"[CACHED] {self._cache[cache_key]}"
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
         
         try:
             # Prepare entity types list
@@ -66,69 +141,6 @@ class SearchTool(BaseTool):
                     chain_id = ZapperBase.get_chain_id(network)
                     network_ids.append(chain_id)
             
-            # Create GraphQL query for searchV2 using the correct structure
-            query_str = '''
-            query SearchV2($input: SearchInputV2!) {
-              searchV2(input: $input) {
-                results {
-                  __typename
-                  # Token fields
-                  ... on UnifiedErc20TokenResult {
-                    category
-                    name
-                    symbol
-                    imageUrl
-                    groupedFungibleTokens {
-                      address
-                      networkV2 {
-                        chainId
-                        name
-                      }
-                      priceData {
-                        price
-                        priceChange24h
-                      }
-                    }
-                  }
-                  # User fields
-                  ... on UserResult {
-                    category
-                    address
-                    account {
-                      displayName {
-                        value
-                      }
-                      # Balance field removed as it's no longer available
-                    }
-                  }
-                  # App fields
-                  ... on AppResult {
-                    category
-                    appId
-                    app {
-                      displayName
-                      url
-                      imgUrl
-                    }
-                  }
-                  # NFT fields
-                  ... on NftCollectionResult {
-                    category
-                    address
-                    network
-                    collection {
-                      displayName
-                      symbol
-                      floorPrice {
-                        valueUsd
-                      }
-                    }
-                  }
-                }
-              }
-            }
-            '''
-            
             # Prepare input variables for the query
             variables = {
                 "input": {
@@ -143,7 +155,7 @@ class SearchTool(BaseTool):
                 variables["input"]["chainIds"] = network_ids
             
             # Execute GraphQL query
-            result = ZapperBase.execute_graphql_query(query_str, variables)
+            result = ZapperBase.execute_graphql_query(select_query(SEARCH_QUERIES, self.query_profile), variables)
             
             # Format the response
             formatted_result = self._format_search_results(result, query)
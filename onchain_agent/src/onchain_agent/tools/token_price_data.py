@@ -0,0 +1,131 @@
+from typing import Dict, Any, Optional
+from .zapper_base import ZapperBase
+from .query_profiles import build_queries, select_query
+
+
+# GraphQL document for fungibleTokenV2, shared by the tool and the data-only CLI;
+# fields tagged @analytics/@full are only requested by those query profiles
+TOKEN_PRICE_QUERY = '''
+query TokenPriceData($address: Address!, $chainId: Int!, $currency: Currency!, $timeFrame: TimeFrame!) {
+  fungibleTokenV2(address: $address, chainId: $chainId) {
+    # Basic token information
+    address # @analytics
+    symbol
+    name
+    decimals # @analytics
+    imageUrlV2 # @full
+
+    # Market data and pricing information
+    priceData {
+      marketCap
+      price
+      priceChange5m
+      priceChange1h
+      priceChange24h
+      volume24h
+      totalGasTokenLiquidity # @full
+      totalLiquidity
+
+      # Historical price data for charts
+      priceTicks(currency: $currency, timeFrame: $timeFrame) {
+        open # @full
+        median # @full
+        close
+        timestamp # @analytics
+      }
+    }
+  }
+}
+'''
+
+# TOKEN_PRICE_QUERY rendered for each query profile
+TOKEN_PRICE_QUERIES = build_queries(TOKEN_PRICE_QUERY)
+
+
+def map_days_to_timeframe(days: int) -> str:
+    """Maps number of days to the appropriate TimeFrame enum value."""
+    if days <= 1:
+        return "HOUR"
+    elif days <= 7:
+        return "DAY"
+    elif days <= 30:
+        return "WEEK"
+    elif days <= 365:
+        return "MONTH"
+    else:
+        return "YEAR"
+
+
+def fetch_token_price(token_address: str, chain_id: int, days: int = 30, currency: str = "USD",
+                      profile: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch the raw fungibleTokenV2 response with price ticks covering ``days``."""
+    variables = {
+        "address": token_address,
+        "chainId": chain_id,
+        "currency": currency.upper(),
+        "timeFrame": map_days_to_timeframe(days)
+    }
+    return ZapperBase.execute_graphql_query(select_query(TOKEN_PRICE_QUERIES, profile), variables)
+
+
+class TokenPriceFormatter:
+    """Formats fungibleTokenV2 responses (no crewai dependency)."""
+    
+    def _format_price_data(self, data: Dict[str, Any], token_address: str) -> str:
+        """Format token price data into a readable string."""
+        if not data or "data" not in data or "fungibleTokenV2" not in data["data"]:
+            return f"No price data found for token {token_address}."
+        
+        # Extract token information
+        token_data = data["data"]["fungibleTokenV2"]
+        if not token_data:
+            return f"No token information available for {token_address}."
+        
+        # Basic token information
+        symbol = token_data.get("symbol", "Unknown")
+        name = token_data.get("name", "Unknown Token")
+        
+        # Extract chain/network from the response or use address format
+        chain_info = ""
+        if token_address.startswith("0x"):
+            chain_info = "on Ethereum"  # Default if can't determine
+        
+        # Price data
+        price_data = token_data.get("priceData", {})
+        current_price = float(price_data.get("price", 0))
+        price_change_24h = float(price_data.get("priceChange24h", 0))
+        price_change_1h = float(price_data.get("priceChange1h", 0))
+        price_change_5m = float(price_data.get("priceChange5m", 0))
+        market_cap = float(price_data.get("marketCap", 0))
+        volume_24h = float(price_data.get("volume24h", 0))
+        total_liquidity = float(price_data.get("totalLiquidity", 0))
+        
+        # Calculate price trend from price ticks
+        price_ticks = price_data.get("priceTicks", [])
+        price_trend = "No historical data available"
+        
+        if price_ticks and len(price_ticks) >= 2:
+            start_price = float(price_ticks[0].get("close", 0))
+            end_price = float(price_ticks[-1].get("close", 0))
+            
+            if start_price > 0:  # Avoid division by zero
+                percent_change = ((end_price - start_price) / start_price * 100)
+                direction = "increased" if percent_change > 0 else "decreased"
+                price_trend = f"Price {direction} by {abs(percent_change):.2f}% over the analyzed period"
+        
+        # Format the full price summary
+        summary = [
+            f"Token Price Analysis for {name} ({symbol}) {chain_info}:",
+            f"Contract: {token_address}",
+            f"Current Price: ${current_price:.6f}",
+            f"Price Changes:",
+            f"  5min: {price_change_5m:.2f}%",
+            f"  1h: {price_change_1h:.2f}%",
+            f"  24h: {price_change_24h:.2f}%",
+            f"Market Cap: ${market_cap:,.2f}",
+            f"24h Trading Volume: ${volume_24h:,.2f}",
+            f"Total Liquidity: ${total_liquidity:,.2f}",
+            f"Trend: {price_trend}"
+        ]
+        
+        return "\n".join(summary)
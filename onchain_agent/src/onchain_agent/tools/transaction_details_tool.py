@@ -1,10 +1,304 @@
-from typing import Type, Dict, Any, List, Optional
+import contextvars
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Type, Dict, Any, List, Optional, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from .zapper_base import ZapperBase
+from .query_profiles import PROFILES, build_queries, select_query, default_profile
+from ..metrics import instrument_tool_run, record_cache_lookup, tool_context
+from .transaction_store import TransactionStore, get_transaction_store
 from datetime import datetime
 
 
+# GraphQL document for transactionV2, shared by the tool and the prefetcher;
+# fields tagged @analytics/@full are only requested by those query profiles
+TRANSACTION_DETAILS_QUERY = '''
+query TransactionDetails($hash: String!, $chainId: Int!) {
+  transactionV2(hash: $hash, chainId: $chainId) {
+    # Basic transaction information
+    hash # @analytics
+    status
+    blockNumber
+    timestamp
+    nonce
+    gasUsed
+    gasPrice
+    maxFeePerGas # @analytics
+    maxPriorityFeePerGas # @analytics
+    from {
+      address
+    }
+    to {
+      address
+    }
+    
+    # Transaction fee
+    fee {
+      value
+      currency
+    }
+    
+    # Human-readable description
+    processedData {
+      description
+      actionCategory
+    }
+    
+    # Token transfers
+    transfers {
+      from
+      to
+      type
+      token {
+        address # @analytics
+        name
+        symbol
+        decimals # @analytics
+      }
+      value
+      valueUSD
+    }
+  }
+}
+'''
+
+# TRANSACTION_DETAILS_QUERY rendered for each query profile
+TRANSACTION_DETAILS_QUERIES = build_queries(TRANSACTION_DETAILS_QUERY)
+
+# Profile of the responses kept in the durable store and by the prefetcher; it
+# covers both the tool's formatter and analytics over many transactions
+STORED_PROFILE = "analytics"
+
+
+def fetch_transaction_details(transaction_hash: str, chain_id: int, profile: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch the raw transactionV2 response for a single transaction."""
+    variables = {
+        "hash": transaction_hash,
+        "chainId": chain_id
+    }
+    return ZapperBase.execute_graphql_query(select_query(TRANSACTION_DETAILS_QUERIES, profile), variables)
+
+
+def load_transaction_details(transaction_hash: str, chain_id: int, profile: str = STORED_PROFILE) -> Dict[str, Any]:
+    """Return the transactionV2 response, served from the durable store once confirmed.
+
+    Stored responses carry the STORED_PROFILE fields, so only the full profile
+    bypasses the store.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown query profile {profile!r}; expected one of {', '.join(PROFILES)}")
+    if profile == "full":
+        return fetch_transaction_details(transaction_hash, chain_id, profile)
+
+    try:
+        store = get_transaction_store()
+        tx_data = store.get(transaction_hash, chain_id)
+    except (OSError, ValueError):
+        store, tx_data = None, None
+    if tx_data is not None:
+        return {"data": {"transactionV2": tx_data}}
+
+    result = fetch_transaction_details(transaction_hash, chain_id, STORED_PROFILE)
+
+    # Confirmed transactions never change, so persist them for every later run
+    tx_data = ((result or {}).get("data") or {}).get("transactionV2")
+    if store is not None and TransactionStore.is_confirmed(tx_data):
+        try:
+            store.put(transaction_hash, chain_id, tx_data)
+        except OSError:
+            pass
+    return result
+
+
+class TransactionDetailsPrefetcher:
+    """Bounded background worker pool that warms transactionV2 responses.
+
+    The transaction history tool hands every hash of a fetched page to the
+    prefetcher, so the detail lookups the agent makes afterwards resolve from
+    memory (or wait on the in-flight request) instead of starting a new one.
+    """
+
+    # Number of concurrent transactionV2 requests
+    MAX_WORKERS = 4
+    # Maximum number of queued or completed responses kept in memory
+    MAX_ENTRIES = 256
+    # Maximum number of fetches waiting for a worker
+    MAX_QUEUED = 256
+    # Seconds a detail lookup waits on an in-flight prefetch before querying directly
+    WAIT_TIMEOUT = 30.0
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_entries: int = MAX_ENTRIES, max_queued: int = MAX_QUEUED):
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.max_queued = max_queued
+        # Unbounded: entries cancelled by eviction stay in it until a worker skips them,
+        # so the bound applies to _queued, the fetches still waiting for a worker
+        self._queue: "queue.Queue" = queue.Queue()
+        self._queued = 0
+        self._futures: "OrderedDict[Tuple[int, str], Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    @staticmethod
+    def _key(transaction_hash: str, chain_id: int) -> Tuple[int, str]:
+        """Generate a lookup key for a transaction."""
+        return (chain_id, transaction_hash.lower())
+
+    def _ensure_workers(self) -> None:
+        """Start the worker threads on first use."""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"tx-prefetch-{len(self._workers)}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        """Worker loop: fetch queued transactions until the process exits."""
+        while True:
+            transaction_hash, chain_id, future, context = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._queued -= 1
+            # Run in the scheduling caller's context: its run deadline, tracer and event stream
+            context.run(self._fetch, transaction_hash, chain_id, future)
+    
+    @staticmethod
+    def _fetch(transaction_hash: str, chain_id: int, future: Future) -> None:
+        """Fetch one queued transaction into its future."""
+        try:
+            with tool_context("Transaction Details Prefetch"):
+                future.set_result(load_transaction_details(transaction_hash, chain_id))
+        except Exception as e:
+            future.set_exception(e)
+
+    def prefetch(self, transaction_hashes: List[str], chain_id: int) -> int:
+        """Schedule background fetches for the given hashes and return how many were queued.
+
+        Hashes that do not fit in the queue are skipped; their details are
+        fetched when they are looked up.
+        """
+        scheduled = 0
+        with self._lock:
+            self._ensure_workers()
+            for transaction_hash in transaction_hashes:
+                if not transaction_hash:
+                    continue
+                key = self._key(transaction_hash, chain_id)
+                if key in self._futures or self._queued >= self.max_queued:
+                    continue
+
+                future: Future = Future()
+                self._queue.put((transaction_hash, chain_id, future, contextvars.copy_context()))
+                self._futures[key] = future
+                self._queued += 1
+                scheduled += 1
+
+            # Drop the oldest entries once the bound is exceeded
+            while len(self._futures) > self.max_entries:
+                _, stale = self._futures.popitem(last=False)
+                if stale.cancel():
+                    # It never reached a worker, so its queue entry is dead and no longer counts
+                    self._queued -= 1
+
+        return scheduled
+
+    def scheduled(self, transaction_hash: str, chain_id: int) -> bool:
+        """Whether a transaction is queued, in flight or fetched."""
+        with self._lock:
+            return self._key(transaction_hash, chain_id) in self._futures
+    
+    def get(self, transaction_hash: str, chain_id: int, timeout: Optional[float] = WAIT_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """Return a prefetched response, waiting up to ``timeout`` if still in flight.
+        
+        None means a miss (never scheduled, failed, cancelled or not done in
+        time); a fetched response is returned as is, even without
+        transactionV2 data, so the caller does not request it again.
+        """
+        key = self._key(transaction_hash, chain_id)
+        with self._lock:
+            future = self._futures.get(key)
+        if future is None:
+            return None
+        
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Still in flight: keep it for later lookups
+            return None
+        except Exception:
+            # Failed or cancelled: let the caller query directly
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+            return None
+
+
+# Process-wide prefetcher shared by the history and details tools
+_prefetcher = TransactionDetailsPrefetcher()
+
+# Concurrent transactionV2 requests of one bulk load
+BULK_WORKERS = 8
+
+
+def prefetch_transaction_details(transaction_hashes: List[str], chain_id: int) -> int:
+    """Warm transactionV2 data for a page of transaction hashes in the background."""
+    return _prefetcher.prefetch(transaction_hashes, chain_id)
+
+
+def load_transaction_details_bulk(transaction_hashes: List[str], chain_id: int) -> Dict[str, Dict[str, Any]]:
+    """transactionV2 data of many transactions, keyed by lowercase hash.
+    
+    Stored transactions are read from the durable store and responses the
+    prefetcher holds or has in flight are reused; the rest are fetched on a pool of
+    BULK_WORKERS threads (not the prefetcher's bounded queue) and stored once
+    confirmed. Transactions that cannot be fetched are left out.
+    """
+    details: Dict[str, Dict[str, Any]] = {}
+    try:
+        store = get_transaction_store()
+    except (OSError, ValueError):
+        store = None
+    
+    missing, prefetched = [], []
+    for transaction_hash in dict.fromkeys(h.lower() for h in transaction_hashes if h):
+        tx_data = store.get(transaction_hash, chain_id) if store is not None else None
+        if tx_data is not None:
+            details[transaction_hash] = tx_data
+        elif _prefetcher.scheduled(transaction_hash, chain_id):
+            prefetched.append(transaction_hash)
+        else:
+            missing.append(transaction_hash)
+    
+    def fetch(transaction_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            return load_transaction_details(transaction_hash, chain_id)
+        except Exception:
+            return None
+    
+    def add(transaction_hash: str, result: Optional[Dict[str, Any]]) -> None:
+        tx_data = ((result or {}).get("data") or {}).get("transactionV2")
+        if tx_data:
+            details[transaction_hash] = tx_data
+    
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="tx-bulk") as pool:
+        # Each fetch runs in a copy of the caller's context (tool, deadline, tracer, event stream)
+        futures = [pool.submit(contextvars.copy_context().run, fetch, h) for h in missing]
+        # Meanwhile collect what the prefetcher holds or has in flight, fetching only its misses
+        for transaction_hash in prefetched:
+            result = _prefetcher.get(transaction_hash, chain_id)
+            add(transaction_hash, fetch(transaction_hash) if result is None else result)
+        for transaction_hash, future in zip(missing, futures):
+            add(transaction_hash, future.result())
+    return details
+
+
 class TransactionDetailsToolInput(BaseModel):
     """Input schema for Transaction Details Tool."""
     transaction_hash: str = Field(..., description="Transaction hash to fetch details for")
@@ -20,86 +314,37 @@ class TransactionDetailsTool(BaseTool):
         "individual transactions and understand complex DeFi operations."
     )
     args_schema: Type[BaseModel] = TransactionDetailsToolInput
+    # Query profile (see query_profiles.PROFILES); None follows ZAPPER_QUERY_PROFILE
+    query_profile: Optional[str] = None
     
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the TransactionDetailsTool with cache."""
-        super().__init__()
+        super().__init__(**kwargs)
         self._cache = {}
     
     def _cache_key(self, transaction_hash: str, network: str) -> str:
         """Generate a cache key based on input parameters."""
         return f"{transaction_hash.lower()}:{network.lower()}"
     
+    @instrument_tool_run
     def _run(self, transaction_hash: str, network: str = "ethereum") -> str:
         """Run the transaction details retrieval with caching."""
         # Check cache first
         cache_key = self._cache_key(transaction_hash, network)
-        if cache_key in self._cache:
-            return f"[CACHED] {self._cache[cache_key]}"
+        cached = self._cache.get(cache_key)
+        record_cache_lookup(self.name, cached is not None)
+        if cached is not None:
+            return f"[CACHED] {cached}"
         
         try:
             # Convert network name to chain ID
             chain_id = ZapperBase.get_chain_id(network)
             
-            # Create GraphQL query for transactionV2
-            query = '''
-            query TransactionDetails($hash: String!, $chainId: Int!) {
-              transactionV2(hash: $hash, chainId: $chainId) {
-                # Basic transaction information
-                hash
-                status
-                blockNumber
-                timestamp
-                nonce
-                gasUsed
-                gasPrice
-                maxFeePerGas
-                maxPriorityFeePerGas
-                from {
-                  address
-                }
-                to {
-                  address
-                }
-                
-                # Transaction fee
-                fee {
-                  value
-                  currency
-                }
-                
-                # Human-readable description
-                processedData {
-                  description
-                  actionCategory
-                }
-                
-                # Token transfers
-                transfers {
-                  from
-                  to
-                  type
-                  token {
-                    address
-                    name
-                    symbol
-                    decimals
-                  }
-                  value
-                  valueUSD
-                }
-              }
-            }
-            '''
-            
-            # Prepare variables
-            variables = {
-                "hash": transaction_hash,
-                "chainId": chain_id
-            }
-            
-            # Execute GraphQL query
-            result = ZapperBase.execute_graphql_query(query, variables)
+            # Use the prefetched response when the history tool already warmed it
+            profile = self.query_profile or default_profile()
+            result = None if profile == "full" else _prefetcher.get(transaction_hash, chain_id)
+            if result is None:
+                result = load_transaction_details(transaction_hash, chain_id, profile)
             
             # Format the response
             formatted_result = self._format_transaction_details(result, transaction_hash, network)
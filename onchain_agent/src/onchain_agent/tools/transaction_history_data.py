@@ -0,0 +1,256 @@
+from typing import Dict, Any, Iterator, List, Optional
+from .zapper_base import ZapperBase
+from .json_decoding import EdgeStream
+from .query_profiles import build_queries, select_query
+from datetime import datetime
+
+
+# GraphQL document for transactionHistoryV2, shared by the tool and the data-only CLI;
+# fields tagged @analytics/@full are only requested by those query profiles
+TRANSACTION_HISTORY_QUERY = '''
+query TransactionHistoryV2($subjects: [Address!]!, $perspective: TransactionHistoryV2Perspective, $first: Int, $after: String, $filters: TransactionHistoryV2FiltersArgs, $tokenDeltas: Int) {
+  transactionHistoryV2(subjects: $subjects, perspective: $perspective, first: $first, after: $after, filters: $filters) {
+    edges {
+      node {
+        ... on TimelineEventV2 {
+          # Transaction metadata
+          transaction {
+            hash
+            network
+            timestamp
+            blockNumber # @analytics
+            # Sender details with identity
+            fromUser {
+              address
+              displayName {
+                value
+              }
+            }
+            # Recipient details with identity
+            toUser {
+              address
+              displayName {
+                value
+              }
+            }
+          }
+          # Human-readable transaction information
+          interpretation {
+            processedDescription
+          }
+          # Balance changes for the perspective account
+          perspectiveDelta {
+            account { # @analytics
+              address
+            }
+            # Token balance changes
+            tokenDeltasV2(first: $tokenDeltas) {
+              edges {
+                node {
+                  address # @analytics
+                  amount
+                  amountRaw # @full
+                  token {
+                    symbol
+                    imageUrlV2 # @full
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor # @analytics
+    }
+  }
+}
+'''
+
+# TRANSACTION_HISTORY_QUERY rendered for each query profile
+TRANSACTION_HISTORY_QUERIES = build_queries(TRANSACTION_HISTORY_QUERY)
+
+# Token deltas requested per transaction: the formatter shows the first few,
+# balance replay needs all of them
+TOKEN_DELTAS_SHOWN = 3
+ALL_TOKEN_DELTAS = 100
+
+# Transactions requested per page when walking a longer history
+HISTORY_PAGE_SIZE = 100
+
+
+def _history_variables(address: str, chain_id: Optional[int], limit: int, after: Optional[str] = None,
+                       token_deltas: int = TOKEN_DELTAS_SHOWN) -> Dict[str, Any]:
+    """Query variables for one page of an address's transaction history."""
+    variables = {
+        "subjects": [address],
+        "perspective": "SIGNER",  # View from the signer's perspective
+        "first": limit,
+        "tokenDeltas": token_deltas
+    }
+    
+    # Continue from a previous page's endCursor
+    if after:
+        variables["after"] = after
+    
+    # Add filters if a specific network is selected
+    if chain_id:
+        variables["filters"] = {
+            "networks": [chain_id]
+        }
+    return variables
+
+
+def fetch_transaction_history(address: str, chain_id: Optional[int], limit: int,
+                              profile: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch the raw transactionHistoryV2 response for an address."""
+    variables = _history_variables(address, chain_id, limit)
+    return ZapperBase.execute_graphql_query(select_query(TRANSACTION_HISTORY_QUERIES, profile), variables)
+
+
+def stream_transaction_history(address: str, chain_id: Optional[int], limit: int,
+                               profile: Optional[str] = None, after: Optional[str] = None,
+                               token_deltas: int = TOKEN_DELTAS_SHOWN) -> EdgeStream:
+    """Stream the transactionHistoryV2 edges of an address as the response arrives."""
+    variables = _history_variables(address, chain_id, limit, after, token_deltas)
+    return ZapperBase.stream_graphql_edges(
+        select_query(TRANSACTION_HISTORY_QUERIES, profile), variables, "transactionHistoryV2"
+    )
+
+
+def iter_transaction_history(address: str, chain_id: Optional[int], max_transactions: int,
+                             profile: str = "analytics", token_deltas: int = TOKEN_DELTAS_SHOWN) -> Iterator[Dict[str, Any]]:
+    """Stream the edges of an address's most recent transactions, following page cursors.
+    
+    The profile must return pageInfo.endCursor (analytics or full).
+    """
+    after = None
+    remaining = max_transactions
+    while remaining > 0:
+        page = stream_transaction_history(
+            address, chain_id, min(HISTORY_PAGE_SIZE, remaining), profile=profile,
+            after=after, token_deltas=token_deltas
+        )
+        count = 0
+        for edge in page:
+            count += 1
+            yield edge
+        if page.errors and not count:
+            raise RuntimeError(f"GraphQL errors: {page.errors}")
+        remaining -= count
+        after = page.page_info.get("endCursor")
+        if not count or not page.page_info.get("hasNextPage") or not after:
+            return
+
+
+class TransactionHistoryFormatter:
+    """Formats transactionHistoryV2 responses (no crewai dependency)."""
+    
+    def _format_transaction_history(self, data: Dict[str, Any], address: str) -> str:
+        """Format transaction history data into a readable string."""
+        if not data or "data" not in data or "transactionHistoryV2" not in data["data"] or not data["data"]["transactionHistoryV2"]["edges"]:
+            return "No transaction history found."
+        
+        edges = data["data"]["transactionHistoryV2"]["edges"]
+        if not edges:
+            return "No transactions found for this address."
+        
+        # Format the transaction history
+        summary = [f"Transaction History for {address}:\n"]
+        
+        for idx, edge in enumerate(edges, 1):
+            summary.extend(self._format_transaction(idx, edge["node"]))
+        
+        # Add pagination info if available
+        page_info = data["data"]["transactionHistoryV2"].get("pageInfo", {})
+        has_next = page_info.get("hasNextPage", False)
+        if has_next:
+            summary.append("\nMore transactions are available. Increase the limit parameter to see more.")
+        
+        return "\n".join(summary)
+    
+    def _format_transaction_stream(self, edges: EdgeStream, address: str, hashes: Optional[List[str]] = None) -> str:
+        """Format a streamed transactionHistoryV2 page, one edge at a time.
+        
+        Each transaction hash is appended to ``hashes`` when a list is given.
+        """
+        summary = [f"Transaction History for {address}:\n"]
+        
+        for idx, edge in enumerate(edges, 1):
+            node = edge["node"]
+            if hashes is not None and (node.get("transaction") or {}).get("hash"):
+                hashes.append(node["transaction"]["hash"])
+            summary.extend(self._format_transaction(idx, node))
+        
+        if len(summary) == 1:
+            return "No transaction history found."
+        
+        if edges.page_info.get("hasNextPage", False):
+            summary.append("\nMore transactions are available. Increase the limit parameter to see more.")
+        
+        return "\n".join(summary)
+    
+    def _format_transaction(self, idx: int, node: Dict[str, Any]) -> List[str]:
+        """Format one transactionHistoryV2 node into summary lines."""
+        # Extract transaction data
+        tx = node.get("transaction", {})
+        interpretation = node.get("interpretation", {})
+        perspective_delta = node.get("perspectiveDelta", {})
+        
+        tx_hash = tx.get("hash", "Unknown")
+        network_name = tx.get("network", "Unknown")
+        
+        # Convert timestamp to readable format if it's a millisecond timestamp
+        timestamp = tx.get("timestamp")
+        if timestamp:
+            try:
+                # Convert milliseconds to seconds for datetime
+                time_str = datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
+            except:
+                time_str = str(timestamp)
+        else:
+            time_str = "Unknown time"
+        
+        # Get human-readable description
+        description = interpretation.get("processedDescription", "Unknown transaction")
+        
+        # Extract token deltas if available
+        token_deltas = []
+        if perspective_delta and "tokenDeltasV2" in perspective_delta and "edges" in perspective_delta["tokenDeltasV2"]:
+            for delta_edge in perspective_delta["tokenDeltasV2"]["edges"]:
+                delta_node = delta_edge["node"]
+                symbol = delta_node.get("token", {}).get("symbol", "Unknown")
+                amount = delta_node.get("amount", 0)
+                # Use amount instead of amountUSD since the API schema changed
+                sign = "+" if amount > 0 else ""  # Add plus sign for positive values
+                token_deltas.append(f"{sign}{amount} {symbol}")
+        
+        # Get from and to addresses with display names if available
+        from_address = tx.get("fromUser", {}).get("address", "Unknown")
+        from_name = tx.get("fromUser", {}).get("displayName", {}).get("value")
+        from_display = f"{from_name} ({from_address})" if from_name else from_address
+        
+        to_address = tx.get("toUser", {}).get("address", "Unknown")
+        to_name = tx.get("toUser", {}).get("displayName", {}).get("value")
+        to_display = f"{to_name} ({to_address})" if to_name else to_address
+        
+        tx_summary = [
+            f"Transaction {idx}:",
+            f"Hash: {tx_hash}",
+            f"Network: {network_name}",
+            f"Time: {time_str}",
+            f"From: {from_display}",
+            f"To: {to_display}",
+            f"Description: {description}"
+        ]
+        
+        # Add token changes if available
+        if token_deltas:
+            tx_summary.append("Token Changes:")
+            for delta in token_deltas:
+                tx_summary.append(f"  {delta}")
+        
+        tx_summary.append("")  # Add a blank line between transactions
+        return tx_summary
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+class TransactionStore:
+    """Durable, append-only store for confirmed transactionV2 payloads.
+
+    A confirmed transaction never changes, so its details are written once and
+    served from disk forever after. Records are keyed by (chainId, hash) and
+    live in two files:
+
+    * ``transactions.dat`` - a magic header followed by length-prefixed,
+      zlib-compressed JSON records. Records are only ever appended.
+    * ``transactions.idx`` - an open-addressing hash table of fixed-size slots
+      (16-byte key digest, record offset, record length) with linear probing.
+
+    Both files are memory-mapped, so a lookup is one digest, a few slot probes
+    and one slice of the data map: O(1) regardless of how many transactions
+    are stored. Any number of processes can open the store with
+    ``read_only=True`` and share the page cache; writers serialize on a lock
+    file and grow the index by atomically replacing it, which readers detect
+    and remap on their next miss.
+    """
+
+    DATA_FILE = "transactions.dat"
+    INDEX_FILE = "transactions.idx"
+    LOCK_FILE = "transactions.lock"
+
+    DATA_MAGIC = b"OCTXDAT1"
+    INDEX_MAGIC = b"OCTXIDX1"
+
+    # Index header: magic, capacity (slots), count (occupied slots)
+    INDEX_HEADER = struct.Struct("<8sQQ")
+    # Index slot: key digest, record offset (0 = empty), record length
+    INDEX_SLOT = struct.Struct("<16sQI4x")
+    # Data record prefix: payload length
+    RECORD_PREFIX = struct.Struct("<I")
+
+    INITIAL_CAPACITY = 1 << 14
+    MAX_LOAD_FACTOR = 0.5
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = Path(path)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._index_map: Optional[mmap.mmap] = None
+        self._index_stat: Optional[Tuple[int, int]] = None
+        self._data_map: Optional[mmap.mmap] = None
+
+        if not read_only:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self._writer_lock():
+                self._initialize_files()
+        self._open_index()
+
+    @property
+    def _data_path(self) -> Path:
+        return self.path / self.DATA_FILE
+
+    @property
+    def _index_path(self) -> Path:
+        return self.path / self.INDEX_FILE
+
+    @staticmethod
+    def _digest(transaction_hash: str, chain_id: int) -> bytes:
+        """Content address of a transaction: a 128-bit digest of (chainId, hash)."""
+        key = f"{chain_id}:{transaction_hash.lower()}".encode("utf-8")
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    @staticmethod
+    def is_confirmed(tx_data: Optional[Dict[str, Any]]) -> bool:
+        """Whether a transactionV2 payload is final and therefore safe to store forever."""
+        if not tx_data or tx_data.get("blockNumber") is None:
+            return False
+        status = str(tx_data.get("status") or "").upper()
+        return status not in ("", "PENDING", "UNKNOWN")
+
+    # -- file management -------------------------------------------------
+
+    @contextmanager
+    def _writer_lock(self):
+        """Exclusive lock shared by every writer, in this process and others."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path / self.LOCK_FILE, "a+b") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _initialize_files(self) -> None:
+        """Create empty data and index files if the store is new."""
+        if not self._data_path.exists():
+            with open(self._data_path, "wb") as f:
+                f.write(self.DATA_MAGIC)
+        if not self._index_path.exists():
+            self._write_index(self._index_path, self.INITIAL_CAPACITY, [])
+
+    def _write_index(self, path: Path, capacity: int, entries) -> None:
+        """Write a fresh index file containing the given (digest, offset, length) entries."""
+        table = bytearray(capacity * self.INDEX_SLOT.size)
+        for digest, offset, length in entries:
+            slot = self._probe_empty(table, capacity, digest)
+            self.INDEX_SLOT.pack_into(table, slot * self.INDEX_SLOT.size, digest, offset, length)
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, capacity, len(entries)))
+            f.write(table)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _probe_empty(self, table, capacity: int, digest: bytes) -> int:
+        """Find the first empty slot for a digest in a bare slot table."""
+        slot = int.from_bytes(digest[:8], "little") % capacity
+        while True:
+            _, offset, _ = self.INDEX_SLOT.unpack_from(table, slot * self.INDEX_SLOT.size)
+            if offset == 0:
+                return slot
+            slot = (slot + 1) % capacity
+
+    def _open_index(self) -> bool:
+        """(Re)map the index file if it changed on disk. Returns True if remapped."""
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return False
+
+        current = (stat.st_ino, stat.st_size)
+        if current == self._index_stat:
+            return False
+
+        access = mmap.ACCESS_READ if self.read_only else mmap.ACCESS_WRITE
+        mode = "rb" if self.read_only else "r+b"
+        with open(self._index_path, mode) as f:
+            index_map = mmap.mmap(f.fileno(), 0, access=access)
+
+        magic, _, _ = self.INDEX_HEADER.unpack_from(index_map, 0)
+        if magic != self.INDEX_MAGIC:
+            index_map.close()
+            raise ValueError(f"Not a transaction store index: {self._index_path}")
+
+        # The previous map is left to the garbage collector: another thread may still be reading it
+        self._index_map = index_map
+        self._index_stat = current
+        return True
+
+    def _data_view(self, end: int) -> Optional[mmap.mmap]:
+        """Return a data map covering at least ``end`` bytes, remapping after appends."""
+        if self._data_map is None or len(self._data_map) < end:
+            if not self._data_path.exists():
+                return None
+            with open(self._data_path, "rb") as f:
+                data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data_map = data_map
+        return self._data_map if len(self._data_map) >= end else None
+
+    # -- lookups ---------------------------------------------------------
+
+    def _find(self, digest: bytes) -> Tuple[int, int, int]:
+        """Probe the index for a digest. Returns (slot, offset, length); offset 0 means absent."""
+        index_map = self._index_map
+        _, capacity, _ = self.INDEX_HEADER.unpack_from(index_map, 0)
+        base = self.INDEX_HEADER.size
+        slot = int.from_bytes(digest[:8], "little") % capacity
+        while True:
+            slot_digest, offset, length = self.INDEX_SLOT.unpack_from(index_map, base + slot * self.INDEX_SLOT.size)
+            if offset == 0 or slot_digest == digest:
+                return slot, offset, length
+            slot = (slot + 1) % capacity
+
+    def get(self, transaction_hash: str, chain_id: int) -> Optional[Dict[str, Any]]:
+        """Return the stored transactionV2 payload, or None if the transaction is not stored."""
+        if self._index_map is None and not self._open_index():
+            return None
+
+        digest = self._digest(transaction_hash, chain_id)
+        _, offset, length = self._find(digest)
+        if offset == 0 and self._open_index():
+            # A writer grew the index since we mapped it
+            _, offset, length = self._find(digest)
+        if offset == 0:
+            return None
+
+        start = offset + self.RECORD_PREFIX.size
+        data_map = self._data_view(start + length)
+        if data_map is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(data_map[start:start + length]))
+        except (zlib.error, ValueError):
+            # A record lost in a crash reads as a miss, so the transaction is fetched again
+            return None
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        transaction_hash, chain_id = key
+        return self.get(transaction_hash, chain_id) is not None
+
+    def __len__(self) -> int:
+        self._open_index()
+        if self._index_map is None:
+            return 0
+        return self.INDEX_HEADER.unpack_from(self._index_map, 0)[2]
+
+    # -- writes ----------------------------------------------------------
+
+    def put(self, transaction_hash: str, chain_id: int, tx_data: Dict[str, Any]) -> bool:
+        """Store a confirmed transaction. Returns False if it was already stored."""
+        if self.read_only:
+            raise PermissionError("Transaction store was opened read-only")
+
+        digest = self._digest(transaction_hash, chain_id)
+        payload = zlib.compress(json.dumps(tx_data, separators=(",", ":")).encode("utf-8"))
+
+        with self._writer_lock():
+            self._open_index()
+            _, offset, _ = self._find(digest)
+            if offset != 0:
+                return False
+
+            # Append the record; the index only points at fully written data
+            with open(self._data_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(self.RECORD_PREFIX.pack(len(payload)))
+                f.write(payload)
+                # The record must be on disk before an index slot can point at it
+                f.flush()
+                os.fsync(f.fileno())
+
+            _, capacity, count = self.INDEX_HEADER.unpack_from(self._index_map, 0)
+            if count + 1 > capacity * self.MAX_LOAD_FACTOR:
+                self._grow(capacity * 2)
+                _, capacity, count = self.INDEX_HEADER.unpack_from(self._index_map, 0)
+
+            slot, _, _ = self._find(digest)
+            position = self.INDEX_HEADER.size + slot * self.INDEX_SLOT.size
+            # Write digest and length before the offset that marks the slot occupied
+            self.INDEX_SLOT.pack_into(self._index_map, position, digest, 0, len(payload))
+            struct.pack_into("<Q", self._index_map, position + 16, offset)
+            self.INDEX_HEADER.pack_into(self._index_map, 0, self.INDEX_MAGIC, capacity, count + 1)
+        return True
+
+    def _grow(self, capacity: int) -> None:
+        """Rehash every entry into a larger index and atomically swap it in."""
+        _, old_capacity, _ = self.INDEX_HEADER.unpack_from(self._index_map, 0)
+        base = self.INDEX_HEADER.size
+        entries = []
+        for slot in range(old_capacity):
+            digest, offset, length = self.INDEX_SLOT.unpack_from(self._index_map, base + slot * self.INDEX_SLOT.size)
+            if offset != 0:
+                entries.append((digest, offset, length))
+        self._write_index(self._index_path, capacity, entries)
+        self._open_index()
+
+    def close(self) -> None:
+        """Release the memory maps."""
+        for view in (self._index_map, self._data_map):
+            if view is not None:
+                view.close()
+        self._index_map = None
+        self._index_stat = None
+        self._data_map = None
+
+
+_default_store: Optional[TransactionStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_transaction_store() -> TransactionStore:
+    """Return the process-wide store at ONCHAIN_TX_STORE_DIR (default: memory/transactions)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            path = os.getenv("ONCHAIN_TX_STORE_DIR", "memory/transactions")
+            _default_store = TransactionStore(path)
+        return _default_store
@@ -1,7 +1,33 @@
+import itertools
 import os
+import threading
+import time
 import requests
 import json
-from typing import Dict, Any, Optional, Union, List
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple, Union, List
+
+from ..metrics import (
+    ZAPPER_PERSISTED_QUERIES,
+    ZAPPER_REQUEST_BYTES,
+    ZAPPER_REQUESTS,
+    ZAPPER_REQUEST_SECONDS,
+    ZAPPER_RESPONSE_BYTES,
+    ZAPPER_RETRIES,
+    current_tool,
+    operation_name
+)
+from .. import tracing
+from ..cassettes import active_cassette
+from .json_decoding import CHUNK_SIZE, EdgeStream, loads
+from .persisted_queries import (
+    NOT_FOUND_CODES,
+    NOT_SUPPORTED_CODES,
+    get_query_registry,
+    persisted_queries_enabled,
+    persisted_query_extension
+)
+from .request_policy import RequestRejected, get_request_policy
 
 class ZapperBase:
     """Base class for Zapper API tools with common functionality."""
@@ -23,6 +49,15 @@ class ZapperBase:
         "gnosis": 100
     }
     
+    # Zapper network enum names (e.g. BINANCE_SMART_CHAIN_MAINNET) that differ from NETWORK_IDS keys
+    NETWORK_ENUM_ALIASES = {
+        "binance_smart_chain": "bsc",
+        "avalanche_c": "avalanche"
+    }
+    
+    # Per-thread HTTP sessions, so repeated queries reuse keep-alive connections
+    _local = threading.local()
+    
     @staticmethod
     def get_api_key() -> str:
         """Get the Zapper API key from environment variables."""
@@ -31,6 +66,19 @@ class ZapperBase:
             raise ValueError("ZAPPER_API_KEY environment variable not set")
         return api_key
     
+    @staticmethod
+    def get_api_url() -> str:
+        """Get the GraphQL endpoint, overridable with ZAPPER_API_URL (e.g. a local stand-in server)."""
+        return os.getenv("ZAPPER_API_URL") or ZapperBase.GRAPHQL_API_URL
+    
+    @staticmethod
+    def get_session() -> requests.Session:
+        """Get this thread's HTTP session (requests.Session is not thread-safe)."""
+        session = getattr(ZapperBase._local, "session", None)
+        if session is None:
+            session = ZapperBase._local.session = requests.Session()
+        return session
+    
     @staticmethod
     def get_chain_id(network: str) -> int:
         """Convert network name to chain ID."""
@@ -40,35 +88,250 @@ class ZapperBase:
         raise ValueError(f"Unknown network: {network}. Supported networks: {', '.join(ZapperBase.NETWORK_IDS.keys())}")
     
     @staticmethod
-    def execute_graphql_query(query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute a GraphQL query against the Zapper API."""
-        api_key = ZapperBase.get_api_key()
-        
-        headers = {
-            "x-zapper-api-key": api_key,
+    def get_chain_id_for_network(network_enum: str) -> Optional[int]:
+        """Chain ID of a Zapper network enum value (e.g. ETHEREUM_MAINNET), or None if unknown."""
+        name = (network_enum or "").lower()
+        if name.endswith("_mainnet"):
+            name = name[:-len("_mainnet")]
+        return ZapperBase.NETWORK_IDS.get(ZapperBase.NETWORK_ENUM_ALIASES.get(name, name))
+    
+    @staticmethod
+    def _headers() -> Dict[str, str]:
+        """Request headers for the GraphQL endpoint."""
+        return {
+            "x-zapper-api-key": ZapperBase.get_api_key(),
             "accept": "application/json",
             "content-type": "application/json"
         }
+    
+    @staticmethod
+    def _persisted_query_miss(status_code: int, body: Any) -> Optional[str]:
+        """Classify the answer to a hash-only request: None if it was served,
+        "not_found" if the server wants the full text once, "unsupported" otherwise."""
+        if status_code >= 500 or status_code == 429:
+            return None
+        if not isinstance(body, dict):
+            return None if status_code < 400 else "unsupported"
+        if body.get("data") or not body.get("errors"):
+            return None
+        errors = json.dumps(body["errors"])
+        if any(code in errors for code in NOT_FOUND_CODES):
+            return "not_found"
+        if any(code in errors for code in NOT_SUPPORTED_CODES) or status_code >= 400 or "persisted" in errors.lower():
+            return "unsupported"
+        return None
+    
+    @staticmethod
+    def _decode(body: bytes) -> Any:
+        """Decode a JSON body, or None if it is not JSON."""
+        try:
+            return loads(body)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _request_error(error: requests.exceptions.RequestException, body: Any = None) -> RuntimeError:
+        """Describe a failed request, with the server's error details when it sent any."""
+        error_msg = f"API request failed: {str(error)}"
+        response = getattr(error, "response", None)
+        if response is not None:
+            if body is None:
+                body = ZapperBase._decode(response.content)
+            if body is not None:
+                error_msg += f". Details: {json.dumps(body)}"
+            else:
+                error_msg += f". Status code: {response.status_code}"
+        return RuntimeError(error_msg)
+    
+    @staticmethod
+    @contextmanager
+    def _send(query: str, variables: Optional[Dict[str, Any]], stream: bool = False):
+        """POST a query, by persisted hash when the endpoint supports it.
         
-        payload = {
-            "query": query,
-            "variables": variables or {}
-        }
+        Yields the response, an iterator over its (remaining) body chunks and,
+        when the whole body arrived in the first chunk, that body. A hash the
+        server has not seen is resent once with the full text. Each POST goes
+        through the request policy: it times out within the run's budget,
+        fails fast while the endpoint's circuit is open and, unless streamed,
+        may be hedged.
         
+        While a cassette is active the exchange is recorded to it, or served
+        from it without touching the network.
+        """
+        url = ZapperBase.get_api_url()
+        registry = get_query_registry()
+        operation = operation_name(query)
+        cassette = active_cassette()
+        if cassette is not None:
+            recorded_request = {"query": registry.hash_for(query), "variables": variables or {}}
+            if cassette.replaying:
+                response = ZapperBase._recorded_response(url, cassette.play("zapper", operation, recorded_request))
+                chunks = response.iter_content(CHUNK_SIZE) if stream else iter((response.content,))
+                yield response, chunks, response.content
+                return
+            # Recordings hold whole bodies, so the response is not streamed
+            stream = False
+            recorded_started = time.perf_counter()
+        headers = ZapperBase._headers()
+        persisted = persisted_queries_enabled() and registry.supports(url)
+        if persisted:
+            payload = {"variables": variables or {}, "extensions": persisted_query_extension(registry.hash_for(query))}
+        else:
+            payload = {"query": query, "variables": variables or {}}
+        tool = current_tool()
+        policy = get_request_policy()
+        
+        def post(body: Dict[str, Any]) -> Tuple[requests.Response, Iterator[bytes], Optional[bytes]]:
+            data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            ZAPPER_REQUEST_BYTES.observe(len(data), tool, operation)
+            timeout = policy.request_timeout()
+            response = policy.send(
+                url, operation,
+                lambda: ZapperBase.get_session().post(url, headers=headers, data=data, stream=stream, timeout=timeout),
+                hedge=not stream,
+                on_hedge=lambda: ZAPPER_RETRIES.inc(tool, operation, "hedge")
+            )
+            if not stream:
+                return response, iter((response.content,)), response.content
+            # Peek: a body that fits in one chunk (e.g. a persisted query miss) is returned whole
+            chunks = response.iter_content(CHUNK_SIZE)
+            head = next(chunks, b"")
+            second = next(chunks, None)
+            if second is None:
+                return response, iter((head,)), head
+            return response, itertools.chain((head, second), chunks), None
+        
+        response, chunks, whole = post(payload)
+        if persisted:
+            miss = ZapperBase._persisted_query_miss(
+                response.status_code, ZapperBase._decode(whole) if whole is not None else None
+            )
+            if miss is None:
+                ZAPPER_PERSISTED_QUERIES.inc(tool, operation, "hit")
+            else:
+                ZAPPER_PERSISTED_QUERIES.inc(tool, operation, "registered" if miss == "not_found" else miss)
+                ZAPPER_RETRIES.inc(tool, operation, "persisted_query")
+                if miss == "unsupported":
+                    registry.mark_unsupported(url)
+                    payload = {"query": query, "variables": variables or {}}
+                else:
+                    # Sending text and hash together registers the hash on the server
+                    payload = dict(payload, query=query)
+                response.close()
+                response, chunks, whole = post(payload)
+        if cassette is not None:
+            cassette.record("zapper", operation, recorded_request, {
+                "status": response.status_code,
+                "reason": response.reason,
+                "body": whole.decode("utf-8", "replace")
+            }, time.perf_counter() - recorded_started)
         try:
-            response = requests.post(ZapperBase.GRAPHQL_API_URL, headers=headers, json=payload)
-            response.raise_for_status()
-            return response.json()
+            yield response, chunks, whole
+        finally:
+            response.close()
+    
+    @staticmethod
+    def _recorded_response(url: str, recorded: Dict[str, Any]) -> requests.Response:
+        """A response rebuilt from a cassette recording."""
+        response = requests.Response()
+        response.url = url
+        response.status_code = recorded["status"]
+        response.reason = recorded.get("reason")
+        response._content = recorded["body"].encode("utf-8")
+        response._content_consumed = True
+        return response
+    
+    @staticmethod
+    def execute_graphql_query(query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Execute a GraphQL query against the Zapper API.
+        
+        Sends only the query's persisted hash when the endpoint supports it,
+        resending the full text once if the server has not seen the hash.
+        """
+        # Metric labels: calling tool and GraphQL operation
+        operation = operation_name(query)
+        tool = current_tool()
+        status = "error"
+        started = time.perf_counter()
+        
+        with tracing.span(f"zapper:{operation}", "http", tool=tool) as http_span:
+            try:
+                with ZapperBase._send(query, variables) as (response, _, body):
+                    ZAPPER_RESPONSE_BYTES.observe(len(body), tool, operation)
+                    status = "ok" if response.ok else f"http_{response.status_code}"
+                    result = ZapperBase._decode(body)
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.HTTPError as e:
+                        raise ZapperBase._request_error(e, result)
+                    if result is None:
+                        status = "invalid_json"
+                        raise RuntimeError(f"API returned a non-JSON response ({len(body)} bytes)")
+                    if isinstance(result, dict) and result.get("errors"):
+                        status = "graphql_error"
+                    return result
             
-        except requests.exceptions.RequestException as e:
-            error_msg = f"API request failed: {str(e)}"
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    error_details = e.response.json()
-                    error_msg += f". Details: {json.dumps(error_details)}"
-                except:
-                    error_msg += f". Status code: {e.response.status_code}"
-            raise RuntimeError(error_msg)
+            except RequestRejected as e:
+                status = e.status
+                raise
+            
+            except requests.exceptions.RequestException as e:
+                if isinstance(e, requests.exceptions.Timeout):
+                    status = "timeout"
+                raise ZapperBase._request_error(e)
+            
+            finally:
+                ZAPPER_REQUEST_SECONDS.observe(time.perf_counter() - started, tool, operation)
+                ZAPPER_REQUESTS.inc(tool, operation, status)
+                if http_span is not None:
+                    http_span.args["status"] = status
+    
+    @staticmethod
+    def stream_graphql_edges(query: str, variables: Dict[str, Any], connection: str) -> EdgeStream:
+        """Run a query and decode the edges of ``connection`` as the response arrives.
+        
+        The request is made when the returned stream is first iterated; its
+        ``page_info`` and ``errors`` are set once iteration finishes. Meant for
+        large pages whose edges are consumed one at a time.
+        """
+        return EdgeStream(ZapperBase._stream_body(query, variables), connection)
+    
+    @staticmethod
+    def _stream_body(query: str, variables: Optional[Dict[str, Any]]) -> Iterator[bytes]:
+        """Body chunks of a query's response, with the same metrics and errors as execute_graphql_query."""
+        operation = operation_name(query)
+        tool = current_tool()
+        status = "error"
+        started = time.perf_counter()
+        size = 0
+        
+        with tracing.span(f"zapper:{operation}", "http", tool=tool, streamed=True) as http_span:
+            try:
+                with ZapperBase._send(query, variables, stream=True) as (response, chunks, body):
+                    status = "ok" if response.ok else f"http_{response.status_code}"
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.HTTPError as e:
+                        raise ZapperBase._request_error(e, ZapperBase._decode(body or b"".join(chunks)))
+                    for chunk in chunks:
+                        size += len(chunk)
+                        yield chunk
+            
+            except RequestRejected as e:
+                status = e.status
+                raise
+            
+            except requests.exceptions.RequestException as e:
+                if isinstance(e, requests.exceptions.Timeout):
+                    status = "timeout"
+                raise ZapperBase._request_error(e)
+            
+            finally:
+                ZAPPER_RESPONSE_BYTES.observe(size, tool, operation)
+                ZAPPER_REQUEST_SECONDS.observe(time.perf_counter() - started, tool, operation)
+                ZAPPER_REQUESTS.inc(tool, operation, status)
+                if http_span is not None:
+                    http_span.args["status"] = status
     
     @staticmethod
     def make_request(url: str, method: str = "POST", params: Optional[Dict[str, Any]] = None, 
@@ -89,11 +352,12 @@ class ZapperBase:
         }
         
         try:
+            timeout = get_request_policy().request_timeout()
             if method.upper() == "GET":
-                response = requests.get(url, headers=headers, params=params)
+                response = requests.get(url, headers=headers, params=params, timeout=timeout)
             elif method.upper() == "POST":
                 headers["content-type"] = "application/json"
-                response = requests.post(url, headers=headers, json=data)
+                response = requests.post(url, headers=headers, json=data, timeout=timeout)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
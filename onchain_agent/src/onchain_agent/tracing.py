@@ -0,0 +1,178 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+class Span:
+    """A timed operation with a parent link, recorded by a Tracer."""
+
+    __slots__ = ("span_id", "parent_id", "name", "category", "start_ns", "end_ns", "thread_id", "args")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, category: str,
+                 thread_id: int, args: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.thread_id = thread_id
+        self.args = args
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+
+class Tracer:
+    """Collects the spans of one crew run and exports them as a Chrome trace.
+
+    Spans opened on a thread nest under the innermost span still open on that
+    thread. The tracer is found through a context variable, so a worker
+    thread only records spans when it runs in a copy of the run's context
+    (the prefetch, bulk detail and price workers do); its spans then nest
+    under the run's root span. The export is the Chrome Trace
+    Event format, which chrome://tracing and https://ui.perfetto.dev load
+    directly.
+    """
+
+    def __init__(self, name: str = "crew_run"):
+        self.name = name
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_names: Dict[int, str] = {}
+        self.root = self.begin(name, category="run")
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str, category: str = "function", **args) -> Span:
+        """Open a span as a child of the innermost open span on this thread."""
+        stack = self._stack()
+        parent = stack[-1] if stack else getattr(self, "root", None)
+        thread = threading.current_thread()
+        span = Span(next(self._ids), parent.span_id if parent else None, name, category, thread.ident, args)
+        with self._lock:
+            self.spans.append(span)
+            self._thread_names.setdefault(thread.ident, thread.name)
+        stack.append(span)
+        return span
+
+    def end(self, span: Optional[Span], **args) -> None:
+        """Close a span (and any spans left open inside it on this thread)."""
+        if span is None or span.end_ns is not None:
+            return
+        span.end_ns = time.perf_counter_ns()
+        span.args.update(args)
+        stack = self._stack()
+        if span in stack:
+            while stack:
+                inner = stack.pop()
+                if inner is span:
+                    break
+                if inner.end_ns is None:
+                    inner.end_ns = span.end_ns
+
+    @contextmanager
+    def span(self, name: str, category: str = "function", **args):
+        """Context manager form of begin()/end(); records exceptions on the span."""
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.end(span)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Return the spans in Chrome Trace Event format (complete "X" events, times in µs)."""
+        origin = self.root.start_ns
+        now = time.perf_counter_ns()
+        pid = os.getpid()
+        events = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": self.name}}
+        ]
+        for tid, thread_name in self._thread_names.items():
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            end_ns = span.end_ns if span.end_ns is not None else now
+            args = {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                    for key, value in span.args.items()}
+            args["span_id"] = span.span_id
+            args["parent_id"] = span.parent_id
+            events.append({
+                "ph": "X",
+                "name": span.name,
+                "cat": span.category,
+                "pid": pid,
+                "tid": span.thread_id,
+                "ts": (span.start_ns - origin) / 1000,
+                "dur": (end_ns - span.start_ns) / 1000,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> str:
+        """Write the Chrome trace JSON to ``path`` and return it."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+# Tracer of the run executing in the current context (None when tracing is off)
+_active_tracer: contextvars.ContextVar = contextvars.ContextVar("active_tracer", default=None)
+
+
+def get_active_tracer() -> Optional[Tracer]:
+    """Tracer of the current run, if tracing is enabled."""
+    return _active_tracer.get()
+
+
+@contextmanager
+def span(name: str, category: str = "function", **args):
+    """Record a span on the active tracer; a no-op when tracing is off."""
+    tracer = _active_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **args) as active_span:
+        yield active_span
+
+
+@contextmanager
+def trace_run(name: str = "crew_run", output_dir: Optional[str] = None):
+    """Trace everything inside the block and export it to ``output_dir``.
+
+    When ``output_dir`` is None tracing stays off and the block runs untouched.
+    The exported file is ``<output_dir>/trace-<name>-<timestamp>.json``.
+    """
+    if not output_dir:
+        yield None
+        return
+
+    tracer = Tracer(name)
+    token = _active_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _active_tracer.reset(token)
+        tracer.end(tracer.root)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = tracer.export(os.path.join(output_dir, f"trace-{name}-{stamp}.json"))
+        print(f"Trace written to {path}")
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""Local stand-in for the Zapper GraphQL API.
+
+Answers the operations the tools use (portfolioV2, transactionHistoryV2,
+fungibleTokenV2, transactionV2, transactionsForAppV2 and searchV2) with
+synthetic payloads from ``onchain_agent.synthetic``, with optional injected
+latency, server errors and 429 rate limiting. Automatic persisted queries are
+supported unless started with --no-persisted-queries. Point the tools at it with:
+
+    zapper_stub --port 8765 --latency-ms 150 --rate-limit-rate 0.05
+    export ZAPPER_API_URL=http://127.0.0.1:8765/graphql
+    export ZAPPER_API_KEY=local  # any value; the stand-in does not check it
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+from onchain_agent import synthetic
+from onchain_agent.tools.persisted_queries import query_hash
+
+# Root fields the stand-in knows how to answer
+OPERATION_PATTERN = re.compile(
+    r"\b(portfolioV2|transactionHistoryV2|fungibleTokenV2|transactionV2|transactionsForAppV2|searchV2)\s*\("
+)
+
+
+class StubConfig:
+    """Payload sizes and fault injection settings for the stand-in server."""
+
+    def __init__(self, tokens: int = 10, apps: int = 10, positions: int = 10,
+                 transactions: Optional[int] = None, deltas: int = 3, ticks: int = 30,
+                 transfers: int = 3, search_results: Optional[int] = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0,
+                 persisted_queries: bool = True):
+        self.tokens = tokens
+        self.apps = apps
+        self.positions = positions
+        # None means "honor the query's first/maxResultsPerCategory argument"
+        self.transactions = transactions
+        self.deltas = deltas
+        self.ticks = ticks
+        self.transfers = transfers
+        self.search_results = search_results
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        # Answer automatic persisted queries (hash-only requests)
+        self.persisted_queries = persisted_queries
+
+
+def build_response(query: str, variables: Dict[str, Any], config: StubConfig) -> Dict[str, Any]:
+    """Build a synthetic GraphQL response for the root field of a query."""
+    match = OPERATION_PATTERN.search(query or "")
+    if not match:
+        return {"errors": [{"message": "Unsupported operation for the local Zapper stand-in"}]}
+
+    operation = match.group(1)
+    seed = config.seed
+
+    if operation == "portfolioV2":
+        return synthetic.portfolio_response(config.tokens, config.apps, config.positions, seed=seed)
+    if operation == "transactionHistoryV2":
+        count = config.transactions if config.transactions is not None else int(variables.get("first") or 10)
+        # Advance the seed per cursor so paging returns new transactions
+        page_seed = seed + zlib.crc32((variables.get("after") or "").encode("utf-8"))
+        return synthetic.transaction_history_response(count, config.deltas, has_next_page=True, seed=page_seed)
+    if operation == "fungibleTokenV2":
+        return synthetic.token_price_response(variables.get("address"), config.ticks, seed=seed)
+    if operation == "transactionV2":
+        # Seed from the hash so the same transaction always has the same details
+        tx_hash = variables.get("hash")
+        return synthetic.transaction_details_response(tx_hash, config.transfers, seed=zlib.crc32((tx_hash or "").encode("utf-8")))
+    if operation == "transactionsForAppV2":
+        count = config.transactions if config.transactions is not None else int(variables.get("first") or 10)
+        # Advance the seed per cursor so paging returns new transactions
+        page_seed = seed + zlib.crc32((variables.get("after") or "").encode("utf-8"))
+        return synthetic.app_transactions_response(count, seed=page_seed)
+    if operation == "searchV2":
+        search_input = variables.get("input") or {}
+        count = config.search_results if config.search_results is not None else int(search_input.get("maxResultsPerCategory") or 10)
+        return synthetic.search_response(count, seed=seed)
+
+    return {"errors": [{"message": f"Unsupported operation: {operation}"}]}
+
+
+class ZapperStubHandler(BaseHTTPRequestHandler):
+    """HTTP handler for POST /graphql requests."""
+
+    server_version = "ZapperStub/1.0"
+    config: StubConfig = StubConfig()
+    # Error, rate limit and latency jitter rolls; seeded from the config per server
+    _rng = random.Random(0)
+    _rng_lock = threading.Lock()
+    # Query documents registered by hash (shared by every handler of a server)
+    _persisted: Dict[str, str] = {}
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet; errors are still visible to the client
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _roll(self) -> Tuple[float, float]:
+        with self._rng_lock:
+            return self._rng.random(), self._rng.uniform(-1, 1)
+
+    def _resolve_query(self, request: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return the request's query document, or the error body for a persisted query miss."""
+        query = request.get("query")
+        persisted = (request.get("extensions") or {}).get("persistedQuery")
+        if not persisted:
+            return query or "", None
+        if not self.config.persisted_queries:
+            if query:
+                return query, None
+            return None, {"errors": [{"message": "PersistedQueryNotSupported",
+                                      "extensions": {"code": "PERSISTED_QUERY_NOT_SUPPORTED"}}]}
+
+        sha256_hash = persisted.get("sha256Hash") or ""
+        if query:
+            if query_hash(query) != sha256_hash:
+                return None, {"errors": [{"message": "provided sha does not match query"}]}
+            self._persisted[sha256_hash] = query
+            return query, None
+        if sha256_hash in self._persisted:
+            return self._persisted[sha256_hash], None
+        return None, {"errors": [{"message": "PersistedQueryNotFound",
+                                  "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]}
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"errors": [{"message": "Invalid JSON body"}]})
+            return
+
+        config = self.config
+        fault, jitter = self._roll()
+
+        # Injected latency
+        delay_ms = config.latency_ms + jitter * config.jitter_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        # Injected faults
+        if fault < config.rate_limit_rate:
+            self._send_json(429, {"errors": [{"message": "Too many requests"}]}, {"retry-after": "1"})
+            return
+        if fault < config.rate_limit_rate + config.error_rate:
+            self._send_json(500, {"errors": [{"message": "Injected upstream error"}]})
+            return
+
+        query, error = self._resolve_query(request)
+        if error is not None:
+            self._send_json(200 if config.persisted_queries else 400, error)
+            return
+
+        response = build_response(query, request.get("variables") or {}, config)
+        self._send_json(200, response)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, config: Optional[StubConfig] = None) -> ThreadingHTTPServer:
+    """Create (but do not start) a stand-in server bound to host:port."""
+    config = config or StubConfig()
+    handler = type("ConfiguredZapperStubHandler", (ZapperStubHandler,), {
+        "config": config,
+        "_rng": random.Random(config.seed),
+        "_rng_lock": threading.Lock(),
+        "_persisted": {}
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """Run the stand-in server from the command line."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Zapper GraphQL API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=10, help="Tokens per portfolio")
+    parser.add_argument("--apps", type=int, default=10, help="Apps per portfolio")
+    parser.add_argument("--positions", type=int, default=10, help="Positions per app")
+    parser.add_argument("--transactions", type=int, default=None, help="Transactions per page (default: the query's first)")
+    parser.add_argument("--deltas", type=int, default=3, help="Token deltas per history event")
+    parser.add_argument("--ticks", type=int, default=30, help="Price ticks per token")
+    parser.add_argument("--transfers", type=int, default=3, help="Transfers per transaction")
+    parser.add_argument("--search-results", type=int, default=None, help="Results per search category")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-persisted-queries", action="store_true",
+                        help="Reject hash-only requests, like a server without persisted query support")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        tokens=args.tokens, apps=args.apps, positions=args.positions,
+        transactions=args.transactions, deltas=args.deltas, ticks=args.ticks,
+        transfers=args.transfers, search_results=args.search_results,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+        persisted_queries=not args.no_persisted_queries
+    )
+    server = create_server(args.host, args.port, config)
+    print(f"Zapper stand-in listening on http://{args.host}:{args.port}/graphql")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import time
+
+from onchain_agent.tools.app_event_sinks import get_event_sink
+
+
+def _event(number):
+    return {"hash": f"0x{number}", "timestamp": number, "observed_at": time.time(), "node": {"n": number}}
+
+
+def test_sink_is_shared_per_path_and_reuses_its_connection(tmp_path):
+    sink = get_event_sink(str(tmp_path / "events.db"))
+    assert get_event_sink(str(tmp_path / "events.db")) is sink
+    connection = sink._connect()
+
+    sink.write("uniswap", 1, [_event(1), _event(2)])
+    sink.write("uniswap", 1, [_event(2), _event(3)])
+    sink.record_poll("uniswap", 1, time.time())
+
+    assert [node["n"] for node in sink.recent_events("uniswap", 1, 10)] == [3, 2, 1]
+    assert sink.recent_events("uniswap", 1, 10, max_age=-1) is None
+    assert sink.recent_events("aave", 1, 10) is None
+    assert sink._connect() is connection
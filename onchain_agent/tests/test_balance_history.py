@@ -0,0 +1,54 @@
+import numpy as np
+
+from onchain_agent.tools.balance_history import TokenDeltas
+
+
+def _node(timestamp, *deltas):
+    """A transactionHistoryV2 node with (address, symbol, amount) deltas."""
+    return {
+        "transaction": {"timestamp": timestamp, "network": "ETHEREUM_MAINNET"},
+        "perspectiveDelta": {"tokenDeltasV2": {"edges": [
+            {"node": {"address": address, "amount": amount, "token": {"symbol": symbol}}}
+            for address, symbol, amount in deltas
+        ]}}
+    }
+
+
+def _replay(*nodes):
+    deltas = TokenDeltas()
+    deltas.add_edges({"node": node} for node in nodes)
+    return deltas.replay()
+
+
+def test_mixed_magnitude_tokens_keep_precision():
+    history = _replay(
+        _node(1000, ("0xmeme", "MEME", 1e18)),
+        _node(2000, ("0xeth", "ETH", 0.001)),
+        _node(3000, ("0xeth", "ETH", 0.002)),
+        _node(4000, ("0xmeme", "MEME", -5e17))
+    )
+    eth = history.tokens.index(("ETHEREUM_MAINNET", "0xeth"))
+    meme = history.tokens.index(("ETHEREUM_MAINNET", "0xmeme"))
+
+    _, eth_balances = history.curve(eth)
+    assert eth_balances.tolist() == [0.001, 0.003]
+    _, meme_balances = history.curve(meme)
+    assert meme_balances.tolist() == [1e18, 5e17]
+
+    summary = {row["symbol"]: row for row in history.token_summary()}
+    assert summary["ETH"]["balance"] == 0.003
+    assert summary["ETH"]["lowest"] == 0.001
+    assert summary["ETH"]["highest"] == 0.003
+
+
+def test_balances_at_before_and_between_changes():
+    history = _replay(
+        _node(1000, ("0xa", "A", 5.0)),
+        _node(2000, ("0xb", "B", 2.0)),
+        _node(3000, ("0xa", "A", -1.5))
+    )
+    a = history.tokens.index(("ETHEREUM_MAINNET", "0xa"))
+    b = history.tokens.index(("ETHEREUM_MAINNET", "0xb"))
+    balances = history.balances_at([500, 1000, 2500, 3000, 9000])
+    np.testing.assert_array_equal(balances[a], [0.0, 5.0, 5.0, 3.5, 3.5])
+    np.testing.assert_array_equal(balances[b], [0.0, 0.0, 2.0, 2.0, 2.0])
@@ -0,0 +1,33 @@
+import pytest
+
+from onchain_agent.cassettes import Cassette, CassetteMiss
+
+
+def _recorded(tmp_path, match):
+    recording = Cassette(str(tmp_path / "run.json"), "record")
+    recording.record("zapper", "TransactionDetails", {"variables": {"hash": "0xa"}}, {"body": "a"}, 0.1)
+    recording.record("zapper", "TransactionDetails", {"variables": {"hash": "0xb"}}, {"body": "b"}, 0.1)
+    return Cassette.load(recording.save(), latency="none", match=match)
+
+
+def test_exact_matches_replay_in_any_order_and_repeat(tmp_path):
+    cassette = _recorded(tmp_path, "strict")
+    assert cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xb"}}) == {"body": "b"}
+    assert cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xa"}}) == {"body": "a"}
+    assert cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xa"}}) == {"body": "a"}
+    assert (cassette.hits, cassette.fallbacks) == (3, 0)
+
+
+def test_strict_replay_refuses_another_request_recording(tmp_path):
+    cassette = _recorded(tmp_path, "strict")
+    with pytest.raises(CassetteMiss):
+        cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xc"}})
+
+
+def test_lenient_replay_falls_back_to_recorded_order(tmp_path):
+    cassette = _recorded(tmp_path, "lenient")
+    assert cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xc"}}) == {"body": "a"}
+    assert cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xb"}}) == {"body": "b"}
+    assert cassette.fallbacks == 1
+    with pytest.raises(CassetteMiss):
+        cassette.play("zapper", "TransactionDetails", {"variables": {"hash": "0xd"}})
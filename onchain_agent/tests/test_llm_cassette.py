@@ -0,0 +1,51 @@
+import crewai
+import pytest
+
+from onchain_agent import cassettes
+from onchain_agent.cassettes import use_cassette
+from onchain_agent.llm_routing import RoutedLLM
+
+MESSAGES = [{"role": "user", "content": "Summarize the wallet"}]
+
+
+def _fake_call(answer):
+    """Stand-in for LLM.call that answers with text, or by calling the first offered function."""
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        if available_functions:
+            name, function = next(iter(available_functions.items()))
+            return function(**answer)
+        return answer
+    return call
+
+
+def test_text_and_function_answers_replay(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm.json")
+    llm = RoutedLLM("fast", model="openrouter/test-model")
+    executed = []
+
+    def summary(**fields):
+        executed.append(fields)
+        return {"summary": fields}
+
+    with use_cassette(path, "record"):
+        monkeypatch.setattr(crewai.LLM, "call", _fake_call("plain answer"))
+        assert llm.call(MESSAGES) == "plain answer"
+        monkeypatch.setattr(crewai.LLM, "call", _fake_call({"risk": "low"}))
+        assert llm.call(MESSAGES + [{"role": "user", "content": "as JSON"}],
+                        available_functions={"Summary": summary}) == {"summary": {"risk": "low"}}
+
+    monkeypatch.setattr(crewai.LLM, "call", lambda *args, **kwargs: pytest.fail("replay reached the model"))
+    with use_cassette(path, "replay", latency="none"):
+        assert llm.call(MESSAGES) == "plain answer"
+        assert llm.call(MESSAGES + [{"role": "user", "content": "as JSON"}],
+                        available_functions={"Summary": summary}) == {"summary": {"risk": "low"}}
+    assert executed == [{"risk": "low"}, {"risk": "low"}]
+    assert cassettes.active_cassette() is None
+
+
+def test_unrecordable_answers_fail_the_recording(tmp_path, monkeypatch):
+    llm = RoutedLLM("fast", model="openrouter/test-model")
+    monkeypatch.setattr(crewai.LLM, "call", _fake_call(["tool", "calls"]))
+    with use_cassette(str(tmp_path / "llm.json"), "record"):
+        with pytest.raises(TypeError):
+            llm.call(MESSAGES)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from onchain_agent.tools.pnl import position_pnl
+
+# Sell 2 held from before the history, buy 10 @ 1 and 10 @ 3, sell 15 @ 4,
+# buy 5 @ 4, sell 8 @ 6, sell 1 @ 7, buy 4 @ 5; the token now trades at 10
+AMOUNTS = np.array([-2.0, 10.0, 10.0, -15.0, 5.0, -8.0, -1.0, 4.0])
+PRICES = np.array([5.0, 1.0, 3.0, 4.0, 4.0, 6.0, 7.0, 5.0])
+CURRENT_PRICE = 10.0
+
+# Worked by hand, lot by lot
+EXPECTED = {
+    # Sells draw 10@1 + 5@3, then 5@3 + 3@4, then 1@4; 1@4 and 4@5 are left
+    "fifo": {"cost_basis": 24.0, "realized_pnl": 59.0, "unrealized_pnl": 26.0},
+    # Sells draw 10@3 + 5@1, then 5@4 + 3@1, then 1@1; 1@1 and 4@5 are left
+    "lifo": {"cost_basis": 21.0, "realized_pnl": 56.0, "unrealized_pnl": 29.0},
+    # Average cost 2, then 3 after the second buy; 1 unit at 3 plus 4@5 are left
+    "average": {"cost_basis": 23.0, "realized_pnl": 58.0, "unrealized_pnl": 27.0},
+}
+
+
+@pytest.mark.parametrize("method", sorted(EXPECTED))
+def test_cost_basis_methods_on_a_hand_computed_ledger(method):
+    pnl = position_pnl(AMOUNTS, PRICES, CURRENT_PRICE, method)
+    expected = EXPECTED[method]
+
+    assert pnl["bought"] == 29.0
+    assert pnl["sold"] == 26.0
+    assert pnl["held"] == pytest.approx(5.0)
+    assert pnl["cost_basis"] == pytest.approx(expected["cost_basis"])
+    assert pnl["average_cost"] == pytest.approx(expected["cost_basis"] / 5.0)
+    assert pnl["realized_pnl"] == pytest.approx(expected["realized_pnl"])
+    assert pnl["unrealized_pnl"] == pytest.approx(expected["unrealized_pnl"])
+    # The first sale came out of a balance held before the history began
+    assert pnl["unmatched_sold"] == pytest.approx(2.0)
+    assert pnl["unmatched_proceeds"] == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("method", sorted(EXPECTED))
+def test_sale_beyond_the_bought_units_is_split(method):
+    # Buy 3 @ 2, then sell 5 @ 4: 3 units are matched, 2 came from before the history
+    pnl = position_pnl(np.array([3.0, -5.0]), np.array([2.0, 4.0]), 9.0, method)
+
+    assert pnl["held"] == pytest.approx(0.0)
+    assert pnl["cost_basis"] == pytest.approx(0.0)
+    assert pnl["average_cost"] is None
+    assert pnl["realized_pnl"] == pytest.approx(6.0)
+    assert pnl["unrealized_pnl"] == pytest.approx(0.0)
+    assert pnl["unmatched_sold"] == pytest.approx(2.0)
+    assert pnl["unmatched_proceeds"] == pytest.approx(8.0)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError, match="Unknown cost basis method"):
+        position_pnl(AMOUNTS, PRICES, CURRENT_PRICE, "hifo")
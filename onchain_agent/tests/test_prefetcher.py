@@ -0,0 +1,47 @@
+import threading
+
+from onchain_agent.tools import transaction_details_tool
+from onchain_agent.tools.transaction_details_tool import TransactionDetailsPrefetcher
+
+
+def _blocking_loader(monkeypatch):
+    """Make every prefetch wait on the returned event; ``started`` is set by the first one."""
+    release, started = threading.Event(), threading.Event()
+
+    def load(transaction_hash, chain_id):
+        started.set()
+        release.wait(5)
+        return {"data": {"transactionV2": {"hash": transaction_hash}}}
+
+    monkeypatch.setattr(transaction_details_tool, "load_transaction_details", load)
+    return release, started
+
+
+def test_hashes_beyond_the_queue_bound_are_skipped_not_the_page(monkeypatch):
+    release, started = _blocking_loader(monkeypatch)
+    prefetcher = TransactionDetailsPrefetcher(max_workers=1, max_entries=10, max_queued=2)
+    prefetcher.prefetch(["0x0"], 1)
+    assert started.wait(5)
+
+    assert prefetcher.prefetch(["0x1", "0x2", "0x3"], 1) == 2
+    assert not prefetcher.scheduled("0x3", 1)
+    # Already scheduled hashes are passed over, not counted against the bound
+    assert prefetcher.prefetch(["0x1", "0x2"], 1) == 0
+    release.set()
+    assert prefetcher.get("0x2", 1, timeout=5) == {"data": {"transactionV2": {"hash": "0x2"}}}
+
+
+def test_evicted_entries_free_their_queue_slots(monkeypatch):
+    release, started = _blocking_loader(monkeypatch)
+    prefetcher = TransactionDetailsPrefetcher(max_workers=1, max_entries=2, max_queued=4)
+    prefetcher.prefetch(["0x0"], 1)
+    assert started.wait(5)
+
+    # Each page evicts the previous one while its fetches are still queued
+    for page in (["0x1", "0x2"], ["0x3", "0x4"], ["0x5", "0x6"], ["0x7", "0x8"]):
+        assert prefetcher.prefetch(page, 1) == 2
+    assert prefetcher._queued == 2
+    assert prefetcher.get("0x1", 1, timeout=0) is None
+
+    release.set()
+    assert prefetcher.get("0x8", 1, timeout=5) == {"data": {"transactionV2": {"hash": "0x8"}}}
@@ -0,0 +1,164 @@
+import threading
+
+import pytest
+import requests
+
+from onchain_agent.tools import request_policy, transaction_details_tool
+from onchain_agent.tools.request_policy import (
+    CircuitBreaker,
+    CircuitOpen,
+    DeadlineExceeded,
+    RequestPolicy,
+    current_deadline,
+    run_budget
+)
+
+URL = "http://zapper.test/graphql"
+
+
+class _Response:
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Clock:
+    """Stands in for time.monotonic in the request_policy module."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(request_policy.time, "monotonic", fake)
+    return fake
+
+
+def _failing():
+    raise requests.exceptions.ConnectionError("refused")
+
+
+def test_breaker_opens_then_half_opens_then_closes(clock):
+    policy = RequestPolicy(breaker_failures=3, breaker_cooldown=30.0)
+    breaker = policy.breaker(URL)
+
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            policy.send(URL, "Op", _failing)
+    assert breaker.state == "open"
+
+    # Open: refused without calling the endpoint
+    calls = []
+    with pytest.raises(CircuitOpen):
+        policy.send(URL, "Op", lambda: calls.append(1) or _Response())
+    assert not calls
+
+    # After the cooldown one probe goes through; others fail fast while it runs
+    clock.now += 30.0
+    breaker.before_request()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        breaker.before_request()
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert policy.send(URL, "Op", _Response).status_code == 200
+
+
+def test_failed_probe_reopens(clock):
+    policy = RequestPolicy(breaker_failures=1, breaker_cooldown=10.0)
+    policy.send(URL, "Op", lambda: _Response(503))
+    breaker = policy.breaker(URL)
+    assert breaker.state == "open"
+
+    clock.now += 10.0
+    policy.send(URL, "Op", lambda: _Response(502))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        policy.send(URL, "Op", _Response)
+
+
+def test_probe_raising_any_exception_releases_the_breaker(clock):
+    policy = RequestPolicy(breaker_failures=1, breaker_cooldown=10.0)
+    policy.send(URL, "Op", lambda: _Response(500))
+    clock.now += 10.0
+
+    def probe():
+        raise ValueError("not a RequestException")
+
+    with pytest.raises(ValueError):
+        policy.send(URL, "Op", probe)
+    breaker = policy.breaker(URL)
+    assert breaker.state == "open"
+
+    # The next cooldown lets a new probe through instead of staying wedged
+    clock.now += 10.0
+    assert policy.send(URL, "Op", _Response).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_client_errors_do_not_count_as_failures():
+    breaker = CircuitBreaker(failures=2)
+    policy = RequestPolicy()
+    policy._breakers[URL] = breaker
+    for _ in range(5):
+        policy.send(URL, "Op", lambda: _Response(404))
+    assert breaker.state == "closed"
+
+
+def test_timeout_is_capped_by_the_run_budget(clock):
+    policy = RequestPolicy(timeout=30.0, connect_timeout=5.0)
+    assert policy.request_timeout() == (5.0, 30.0)
+    with run_budget(2.0):
+        assert policy.request_timeout() == (2.0, 2.0)
+        clock.now += 2.0
+        with pytest.raises(DeadlineExceeded):
+            policy.request_timeout()
+
+
+def test_hedge_answers_first_and_closes_the_loser():
+    policy = RequestPolicy(hedge_percentile=50)
+    for _ in range(request_policy.MIN_HEDGE_SAMPLES):
+        policy.latency.observe("Op", 0.01)
+
+    release = threading.Event()
+    responses = []
+    hedges = []
+
+    def attempt():
+        response = _Response()
+        responses.append(response)
+        if len(responses) == 1:
+            # The first attempt stalls until the hedge has answered
+            release.wait(5)
+        return response
+
+    winner = policy.send(URL, "Op", attempt, on_hedge=lambda: hedges.append(1))
+    release.set()
+    policy._hedge_pool().shutdown(wait=True)
+
+    assert hedges == [1]
+    assert winner is responses[1]
+    assert responses[0].closed and not winner.closed
+
+
+def test_prefetch_workers_inherit_the_run_deadline(monkeypatch):
+    seen = []
+
+    def load(transaction_hash, chain_id):
+        seen.append(current_deadline())
+        return {"data": {"transactionV2": {"hash": transaction_hash}}}
+
+    monkeypatch.setattr(transaction_details_tool, "load_transaction_details", load)
+    prefetcher = transaction_details_tool.TransactionDetailsPrefetcher(max_workers=1)
+    with run_budget(60.0) as deadline:
+        prefetcher.prefetch(["0xabc"], 1)
+    assert prefetcher.get("0xabc", 1, timeout=5) == {"data": {"transactionV2": {"hash": "0xabc"}}}
+    assert seen == [deadline]
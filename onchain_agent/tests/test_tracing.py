@@ -0,0 +1,23 @@
+from onchain_agent import tracing
+from onchain_agent.tools import transaction_details_tool
+
+
+def test_prefetch_worker_spans_nest_under_the_run_root(monkeypatch):
+    def load(transaction_hash, chain_id):
+        with tracing.span(f"load:{transaction_hash}", "http"):
+            return {"data": {"transactionV2": {"hash": transaction_hash}}}
+
+    monkeypatch.setattr(transaction_details_tool, "load_transaction_details", load)
+    prefetcher = transaction_details_tool.TransactionDetailsPrefetcher(max_workers=1)
+    tracer = tracing.Tracer("test_run")
+    token = tracing._active_tracer.set(tracer)
+    try:
+        with tracing.span("history_tool", "tool"):
+            prefetcher.prefetch(["0xabc"], 1)
+        prefetcher.get("0xabc", 1, timeout=5)
+    finally:
+        tracing._active_tracer.reset(token)
+
+    spans = {span.name: span for span in tracer.spans}
+    assert spans["load:0xabc"].parent_id == tracer.root.span_id
+    assert spans["load:0xabc"].thread_id != spans["history_tool"].thread_id
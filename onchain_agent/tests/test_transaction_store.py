@@ -0,0 +1,91 @@
+import pytest
+
+from onchain_agent.tools.transaction_store import TransactionStore
+
+
+def _tx(number):
+    return {"hash": f"0x{number:064x}", "blockNumber": 1000 + number, "status": "SUCCESS", "fee": number / 7}
+
+
+def _capacity(store):
+    return TransactionStore.INDEX_HEADER.unpack_from(store._index_map, 0)[1:]
+
+
+def test_round_trip(tmp_path):
+    store = TransactionStore(str(tmp_path))
+    assert store.get(_tx(1)["hash"], 1) is None
+
+    assert store.put(_tx(1)["hash"], 1, _tx(1))
+    assert not store.put(_tx(1)["hash"], 1, {"overwritten": True})
+    assert store.get(_tx(1)["hash"], 1) == _tx(1)
+    # Keyed by chain as well as hash, and hashes are case-insensitive
+    assert store.get(_tx(1)["hash"], 8453) is None
+    store.put(_tx(0xabc)["hash"], 1, _tx(0xabc))
+    assert store.get(_tx(0xabc)["hash"].upper(), 1) == _tx(0xabc)
+    assert len(store) == 2
+    store.close()
+
+
+def test_index_grows_past_the_load_factor(tmp_path, monkeypatch):
+    monkeypatch.setattr(TransactionStore, "INITIAL_CAPACITY", 8)
+    store = TransactionStore(str(tmp_path))
+    assert _capacity(store) == (8, 0)
+
+    for number in range(4):
+        store.put(_tx(number)["hash"], 1, _tx(number))
+    assert _capacity(store) == (8, 4)
+
+    # The fifth entry would exceed half the slots, so the index doubles
+    store.put(_tx(4)["hash"], 1, _tx(4))
+    assert _capacity(store) == (16, 5)
+
+    for number in range(5, 40):
+        store.put(_tx(number)["hash"], 1, _tx(number))
+    capacity, count = _capacity(store)
+    assert count == 40 and count <= capacity * TransactionStore.MAX_LOAD_FACTOR
+    assert all(store.get(_tx(number)["hash"], 1) == _tx(number) for number in range(40))
+    store.close()
+
+
+def test_reopen_and_read_only_readers(tmp_path, monkeypatch):
+    monkeypatch.setattr(TransactionStore, "INITIAL_CAPACITY", 8)
+    writer = TransactionStore(str(tmp_path))
+    for number in range(3):
+        writer.put(_tx(number)["hash"], 1, _tx(number))
+    writer.close()
+
+    reader = TransactionStore(str(tmp_path), read_only=True)
+    assert reader.get(_tx(2)["hash"], 1) == _tx(2)
+    with pytest.raises(PermissionError):
+        reader.put(_tx(9)["hash"], 1, _tx(9))
+
+    # A reopened writer appends to the same files and grows the index under the reader
+    writer = TransactionStore(str(tmp_path))
+    assert not writer.put(_tx(0)["hash"], 1, _tx(0))
+    for number in range(3, 20):
+        writer.put(_tx(number)["hash"], 1, _tx(number))
+    assert reader.get(_tx(19)["hash"], 1) == _tx(19)
+    assert all(reader.get(_tx(number)["hash"], 1) == _tx(number) for number in range(20))
+    writer.close()
+    reader.close()
+
+
+def test_corrupt_record_reads_as_a_miss(tmp_path):
+    store = TransactionStore(str(tmp_path))
+    store.put(_tx(1)["hash"], 1, _tx(1))
+    store.put(_tx(2)["hash"], 1, _tx(2))
+    store.close()
+
+    # Zero the first record's payload, as if it never reached the disk
+    data_path = tmp_path / TransactionStore.DATA_FILE
+    data = bytearray(data_path.read_bytes())
+    start = len(TransactionStore.DATA_MAGIC)
+    length, = TransactionStore.RECORD_PREFIX.unpack_from(data, start)
+    start += TransactionStore.RECORD_PREFIX.size
+    data[start:start + length] = bytes(length)
+    data_path.write_bytes(bytes(data))
+
+    store = TransactionStore(str(tmp_path), read_only=True)
+    assert store.get(_tx(1)["hash"], 1) is None
+    assert store.get(_tx(2)["hash"], 1) == _tx(2)
+    store.close()